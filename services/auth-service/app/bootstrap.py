@@ -0,0 +1,63 @@
+"""One-time database setup: tables and the default accounts.
+
+Runs before the first request (startup hook in ``app.main``), or as a
+deployment step with ``AUTH_BOOTSTRAP=0`` set on the servers:
+
+    python -m app.bootstrap
+
+It is idempotent and runs under the cross-process schema lock, so workers
+starting together do it one after the other; the later ones only find the
+tables and accounts already there. The default accounts are inserted in one
+transaction with precomputed bcrypt hashes (cost 12): no hashing at startup.
+Hashes are upgraded to ``AUTH_BCRYPT_ROUNDS`` on first login.
+"""
+import os
+
+from sqlalchemy import insert, select
+
+from app.database import Base, SessionLocal, engine, schema_lock
+from app.models import User
+
+# AUTH_BOOTSTRAP=0: tables and default accounts are set up by `python -m app.bootstrap`
+ON_STARTUP = os.getenv("AUTH_BOOTSTRAP", "1") == "1"
+
+# arbitrary PostgreSQL advisory lock key for schema creation and seeding
+SCHEMA_LOCK_KEY = 7320
+
+# email, password (documented in the README), full name, role, bcrypt hash of the password
+DEFAULT_USERS = [
+    ("admin@university.com", "admin123", "Administrator", "ADMIN",
+     "$2b$12$L8BomOI1CB3.kQ86ti/JuuTorvp2P0cOuYn0X7jOOMqkFdADfkfxm"),
+    ("teacher@university.com", "teacher123", "Teacher", "ENSEIGNANT",
+     "$2b$12$uSVR4kto/0fxHpA1cvZ.iu/A13DaixnT7JL70IsWH0P0vO4IK.3Yy"),
+    ("student@university.com", "student123", "Student", "ETUDIANT",
+     "$2b$12$WsBDjOmRD33kOKyHLgiKmeBj00yLphuvi18A2E7dZ/oYRVkBPF/02"),
+]
+
+
+def seed_users(db) -> list:
+    """Add the default accounts that are missing; returns their emails."""
+    emails = [email for email, *_ in DEFAULT_USERS]
+    existing = set(db.scalars(select(User.email).where(User.email.in_(emails))))
+    missing = [user for user in DEFAULT_USERS if user[0] not in existing]
+    if missing:
+        db.execute(insert(User), [
+            {"email": email, "password": hashed, "full_name": full_name, "role": role}
+            for email, _, full_name, role, hashed in missing
+        ])
+    return [user[0] for user in missing]
+
+
+def bootstrap(engine=engine, session_factory=SessionLocal) -> None:
+    with schema_lock(engine, SCHEMA_LOCK_KEY):
+        Base.metadata.create_all(bind=engine)
+        with session_factory() as db:
+            seeded = seed_users(db)
+            db.commit()
+    for email, password, *_ in DEFAULT_USERS:
+        if email in seeded:
+            print(f"Seeded user: {email} / {password}")
+
+
+if __name__ == "__main__":
+    bootstrap()
@@ -1,12 +1,78 @@
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, run a single worker there
+    fcntl = None
+
 DATABASE_URL = os.getenv("AUTH_DATABASE_URL", "sqlite:///./auth.db")
 
 # SQLite specific arg; ignore for other DBs
 connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+# SQLite engine profile (AUTH_DB_PROFILE), same profiles as student-service:
+# "default" keeps SQLite's settings, "wal" enables the write-ahead log,
+# synchronous=NORMAL, a larger cache, mmap and a busy timeout
+SQLITE_PROFILES = {
+    "default": {},
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,  # KiB
+        "mmap_size": 256 * 1024 * 1024,
+        "busy_timeout": 5000,  # ms
+        "temp_store": "MEMORY",
+    },
+}
+DB_PROFILE = os.getenv("AUTH_DB_PROFILE", "default")
+PRAGMAS = SQLITE_PROFILES[DB_PROFILE] if DATABASE_URL.startswith("sqlite") else {}
+
+pool_options = {}
+if DATABASE_URL not in ("sqlite://", "sqlite:///:memory:"):
+    pool_options = {
+        "pool_size": int(os.getenv("AUTH_DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("AUTH_DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("AUTH_DB_POOL_TIMEOUT", "30")),
+    }
+
+engine = create_engine(DATABASE_URL, connect_args=connect_args, **pool_options)
 SessionLocal = sessionmaker(bind=engine, autoflush=False)
 Base = declarative_base()
+
+
+@contextmanager
+def schema_lock(engine, key: int):
+    """Cross-process lock held while creating tables or seeding, so that
+    workers starting together run it one after the other: a lock file next
+    to a SQLite database, a session advisory lock (``key``) on PostgreSQL.
+    """
+    url = engine.url
+    if url.get_backend_name() == "postgresql":
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": key})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+        return
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:") or fcntl is None:
+        yield
+        return
+    with open(url.database + ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+if PRAGMAS:
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_conn, record):
+        cursor = dbapi_conn.cursor()
+        for name, value in PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
@@ -0,0 +1,100 @@
+"""Password hashing off the request threads.
+
+bcrypt is deliberately slow (~250 ms at cost 12), so hashes run in a process
+pool sized to the machine instead of on the server's threadpool, where a
+login burst would starve cheap endpoints such as /auth/validate. The hash
+functions are coroutines: a pending hash is awaited on the event loop and
+holds no threadpool thread. At most ``AUTH_HASH_QUEUE`` hashes may be
+pending; beyond that ``HashingBusy`` is raised and the route answers 503
+with Retry-After.
+
+Settings: ``AUTH_BCRYPT_ROUNDS`` (cost of new hashes, default 12),
+``AUTH_HASH_WORKERS`` (pool size, default CPU count; 0 hashes inline) and
+``AUTH_HASH_QUEUE`` (pending hash limit, default 4 per worker).
+"""
+import asyncio
+import os
+import threading
+from typing import TYPE_CHECKING, Optional
+
+import bcrypt
+from fastapi.concurrency import run_in_threadpool
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+BCRYPT_ROUNDS = int(os.getenv("AUTH_BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", str(os.cpu_count() or 1)))
+HASH_QUEUE = int(os.getenv("AUTH_HASH_QUEUE", str(max(HASH_WORKERS, 1) * 4)))
+# seconds suggested to clients in Retry-After when the queue is full
+RETRY_AFTER_SECONDS = 1
+
+
+class HashingBusy(Exception):
+    pass
+
+
+def _hashpw(password: bytes, rounds: int) -> str:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _checkpw(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+
+_executor: Optional["ProcessPoolExecutor"] = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(HASH_QUEUE)
+
+
+def _pool() -> "ProcessPoolExecutor":
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # imported with the first hash, not at startup
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                # spawn: forking a process that already runs server threads is unsafe
+                _executor = ProcessPoolExecutor(
+                    max_workers=HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+                )
+    return _executor
+
+
+async def _run(fn, *args):
+    if HASH_WORKERS <= 0:
+        return await run_in_threadpool(fn, *args)
+    if not _slots.acquire(blocking=False):
+        raise HashingBusy()
+    try:
+        return await asyncio.wrap_future(_pool().submit(fn, *args))
+    finally:
+        _slots.release()
+
+
+async def hash_password(password: str) -> str:
+    return await _run(_hashpw, password.encode("utf-8"), BCRYPT_ROUNDS)
+
+
+async def check_password(password: str, hashed: str) -> bool:
+    return await _run(_checkpw, password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+def needs_rehash(hashed: str) -> bool:
+    """True when ``hashed`` was made with a different cost than configured."""
+    try:
+        # $2b$12$<salt+hash>
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+def shutdown() -> None:
+    """Cancel queued hashes and wait for the running ones, so that no pool
+    process outlives the server (at most one bcrypt per worker)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
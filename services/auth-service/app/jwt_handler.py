@@ -1,17 +1,33 @@
 from datetime import datetime, timedelta
+import hashlib
 import os
+import uuid
 from typing import Optional, Dict
 
 from jose import jwt, JWTError
 
+from app.keys import load_keys
+from app.revocation import create_store
+from app.token_cache import VerifiedTokenCache
+
 # Environment-configurable settings
 SECRET_KEY = os.getenv("AUTH_JWT_SECRET", "CHANGE_ME_SECRET")
 ALGORITHM = os.getenv("AUTH_JWT_ALGO", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("AUTH_ACCESS_EXPIRE_MINUTES", "15"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("AUTH_REFRESH_EXPIRE_DAYS", "7"))
 
-# In-memory blacklist for demo purposes (consider persistent storage in production)
-_blacklist = set()
+# Shared secret for HS256, or an RS256/ES256 key pair published as a JWKS
+KEYS = load_keys(ALGORITHM, SECRET_KEY)
+
+# Revoked tokens keyed by jti, each forgotten once the token itself expires.
+# Backend chosen by AUTH_REVOCATION_BACKEND (memory, sql, redis).
+_revoked = create_store()
+
+# Payloads of tokens whose signature was already checked (0 disables)
+token_cache = VerifiedTokenCache(
+    max_size=int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000")),
+    ttl=int(os.getenv("AUTH_TOKEN_CACHE_TTL_SECONDS", "60")),
+)
 
 
 def _expiry(delta: timedelta) -> datetime:
@@ -21,35 +37,59 @@ def _expiry(delta: timedelta) -> datetime:
 def create_access_token(data: Dict) -> str:
     to_encode = data.copy()
     to_encode["type"] = "access"
+    to_encode["jti"] = uuid.uuid4().hex
     to_encode["exp"] = _expiry(timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, KEYS.signing_key, algorithm=ALGORITHM, headers=KEYS.headers)
 
 
 def create_refresh_token(data: Dict) -> str:
     to_encode = data.copy()
     to_encode["type"] = "refresh"
+    to_encode["jti"] = uuid.uuid4().hex
     to_encode["exp"] = _expiry(timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, KEYS.signing_key, algorithm=ALGORITHM, headers=KEYS.headers)
+
+
+def _decode(token: str, verify_exp: bool = True) -> Dict:
+    key = KEYS.verification_key(jwt.get_unverified_header(token).get("kid"))
+    if key is None:
+        raise JWTError("Unknown signing key")
+    return jwt.decode(token, key, algorithms=[ALGORITHM], options={"verify_exp": verify_exp})
+
+
+def _digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
 
 
 def verify_token(token: str, expected_type: Optional[str] = None) -> Optional[Dict]:
-    try:
-        if is_blacklisted(token):
+    digest = _digest(token)
+    payload = token_cache.get(digest)
+    if payload is None:
+        try:
+            payload = _decode(token)
+        except JWTError:
             return None
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        if expected_type and payload.get("type") != expected_type:
-            return None
-        return payload
-    except JWTError:
+        token_cache.put(digest, payload)
+    if expected_type and payload.get("type") != expected_type:
         return None
+    # always consulted: another worker may have revoked the token
+    if _revoked.is_revoked(payload.get("jti") or digest):
+        return None
+    return payload
 
 
-def add_to_blacklist(token: str) -> None:
-    _blacklist.add(token)
+def _token_id(token: str, payload: Dict) -> str:
+    # tokens issued before jti was added are keyed by their digest
+    return payload.get("jti") or _digest(token)
 
 
-def is_blacklisted(token: str) -> bool:
-    return token in _blacklist
+def add_to_blacklist(token: str) -> None:
+    token_cache.invalidate(_digest(token))
+    try:
+        payload = _decode(token, verify_exp=False)
+    except JWTError:
+        return  # not issued by us, nothing to revoke
+    _revoked.revoke(_token_id(token, payload), int(payload.get("exp", 0)))
 
 
 def validate_password_strength(password: str) -> Optional[str]:
@@ -0,0 +1,100 @@
+"""Signing keys for issued JWTs and their public JWKS.
+
+HS256 (default) signs with the shared ``AUTH_JWT_SECRET`` and publishes no
+keys. With ``AUTH_JWT_ALGO=RS256`` or ``ES256`` tokens are signed with the
+PEM private key in ``AUTH_JWT_PRIVATE_KEY_FILE`` and carry its ``kid``; other
+services verify them locally from ``/auth/.well-known/jwks.json``.
+
+To rotate, point ``AUTH_JWT_PRIVATE_KEY_FILE`` at the new key and list the
+old public key(s) in ``AUTH_JWT_PREVIOUS_PUBLIC_KEYS`` (comma separated PEM
+files) until tokens signed with them have expired: they stay in the JWKS and
+keep verifying.
+"""
+import base64
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+
+from jose import jwk
+
+logger = logging.getLogger(__name__)
+
+ASYMMETRIC_ALGORITHMS = {"RS256", "ES256"}
+
+# members that identify a key, per RFC 7638 (JWK thumbprint)
+_THUMBPRINT_MEMBERS = {"RSA": ("e", "kty", "n"), "EC": ("crv", "kty", "x", "y")}
+
+
+def _thumbprint(public_jwk: Dict) -> str:
+    members = {k: public_jwk[k] for k in _THUMBPRINT_MEMBERS[public_jwk["kty"]]}
+    canonical = json.dumps(members, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(hashlib.sha256(canonical).digest()).decode().rstrip("=")
+
+
+def _generate_pem(algorithm: str) -> str:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+    if algorithm == "RS256":
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        key = ec.generate_private_key(ec.SECP256R1())
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+def _read(path: str) -> str:
+    with open(path) as f:
+        return f.read()
+
+
+class KeySet:
+    def __init__(self, algorithm: str, secret: str, private_key_file: Optional[str] = None,
+                 previous_public_key_files: Optional[List[str]] = None):
+        self.algorithm = algorithm
+        self.secret = secret
+        self.kid = None
+        self.signing_key = secret
+        self._public: Dict[str, Dict] = {}  # kid -> public JWK
+
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            return
+
+        if private_key_file:
+            pem = _read(private_key_file)
+        else:
+            # fine for a single dev process; every worker would get its own key
+            logger.warning("AUTH_JWT_PRIVATE_KEY_FILE not set, using an ephemeral %s key", algorithm)
+            pem = _generate_pem(algorithm)
+        self.signing_key = pem
+        self.kid = self._add_public(jwk.construct(pem, algorithm).public_key().to_dict())
+        for path in previous_public_key_files or []:
+            self._add_public(jwk.construct(_read(path), algorithm).to_dict())
+
+    def _add_public(self, public_jwk: Dict) -> str:
+        kid = _thumbprint(public_jwk)
+        self._public[kid] = {**public_jwk, "kid": kid, "use": "sig", "alg": self.algorithm}
+        return kid
+
+    @property
+    def headers(self) -> Optional[Dict]:
+        return {"kid": self.kid} if self.kid else None
+
+    def verification_key(self, kid: Optional[str]):
+        """Key to check a token signed with ``kid``; None if unknown."""
+        if self.algorithm not in ASYMMETRIC_ALGORITHMS:
+            return self.secret
+        return self._public.get(kid)
+
+    def jwks(self) -> Dict:
+        return {"keys": list(self._public.values())}
+
+
+def load_keys(algorithm: str, secret: str) -> KeySet:
+    previous = [p.strip() for p in os.getenv("AUTH_JWT_PREVIOUS_PUBLIC_KEYS", "").split(",") if p.strip()]
+    return KeySet(algorithm, secret, os.getenv("AUTH_JWT_PRIVATE_KEY_FILE"), previous)
@@ -1,67 +1,34 @@
 from fastapi import FastAPI
-from app.database import Base, engine, SessionLocal
-from app.models import User
+from app.database import engine
 from app.routes import users
-import bcrypt
-
-Base.metadata.create_all(bind=engine)
-
-# Seed default users if not exist
-def seed_users():
-    db = SessionLocal()
-    try:
-        # Check if admin exists
-        admin = db.query(User).filter_by(email="admin@university.com").first()
-        if not admin:
-            hashed = bcrypt.hashpw("admin123".encode('utf-8'), bcrypt.gensalt())
-            admin_user = User(
-                email="admin@university.com",
-                password=hashed.decode('utf-8'),
-                full_name="Administrator",
-                role="ADMIN"
-            )
-            db.add(admin_user)
-            db.commit()
-            print("Seeded admin user: admin@university.com / admin123")
-
-        # Check if teacher exists
-        teacher = db.query(User).filter_by(email="teacher@university.com").first()
-        if not teacher:
-            hashed = bcrypt.hashpw("teacher123".encode('utf-8'), bcrypt.gensalt())
-            teacher_user = User(
-                email="teacher@university.com",
-                password=hashed.decode('utf-8'),
-                full_name="Teacher",
-                role="ENSEIGNANT"
-            )
-            db.add(teacher_user)
-            db.commit()
-            print("Seeded teacher user: teacher@university.com / teacher123")
-
-        # Check if student exists
-        student = db.query(User).filter_by(email="student@university.com").first()
-        if not student:
-            hashed = bcrypt.hashpw("student123".encode('utf-8'), bcrypt.gensalt())
-            student_user = User(
-                email="student@university.com",
-                password=hashed.decode('utf-8'),
-                full_name="Student",
-                role="ETUDIANT"
-            )
-            db.add(student_user)
-            db.commit()
-            print("Seeded student user: student@university.com / student123")
-    finally:
-        db.close()
-
-seed_users()
+from app import hashing
+from app.bootstrap import ON_STARTUP, bootstrap
+from app.jwt_handler import token_cache
+from app.metrics import install as install_metrics, pool_stats
+from app.ratelimit import rate_limiter
 
 app = FastAPI(title="Auth Service - JWT Enabled")
+install_metrics(app, db=engine)
 
 # CORS est géré par l'API Gateway - ne pas ajouter ici pour éviter les doublons
 
-app.include_router(users.router, prefix="/auth", tags=["authentication"])
+app.include_router(users.router)
+
+# Tables and default accounts are set up before the first request rather
+# than at import time (see app/bootstrap.py)
+if ON_STARTUP:
+    app.on_event("startup")(bootstrap)
+
+@app.on_event("shutdown")
+def stop_hashing_pool():
+    hashing.shutdown()
 
 @app.get("/health")
 def health_check():
-    return {"status": "Auth Service is running", "version": "1.0.0"}
+    return {
+        "status": "Auth Service is running",
+        "version": "1.0.0",
+        "token_cache": token_cache.stats(),
+        "rate_limited": rate_limiter.limited,
+        "db_pool": pool_stats(engine),
+    }
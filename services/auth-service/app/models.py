@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Float, Integer, String, DateTime
 from datetime import datetime
 from .database import Base
 
@@ -13,3 +13,17 @@ class User(Base):
     is_active = Column(Integer, default=1)  # 1=active, 0=inactive
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String, primary_key=True)
+    expires_at = Column(Integer, index=True)  # token exp, epoch seconds
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limits"
+
+    key = Column(String, primary_key=True)  # route:scope:value
+    tat = Column(Float)  # GCRA theoretical arrival time, epoch seconds
@@ -0,0 +1,256 @@
+"""Token-bucket admission control for the login, register and refresh routes.
+
+Each request takes one token from every bucket it falls in: the route's
+bucket for the client IP, the route's bucket for the email (login and
+register) and the route-wide bucket shared by every client, all or none:
+a refused request spends nothing. A bucket of ``N/S`` holds up to N tokens
+and refills at N per S seconds. When one is empty the route answers 429
+with ``Retry-After`` (seconds until a token is back). Buckets are kept
+with GCRA: one timestamp per key, the bucket's "theoretical arrival
+time", so a check is one read-modify-write.
+
+Limits are set per route and scope with ``AUTH_RATE_LIMIT_<ROUTE>_<SCOPE>``,
+e.g. ``AUTH_RATE_LIMIT_LOGIN_EMAIL=10/300``; ``0`` turns that bucket off and
+``AUTH_RATE_LIMIT=0`` turns them all off. Behind the gateway set
+``AUTH_RATE_LIMIT_TRUST_PROXY=1`` so that the client IP is taken from
+``X-Forwarded-For``.
+
+Backend (``AUTH_RATE_LIMIT_BACKEND``):
+
+- ``memory`` (default): per-process dict; each worker has its own buckets.
+- ``sql``: ``rate_limits`` table in the auth database, shared by every worker
+  using the same database; one upsert per request, rolled back when refused.
+  ``run.py`` picks it when it starts several workers.
+- ``redis``: any Redis-protocol server at ``AUTH_RATE_LIMIT_URL``, shared
+  across hosts; one Lua script per request, the cheapest shared option.
+"""
+import hashlib
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from sqlalchemy import bindparam, case, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.models import RateLimitBucket
+
+ENABLED = os.getenv("AUTH_RATE_LIMIT", "1") == "1"
+TRUST_PROXY = os.getenv("AUTH_RATE_LIMIT_TRUST_PROXY", "0") == "1"
+
+IP, EMAIL, ROUTE = "ip", "email", "route"
+# (key, seconds per token, bucket size in seconds of tokens)
+Bucket = Tuple[str, float, float]
+# slack for float rounding when a bucket is exactly full (e.g. 100 x 0.01 s)
+_EPSILON = 1e-6
+
+# route -> scope -> "tokens/seconds"
+DEFAULT_LIMITS = {
+    "login": {IP: "20/60", EMAIL: "10/300", ROUTE: "100/1"},
+    "register": {IP: "5/60", EMAIL: "3/3600", ROUTE: "20/1"},
+    "refresh": {IP: "60/60", ROUTE: "500/1"},
+}
+
+
+def parse_limit(value: str) -> Optional[Tuple[int, float]]:
+    """``"10/60"`` -> ``(10, 60.0)``; None for ``"0"`` (no limit)."""
+    if value.strip() == "0":
+        return None
+    tokens, _, seconds = value.partition("/")
+    return int(tokens), float(seconds or 1)
+
+
+def load_limits() -> Dict[str, Dict[str, Tuple[int, float]]]:
+    limits = {}
+    for route, scopes in DEFAULT_LIMITS.items():
+        limits[route] = {}
+        for scope, default in scopes.items():
+            limit = parse_limit(os.getenv(f"AUTH_RATE_LIMIT_{route.upper()}_{scope.upper()}", default))
+            if limit is not None:
+                limits[route][scope] = limit
+    return limits
+
+
+class MemoryBucketStore:
+    # expired keys (full buckets) are swept once the dict holds this many
+    MAX_KEYS = 100_000
+
+    def __init__(self):
+        self._tat: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def take(self, buckets: List[Bucket], now: float) -> float:
+        """Take a token from every bucket, or from none; returns 0 if granted,
+        else the seconds to wait."""
+        with self._lock:
+            tats = [max(self._tat.get(key, now), now) + interval for key, interval, _ in buckets]
+            wait = max(tat - now - burst for tat, (_, _, burst) in zip(tats, buckets))
+            if wait > _EPSILON:
+                return wait
+            for (key, _, _), tat in zip(buckets, tats):
+                self._tat[key] = tat
+            if len(self._tat) > self.MAX_KEYS:
+                for old in [k for k, t in self._tat.items() if t <= now]:
+                    del self._tat[old]
+            return 0.0
+
+
+class SQLBucketStore:
+    # delete expired rows every PURGE_EVERY grants
+    PURGE_EVERY = 1000
+
+    def __init__(self, engine):
+        # the table is created with the others (app/bootstrap.py)
+        self.engine = engine
+        self._insert = pg_insert if engine.dialect.name == "postgresql" else sqlite_insert
+        self._statements = {}
+        self._writes = 0
+
+    def _statement(self, count: int):
+        """SQL and parameter order of the upsert of ``count`` buckets, compiled
+        once (SQLAlchemy doesn't cache multi-row VALUES); the inserted tat
+        (now + interval) carries each bucket's interval."""
+        statement = self._statements.get(count)
+        if statement is None:
+            table = RateLimitBucket.__table__
+            now = bindparam("now")
+            stmt = self._insert(table).values(
+                [{"key": bindparam(f"key{i}"), "tat": bindparam(f"tat{i}")} for i in range(count)]
+            )
+            current = case((table.c.tat > now, table.c.tat), else_=now)
+            compiled = stmt.on_conflict_do_update(
+                index_elements=[table.c.key],
+                set_={"tat": current + (stmt.excluded.tat - now)},
+            ).returning(table.c.key, table.c.tat).compile(dialect=self.engine.dialect)
+            statement = self._statements[count] = (str(compiled), compiled.positiontup)
+        return statement
+
+    def take(self, buckets: List[Bucket], now: float) -> float:
+        params = {"now": now}
+        for i, (key, interval, _) in enumerate(buckets):
+            params[f"key{i}"], params[f"tat{i}"] = key, now + interval
+        sql, order = self._statement(len(buckets))
+        if order is not None:  # positional paramstyle (sqlite)
+            params = tuple(params[name] for name in order)
+        with self.engine.connect() as conn:
+            with conn.begin() as transaction:
+                tats = dict(conn.exec_driver_sql(sql, params).all())
+                wait = max(tats[key] - now - burst for key, _, burst in buckets)
+                if wait > _EPSILON:
+                    # nothing is taken when one bucket is empty
+                    transaction.rollback()
+                    return wait
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                table = RateLimitBucket.__table__
+                with conn.begin():
+                    conn.execute(delete(table).where(table.c.tat <= now))
+        return 0.0
+
+
+class RedisBucketStore:
+    """One ``EVALSHA`` of ``SCRIPT`` per request, atomic on the server."""
+
+    PREFIX = "ratelimit:"
+    # KEYS: bucket keys; ARGV: now, then interval and burst of each bucket
+    SCRIPT = """
+local now = tonumber(ARGV[1])
+local tats = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+  local tat = math.max(tonumber(redis.call('GET', key) or now), now) + tonumber(ARGV[2 * i])
+  wait = math.max(wait, tat - now - tonumber(ARGV[2 * i + 1]))
+  tats[i] = tat
+end
+if wait > %g then
+  return tostring(wait)
+end
+for i, key in ipairs(KEYS) do
+  redis.call('SET', key, tostring(tats[i]), 'PX', math.ceil((tats[i] - now) * 1000))
+end
+return '0'
+""" % _EPSILON
+    SHA = hashlib.sha1(SCRIPT.encode()).hexdigest()
+
+    def __init__(self, url: str):
+        from app.resp import RespClient
+
+        self.client = RespClient(url)
+
+    def take(self, buckets: List[Bucket], now: float) -> float:
+        args = [str(len(buckets)), *(self.PREFIX + key for key, _, _ in buckets), repr(now)]
+        for _, interval, burst in buckets:
+            args += [repr(interval), repr(burst)]
+        try:
+            wait = self.client.command("EVALSHA", self.SHA, *args)
+        except RuntimeError as exc:
+            if not str(exc).startswith("NOSCRIPT"):
+                raise
+            wait = self.client.command("EVAL", self.SCRIPT, *args)
+        return float(wait)
+
+
+def create_store(backend: Optional[str] = None):
+    backend = (backend or os.getenv("AUTH_RATE_LIMIT_BACKEND", "memory")).lower()
+    if backend == "memory":
+        return MemoryBucketStore()
+    if backend == "sql":
+        from app.database import engine
+
+        return SQLBucketStore(engine)
+    if backend == "redis":
+        return RedisBucketStore(os.getenv("AUTH_RATE_LIMIT_URL", "redis://localhost:6379/0"))
+    raise ValueError(f"Unknown AUTH_RATE_LIMIT_BACKEND: {backend}")
+
+
+def client_ip(request: Request) -> str:
+    if TRUST_PROXY:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            # the address appended by the proxy in front of us
+            return forwarded.rsplit(",", 1)[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimiter:
+    def __init__(self, store, limits: Dict[str, Dict[str, Tuple[int, float]]]):
+        self.store = store
+        # route -> [(scope, interval, burst)]: seconds per token, and the
+        # bucket size in seconds of tokens
+        self._buckets = {
+            route: [(scope, seconds / tokens, seconds) for scope, (tokens, seconds) in scopes.items()]
+            for route, scopes in limits.items()
+        }
+        self.limited = 0
+
+    def check(self, request: Request, route: str, email: Optional[str] = None) -> None:
+        """Take a token from each of the request's buckets, all or none; 429
+        when one is empty."""
+        buckets = self._buckets.get(route)
+        if not buckets:
+            return
+        wanted = []
+        for scope, interval, burst in buckets:
+            if scope == IP:
+                key = f"{route}:ip:{client_ip(request)}"
+            elif scope == EMAIL:
+                if not email:
+                    continue
+                key = f"{route}:email:{email.lower()}"
+            else:
+                key = f"{route}:route"
+            wanted.append((key, interval, burst))
+        wait = self.store.take(wanted, time.time())
+        if wait > 0:
+            self.limited += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please retry later",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+
+
+rate_limiter = RateLimiter(create_store(), load_limits() if ENABLED else {})
@@ -0,0 +1,115 @@
+"""Revoked-token stores keyed by the token ``jti`` claim.
+
+Every entry expires at the token's own ``exp``: once a token has expired
+``verify_token`` rejects it anyway, so the store only has to remember tokens
+that are still alive. Pick the backend with ``AUTH_REVOCATION_BACKEND``:
+
+- ``memory`` (default): per-process dict with TTL eviction; fine for a
+  single worker.
+- ``sql``: ``revoked_tokens`` table in the auth database, shared by every
+  worker using the same database.
+- ``redis``: any Redis-protocol server at ``AUTH_REVOCATION_URL``
+  (``redis://host:port/db``), shared across hosts.
+"""
+import heapq
+import os
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+
+from app.models import RevokedToken
+
+
+class MemoryRevocationStore:
+    def __init__(self):
+        self._expiry = {}  # jti -> exp (epoch seconds)
+        self._heap = []  # (exp, jti), oldest first, for eviction
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, exp: int) -> None:
+        now = time.time()
+        if exp <= now:
+            return
+        with self._lock:
+            self._expiry[jti] = exp
+            heapq.heappush(self._heap, (exp, jti))
+            # evict whatever has expired since the last call (amortized O(log n))
+            while self._heap and self._heap[0][0] <= now:
+                old_exp, old_jti = heapq.heappop(self._heap)
+                if self._expiry.get(old_jti) == old_exp:
+                    del self._expiry[old_jti]
+
+    def is_revoked(self, jti: str) -> bool:
+        exp = self._expiry.get(jti)
+        return exp is not None and exp > time.time()
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+
+class SQLRevocationStore:
+    # purge expired rows every PURGE_EVERY revocations
+    PURGE_EVERY = 1000
+
+    def __init__(self, engine):
+        # the table is created with the others (app/bootstrap.py)
+        self.engine = engine
+        self._writes = 0
+
+    def revoke(self, jti: str, exp: int) -> None:
+        now = int(time.time())
+        if exp <= now:
+            return
+        table = RevokedToken.__table__
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(table.insert().values(jti=jti, expires_at=exp))
+        except IntegrityError:
+            return  # already revoked
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            with self.engine.begin() as conn:
+                conn.execute(delete(table).where(table.c.expires_at <= now))
+
+    def is_revoked(self, jti: str) -> bool:
+        table = RevokedToken.__table__
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(table.c.expires_at).where(table.c.jti == jti)
+            ).first()
+        return row is not None and row[0] > time.time()
+
+
+class RedisRevocationStore:
+    """``SET revoked:<jti> 1 EX <ttl>`` / ``EXISTS revoked:<jti>``."""
+
+    PREFIX = "revoked:"
+
+    def __init__(self, url: str):
+        from app.resp import RespClient
+
+        self.client = RespClient(url)
+
+    def revoke(self, jti: str, exp: int) -> None:
+        ttl = int(exp - time.time())
+        if ttl > 0:
+            self.client.command("SET", self.PREFIX + jti, "1", "EX", str(ttl))
+
+    def is_revoked(self, jti: str) -> bool:
+        return self.client.command("EXISTS", self.PREFIX + jti) == 1
+
+
+def create_store(backend: Optional[str] = None):
+    backend = (backend or os.getenv("AUTH_REVOCATION_BACKEND", "memory")).lower()
+    if backend == "memory":
+        return MemoryRevocationStore()
+    if backend == "sql":
+        from app.database import engine
+
+        return SQLRevocationStore(engine)
+    if backend == "redis":
+        return RedisRevocationStore(os.getenv("AUTH_REVOCATION_URL", "redis://localhost:6379/0"))
+    raise ValueError(f"Unknown AUTH_REVOCATION_BACKEND: {backend}")
@@ -1,22 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer
 from fastapi.security.http import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-import bcrypt
 import re
 
 from app.database import SessionLocal
 from app.models import User
 from app.schemas import UserCreate, LoginRequest, UserOut, Token
+from app.hashing import (
+    HashingBusy,
+    RETRY_AFTER_SECONDS,
+    check_password,
+    hash_password,
+    needs_rehash,
+)
+from app.ratelimit import rate_limiter
 from app.jwt_handler import (
     create_access_token,
     create_refresh_token,
     verify_token,
     add_to_blacklist,
     validate_password_strength,
+    KEYS,
 )
 
-router = APIRouter()
+# prefix set here rather than in include_router so that route.path (the
+# metrics route label) is the full /auth/... template
+router = APIRouter(prefix="/auth", tags=["authentication"])
 security = HTTPBearer()
 
 def get_db():
@@ -26,10 +37,29 @@ def get_db():
     finally:
         db.close()
 
-# REGISTER
+def hashing_busy():
+    return HTTPException(
+        status_code=503,
+        detail="Too many concurrent authentications, please retry",
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+    )
+
+def find_user(db: Session, email: str):
+    """The user with this email, or None. The session is closed afterwards,
+    returning its connection to the pool before the caller waits for a hash;
+    the user's loaded attributes stay readable and ``db`` can be used again."""
+    try:
+        return db.query(User).filter_by(email=email).first()
+    finally:
+        db.close()
+
+# REGISTER and LOGIN are async so that a request waiting for its bcrypt hash
+# (app/hashing.py) doesn't hold a threadpool thread; their database work and
+# the rate limiter still run on the threadpool
 @router.post("/register", status_code=status.HTTP_201_CREATED, response_model=UserOut)
-def register(payload: UserCreate, db: Session = Depends(get_db)):
+async def register(payload: UserCreate, request: Request, db: Session = Depends(get_db)):
     """Register a new user"""
+    await run_in_threadpool(rate_limiter.check, request, "register", email=payload.email)
     email = payload.email
     password = payload.password
     full_name = payload.full_name or ""
@@ -40,7 +70,7 @@ def register(payload: UserCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Invalid email format")
 
     # Uniqueness
-    existing = db.query(User).filter_by(email=email).first()
+    existing = await run_in_threadpool(find_user, db, email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
@@ -49,31 +79,60 @@ def register(payload: UserCreate, db: Session = Depends(get_db)):
     if pwd_err:
         raise HTTPException(status_code=400, detail=pwd_err)
 
-    hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    try:
+        hashed = await hash_password(password)
+    except HashingBusy:
+        raise hashing_busy()
     db_user = User(email=email, password=hashed, full_name=full_name, role=role)
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+
+    def save():
+        db.add(db_user)
+        db.commit()
+        db.refresh(db_user)
+
+    await run_in_threadpool(save)
     return db_user
 
 # LOGIN
 @router.post("/login", response_model=Token)
-def login(body: LoginRequest, db: Session = Depends(get_db)):
+async def login(body: LoginRequest, request: Request, db: Session = Depends(get_db)):
     """Login user and return JWT tokens"""
-    user = db.query(User).filter_by(email=body.email).first()
-    
-    if not user or not bcrypt.checkpw(body.password.encode('utf-8'), user.password.encode('utf-8')):
+    await run_in_threadpool(rate_limiter.check, request, "login", email=body.email)
+    user = await run_in_threadpool(find_user, db, body.email)
+
+    try:
+        valid = user is not None and await check_password(body.password, user.password)
+    except HashingBusy:
+        raise hashing_busy()
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password")
-    
-    access_token = create_access_token(data={"sub": str(user.id), "role": user.role})
-    refresh_token = create_refresh_token(data={"sub": str(user.id), "role": user.role})
-    
+
+    # Transparently upgrade hashes made with another AUTH_BCRYPT_ROUNDS
+    if needs_rehash(user.password):
+        try:
+            hashed = await hash_password(body.password)
+
+            def save():
+                db.query(User).filter_by(id=user.id).update({"password": hashed})
+                db.commit()
+
+            await run_in_threadpool(save)
+        except HashingBusy:
+            pass  # keep the old hash, retried on a later login
+
+    def issue():
+        # RS256 signing costs about a millisecond: off the event loop
+        claims = {"sub": str(user.id), "role": user.role}
+        return create_access_token(data=claims), create_refresh_token(data=claims)
+
+    access_token, refresh_token = await run_in_threadpool(issue)
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 # REFRESH
 @router.post("/refresh")
-def refresh_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def refresh_token(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Issue a new access token using a valid refresh token in Authorization header."""
+    rate_limiter.check(request, "refresh")
     token = credentials.credentials
     payload = verify_token(token, expected_type="refresh")
     if not payload:
@@ -112,6 +171,12 @@ def validate(credentials: HTTPAuthorizationCredentials = Depends(security)):
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     return {"valid": True, "sub": payload.get("sub"), "role": payload.get("role")}
 
+# PUBLIC SIGNING KEYS (JWKS) so other services can verify tokens locally
+# Empty with HS256: the shared secret is never published
+@router.get("/.well-known/jwks.json")
+def jwks():
+    return KEYS.jwks()
+
 # GET ALL USERS
 @router.get("/users")
 def get_all_users(db: Session = Depends(get_db)):
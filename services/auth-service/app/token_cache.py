@@ -0,0 +1,65 @@
+"""Bounded LRU cache of verified token payloads, keyed by token digest.
+
+Signature verification and claim parsing dominate ``verify_token``, and the
+same access token is presented many times during its life. An entry lives
+until the earlier of the token's ``exp`` and ``ttl`` seconds after caching,
+and is dropped as soon as the token is revoked.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class VerifiedTokenCache:
+    def __init__(self, max_size: int = 10000, ttl: int = 60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # digest -> (expires_at, payload)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest: str) -> Optional[Dict]:
+        if self.max_size <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return payload
+
+    def put(self, digest: str, payload: Dict) -> None:
+        if self.max_size <= 0:
+            return
+        expires_at = min(float(payload.get("exp", 0)), time.time() + self.ttl)
+        with self._lock:
+            self._entries[digest] = (expires_at, payload)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, digest: str) -> None:
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,106 @@
+"""Helpers shared by the auth-service benchmarks.
+
+Run benchmarks from the service directory, e.g.::
+
+    python -m benchmarks.revocation --revoked 1000000
+"""
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# benchmarks measure capacity, not admission control (see benchmarks/ratelimit.py)
+os.environ.setdefault("AUTH_RATE_LIMIT", "0")
+# benchmarks must never touch the real auth.db
+os.environ.setdefault(
+    "AUTH_DATABASE_URL",
+    "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="auth-bench-"), "auth.db"),
+)
+
+
+def percentile(ordered, p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def summary(samples) -> dict:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(percentile(ordered, 0.95), 3),
+        "p99_ms": round(percentile(ordered, 0.99), 3),
+    }
+
+
+def throughput(fn, seconds: float = 2.0) -> float:
+    """Calls per second of ``fn`` over roughly ``seconds``."""
+    calls = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            fn()
+        calls += 100
+    return calls / (time.perf_counter() - start)
+
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(port: int, env: dict, workers: int = 1, db_url: str = None) -> subprocess.Popen:
+    """Run auth-service under uvicorn (on a fresh database by default); wait for /health."""
+    import httpx
+
+    db_url = db_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="auth-bench-"), "auth.db")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=SERVICE_DIR,
+        env={**os.environ, "AUTH_DATABASE_URL": db_url, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline and proc.poll() is None:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("auth-service did not start")
+
+
+async def drive(http, next_request, requests: int, concurrency: int, warmup: int = 0) -> dict:
+    """Send ``requests`` requests from ``concurrency`` concurrent tasks.
+
+    ``next_request(i)`` returns ``(method, url, httpx kwargs)`` for request
+    ``i``; the first ``warmup`` are sent one by one and not measured.
+    """
+    for i in range(warmup):
+        method, url, kwargs = next_request(i)
+        await http.request(method, url, **kwargs)
+
+    latencies, statuses = [], {}
+    pending = iter(range(warmup, warmup + requests))
+
+    async def worker():
+        for i in pending:
+            method, url, kwargs = next_request(i)
+            t0 = time.perf_counter()
+            try:
+                status = str((await http.request(method, url, **kwargs)).status_code)
+            except Exception as exc:
+                status = type(exc).__name__
+            latencies.append((time.perf_counter() - t0) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    errors = sum(n for status, n in statuses.items() if not status.isdigit() or int(status) >= 400)
+    return {"requests": len(latencies), "errors": errors, "statuses": statuses, "seconds": round(elapsed, 3),
+            "req_s": round(len(latencies) / elapsed, 1), **summary(latencies)}
@@ -0,0 +1,106 @@
+"""/auth/validate latency while a storm of logins hits the same worker.
+
+Runs auth-service under uvicorn twice, hashing inline on the request threads
+(AUTH_HASH_WORKERS=0) and in the process pool, and reports validate latency
+percentiles measured before ("idle") and during the storm, plus how the
+logins were answered (status codes, or the exception of a failed request).
+
+Validate requests go through a client of their own, so they never queue
+behind the storm for a connection. Rate limiting is off (every login is the
+same account from the same IP), and the pool's queue (``AUTH_HASH_QUEUE``)
+holds ``--queue`` hashes, the concurrency by default, so that both modes
+serve every login; a smaller queue sheds the excess with 503. Pool processes share the CPUs with the
+server: on a host with fewer CPUs than that, validate slows down during the
+storm in either mode, the difference is in how much.
+"""
+import argparse
+import asyncio
+import collections
+import os
+import time
+
+import httpx
+
+from benchmarks.common import start_server, summary
+
+IDLE_SECONDS = 1.0
+
+
+async def validate_loop(http: httpx.AsyncClient, headers: dict, done: asyncio.Event) -> list:
+    samples = []
+    while not done.is_set():
+        t0 = time.perf_counter()
+        (await http.get("/auth/validate", headers=headers)).raise_for_status()
+        samples.append((time.perf_counter() - t0) * 1000)
+        await asyncio.sleep(0.01)
+    return samples
+
+
+async def storm(base_url: str, logins: int, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=300) as http, \
+            httpx.AsyncClient(base_url=base_url, timeout=300) as probe_http:
+        creds = {"email": "admin@university.com", "password": "admin123"}
+        token = (await probe_http.post("/auth/login", json=creds)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        done = asyncio.Event()
+        idle = asyncio.create_task(validate_loop(probe_http, headers, done))
+        await asyncio.sleep(IDLE_SECONDS)
+        done.set()
+        idle_samples = await idle
+
+        statuses = collections.Counter()
+        pending = asyncio.Semaphore(concurrency)
+
+        async def one_login():
+            async with pending:
+                try:
+                    statuses[(await http.post("/auth/login", json=creds)).status_code] += 1
+                except httpx.HTTPError as exc:
+                    statuses[type(exc).__name__] += 1
+
+        done = asyncio.Event()
+        probe = asyncio.create_task(validate_loop(probe_http, headers, done))
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one_login() for _ in range(logins)))
+        elapsed = time.perf_counter() - t0
+        done.set()
+        samples = await probe
+
+    return {
+        "storm_s": round(elapsed, 1),
+        "logins": dict(statuses),
+        "validate_idle": summary(idle_samples),
+        "validate": summary(samples),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=12, help="AUTH_BCRYPT_ROUNDS")
+    parser.add_argument("--queue", type=int, help="AUTH_HASH_QUEUE in pool mode (default: --concurrency)")
+    parser.add_argument("--port", type=int, default=8191)
+    args = parser.parse_args()
+
+    modes = (
+        ("inline", {"AUTH_HASH_WORKERS": "0"}),
+        ("pool", {"AUTH_HASH_WORKERS": str(os.cpu_count() or 1),
+                  "AUTH_HASH_QUEUE": str(args.queue or args.concurrency)}),
+    )
+    # a storm outlasts uvicorn's 5 s keep-alive, which would drop the idle connections
+    common = {"AUTH_BCRYPT_ROUNDS": str(args.rounds), "AUTH_RATE_LIMIT": "0", "UVICORN_TIMEOUT_KEEP_ALIVE": "300"}
+    for label, env in modes:
+        proc = start_server(args.port, {**common, **env})
+        try:
+            result = asyncio.run(storm(f"http://127.0.0.1:{args.port}", args.logins, args.concurrency))
+            print(f"{label:<7} {result}")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
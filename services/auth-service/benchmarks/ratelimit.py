@@ -0,0 +1,190 @@
+"""Cost of the rate limiter per request, and whether limits hold.
+
+- overhead: ``rate_limiter.check`` for a login (IP, email and route buckets)
+  with keys spread over ``--clients`` IPs and emails, on the memory, redis
+  (RESP stand-in, see benchmarks/resp_standin.py) and sql backends, for
+  granted and refused requests;
+- all or none: requests refused by one bucket must not spend the others;
+- shared: ``--processes`` processes drain one bucket of ``--capacity``
+  tokens together through each shared backend; exactly that many must be
+  granted.
+
+Exits 1 when a check fails, or when the memory backend or the ``--shared``
+backend (redis by default) costs more than ``--max-us`` per request. For
+redis that is the wall time against ``--redis-url``; against the stand-in,
+which runs in its own process but is Python and shares the CPU on small
+hosts, it is the CPU time the check costs the worker. SQL pays a database
+transaction per request; set ``AUTH_DB_PROFILE=wal`` to measure it as
+deployed.
+"""
+import argparse
+import math
+import multiprocessing
+import sys
+import time
+
+from sqlalchemy import create_engine
+from starlette.requests import Request
+
+from benchmarks.common import throughput
+from benchmarks.resp_standin import RespStandIn
+from app.database import Base, DATABASE_URL, engine
+from app.ratelimit import (
+    EMAIL,
+    IP,
+    ROUTE,
+    MemoryBucketStore,
+    RateLimiter,
+    RedisBucketStore,
+    SQLBucketStore,
+)
+
+# large enough that nothing is refused while measuring grants
+OPEN = {"login": {IP: (10**9, 1.0), EMAIL: (10**9, 1.0), ROUTE: (10**9, 1.0)}}
+# one token per hour: everything after the first request is refused
+CLOSED = {"login": {IP: (1, 3600.0), EMAIL: (1, 3600.0), ROUTE: (1, 3600.0)}}
+
+
+def gcra(server: RespStandIn, keys, argv):
+    """The stand-in's version of ``RedisBucketStore.SCRIPT``."""
+    now = float(argv[0])
+    tats, wait = [], 0.0
+    for i, key in enumerate(keys):
+        tat = max(float(server.get(key) or now), now) + float(argv[1 + 2 * i])
+        wait = max(wait, tat - now - float(argv[2 + 2 * i]))
+        tats.append(tat)
+    if wait > 1e-6:
+        return repr(wait)
+    for key, tat in zip(keys, tats):
+        server.set(key, repr(tat), "PX", str(math.ceil((tat - now) * 1000)))
+    return "0"
+
+
+def requests_for(clients: int):
+    return [
+        (Request({"type": "http", "headers": [], "client": (f"10.0.{i // 256}.{i % 256}", 40000)}),
+         f"user{i}@university.com")
+        for i in range(clients)
+    ]
+
+
+def per_request_us(limiter: RateLimiter, requests, seconds: float, refused: bool) -> tuple:
+    """Wall and CPU microseconds per check."""
+    i = 0
+
+    def one():
+        nonlocal i
+        request, email = requests[i % len(requests)]
+        i += 1
+        try:
+            limiter.check(request, "login", email=email)
+        except Exception:
+            if not refused:
+                raise
+
+    cpu = time.process_time()
+    wall = 1e6 / throughput(one, seconds)
+    return wall, (time.process_time() - cpu) * 1e6 / i
+
+
+def serve_standin(urls) -> None:
+    server = RespStandIn()
+    server.register_script(RedisBucketStore.SCRIPT, gcra)
+    urls.put(server.url)
+    server.serve_forever()
+
+
+def start_standin() -> str:
+    """A RESP stand-in in a process of its own, like a real server; its URL."""
+    urls = multiprocessing.Queue()
+    multiprocessing.Process(target=serve_standin, args=(urls,), daemon=True).start()
+    return urls.get()
+
+
+def all_or_none(store) -> bool:
+    """A request refused by its email bucket leaves its IP bucket untouched."""
+    now = time.time()
+    ip, email = ("check:ip", 1.0, 5.0), ("check:email", 3600.0, 3600.0)
+    store.take([email], now)
+    refused = sum(store.take([ip, email], now) > 0 for _ in range(20))
+    granted = sum(store.take([ip], now) == 0 for _ in range(10))
+    return refused == 20 and granted == 5
+
+
+def drain(make, capacity: int, attempts: int, granted) -> None:
+    store = make()
+    bucket = ("bench:shared", 3600.0 / capacity, 3600.0)
+    for _ in range(attempts):
+        if store.take([bucket], time.time()) == 0:
+            with granted.get_lock():
+                granted.value += 1
+
+
+def shared(make, processes: int, capacity: int) -> int:
+    granted = multiprocessing.Value("i", 0)
+    workers = [
+        multiprocessing.Process(target=drain, args=(make, capacity, capacity, granted))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return granted.value
+
+
+class Redis:
+    def __init__(self, url: str):
+        self.url = url
+
+    def __call__(self) -> RedisBucketStore:
+        return RedisBucketStore(self.url)
+
+
+class SQL:
+    def __call__(self) -> SQLBucketStore:
+        return SQLBucketStore(create_engine(DATABASE_URL))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=10_000)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--capacity", type=int, default=200)
+    parser.add_argument("--max-us", type=float, default=50.0)
+    parser.add_argument("--shared", choices=["redis", "sql"], default="redis")
+    parser.add_argument("--redis-url", help="a real server instead of the stand-in")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    backends = {"memory": MemoryBucketStore, "redis": Redis(args.redis_url or start_standin()), "sql": SQL()}
+
+    requests = requests_for(args.clients)
+    failed = False
+    for backend, make in backends.items():
+        granted, granted_cpu = per_request_us(RateLimiter(make(), OPEN), requests, args.seconds, refused=False)
+        refused, refused_cpu = per_request_us(RateLimiter(make(), CLOSED), requests[:1], args.seconds,
+                                              refused=True)
+        atomic = all_or_none(make())
+        print(f"{backend:<7} granted {granted:8.1f} us/request ({granted_cpu:6.1f} cpu)   "
+              f"refused {refused:8.1f} us/request ({refused_cpu:6.1f} cpu)   "
+              f"all or none: {'ok' if atomic else 'FAILED'}")
+        failed = failed or not atomic
+        if backend in ("memory", args.shared):
+            on_cpu = backend == "redis" and not args.redis_url
+            cost = max(granted_cpu, refused_cpu) if on_cpu else max(granted, refused)
+            if cost > args.max_us:
+                print(f"  above {args.max_us} us per request{' of cpu' if on_cpu else ''}")
+                failed = True
+
+    for backend in ("redis", "sql"):
+        total = shared(backends[backend], args.processes, args.capacity)
+        print(f"shared {backend} bucket of {args.capacity}: {args.processes} processes x {args.capacity} "
+              f"attempts, {total} granted")
+        failed = failed or total != args.capacity
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""In-process stand-in for a Redis server, speaking just enough RESP for the
+shared auth-service backends (PING, GET, SET [EX|PX], EXISTS, DEL, INCR,
+EXPIRE, EVAL, EVALSHA).
+
+It has no Lua: ``EVAL`` runs the Python function registered for that exact
+script with ``register_script``, and ``EVALSHA`` knows the scripts loaded so.
+
+    server = RespStandIn(); server.start()
+    client = RespClient(server.url)
+"""
+import hashlib
+import socketserver
+import threading
+import time
+
+
+class RespStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port: int = 0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.data = {}  # key -> (value, expires_at or None)
+        self.lock = threading.Lock()
+        self.scripts = {}  # sha1 -> fn(server, keys, argv), by register_script
+        self.loaded = set()
+
+    def register_script(self, source: str, fn) -> None:
+        self.scripts[hashlib.sha1(source.encode()).hexdigest()] = fn
+
+    @property
+    def url(self) -> str:
+        return f"redis://127.0.0.1:{self.server_address[1]}/0"
+
+    def start(self) -> "RespStandIn":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def get(self, key):
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.time():
+            self.data.pop(key, None)
+            return None
+        return value
+
+    def set(self, key, value, *options):
+        ttl = None
+        if len(options) >= 2 and options[0].upper() in ("EX", "PX"):
+            ttl = float(options[1]) / (1 if options[0].upper() == "EX" else 1000)
+        self.data[key] = (value, time.time() + ttl if ttl else None)
+
+    def execute(self, args):
+        cmd = args[0].upper()
+        with self.lock:
+            if cmd == "PING":
+                return "+PONG"
+            if cmd == "SELECT":
+                return "+OK"
+            if cmd == "GET":
+                return self.get(args[1])
+            if cmd == "SET":
+                self.set(*args[1:])
+                return "+OK"
+            if cmd == "EXISTS":
+                return sum(self.get(k) is not None for k in args[1:])
+            if cmd == "DEL":
+                return sum(self.data.pop(k, None) is not None for k in args[1:])
+            if cmd == "INCR":
+                value = int(self.get(args[1]) or 0) + 1
+                expires_at = self.data.get(args[1], (None, None))[1]
+                self.data[args[1]] = (str(value), expires_at)
+                return value
+            if cmd == "EXPIRE":
+                if self.get(args[1]) is None:
+                    return 0
+                self.data[args[1]] = (self.data[args[1]][0], time.time() + int(args[2]))
+                return 1
+            if cmd in ("EVAL", "EVALSHA"):
+                sha = hashlib.sha1(args[1].encode()).hexdigest() if cmd == "EVAL" else args[1]
+                if sha not in self.scripts or (cmd == "EVALSHA" and sha not in self.loaded):
+                    return RuntimeError("NOSCRIPT No matching script")
+                self.loaded.add(sha)
+                count = int(args[2])
+                return self.scripts[sha](self, args[3:3 + count], args[3 + count:])
+        return RuntimeError(f"ERR unknown command '{cmd}'")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            count = int(line[1:-2])
+            args = []
+            for _ in range(count):
+                size = int(self.rfile.readline()[1:-2])
+                args.append(self.rfile.read(size + 2)[:-2].decode())
+            self.wfile.write(_encode(self.server.execute(args)))
+
+
+def _encode(reply) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, RuntimeError):
+        return b"-%s\r\n" % str(reply).encode()
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, str) and reply.startswith("+"):
+        return reply.encode() + b"\r\n"
+    data = str(reply).encode()
+    return b"$%d\r\n%s\r\n" % (len(data), data)
@@ -0,0 +1,68 @@
+"""verify_token throughput with N revoked tokens in each revocation backend."""
+import argparse
+import time
+import uuid
+
+from benchmarks.common import throughput
+from benchmarks.resp_standin import RespStandIn
+from sqlalchemy import create_engine
+
+from app import jwt_handler
+from app.database import DATABASE_URL
+from app.models import RevokedToken
+from app.revocation import MemoryRevocationStore, RedisRevocationStore, SQLRevocationStore
+
+
+def fill_memory(count: int, exp: int) -> MemoryRevocationStore:
+    store = MemoryRevocationStore()
+    for _ in range(count):
+        store.revoke(uuid.uuid4().hex, exp)
+    return store
+
+
+def fill_sql(count: int, exp: int) -> SQLRevocationStore:
+    store = SQLRevocationStore(create_engine(DATABASE_URL))
+    table = RevokedToken.__table__
+    # created by app/bootstrap.py in the service
+    table.create(bind=store.engine, checkfirst=True)
+    with store.engine.begin() as conn:
+        conn.execute(table.delete())
+        for start in range(0, count, 50_000):
+            rows = [{"jti": uuid.uuid4().hex, "expires_at": exp} for _ in range(min(50_000, count - start))]
+            conn.execute(table.insert(), rows)
+    return store
+
+
+def fill_redis(count: int, exp: int) -> RedisRevocationStore:
+    server = RespStandIn().start()
+    # load the stand-in directly: a million round trips would only time the loader
+    server.data.update((f"revoked:{uuid.uuid4().hex}", ("1", exp)) for _ in range(count))
+    return RedisRevocationStore(server.url)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--revoked", type=int, default=1_000_000)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    exp = int(time.time()) + 3600
+    live = jwt_handler.create_access_token({"sub": "1", "role": "ADMIN"})
+    revoked = jwt_handler.create_access_token({"sub": "2", "role": "ADMIN"})
+
+    for name, fill in (("memory", fill_memory), ("sql", fill_sql), ("redis", fill_redis)):
+        t0 = time.perf_counter()
+        jwt_handler._revoked = fill(args.revoked, exp)
+        loaded = time.perf_counter() - t0
+        jwt_handler.add_to_blacklist(revoked)
+        assert jwt_handler.verify_token(live) and not jwt_handler.verify_token(revoked)
+        ok = throughput(lambda: jwt_handler.verify_token(live), args.seconds)
+        rejected = throughput(lambda: jwt_handler.verify_token(revoked), args.seconds)
+        print(
+            f"{name:<7} {args.revoked} revoked (loaded in {loaded:.1f}s): "
+            f"valid {ok:,.0f} verify/s, revoked {rejected:,.0f} verify/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Startup time: from a fresh interpreter to the first answered request.
+
+Each run starts a new process and measures, for a fresh database (tables
+and default accounts created on startup) and an already bootstrapped one:
+
+- inprocess: ``import app.main``, the startup hooks, then ``GET /health``
+  sent straight to the ASGI app; the child reports each step;
+- uvicorn: ``python run.py`` until ``/health`` answers over HTTP.
+
+With ``--max-ms`` the exit status is 1 when a median total is above that
+budget, so CI can catch a slow import creeping back in:
+
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --modes inprocess --max-ms 1500
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import SERVICE_DIR
+
+MODES = ("inprocess", "uvicorn")
+
+
+async def _first_request(app):
+    """Run the startup hooks, send GET /health, shut down; returns when the
+    startup completed and the response status."""
+    lifespan = asyncio.Queue()
+    events = asyncio.Queue()
+    await lifespan.put({"type": "lifespan.startup"})
+    task = asyncio.ensure_future(app({"type": "lifespan", "asgi": {"version": "3.0"}}, lifespan.get, events.put))
+    message = await events.get()
+    if message["type"] != "lifespan.startup.complete":
+        raise RuntimeError(message.get("message", "startup failed"))
+    started = time.perf_counter()
+
+    response = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        response.append(message)
+
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": "/health", "raw_path": b"/health", "query_string": b"",
+             "root_path": "", "headers": [(b"host", b"startup")], "client": ("127.0.0.1", 0),
+             "server": ("startup", 80)}
+    await app(scope, receive, send)
+    await lifespan.put({"type": "lifespan.shutdown"})
+    await task
+    return started, response[0]["status"]
+
+
+def child() -> None:
+    """Runs in the measured process; prints the step timings as JSON."""
+    start = time.perf_counter()
+    from app.main import app
+
+    imported = time.perf_counter()
+    started, status = asyncio.run(_first_request(app))
+    answered = time.perf_counter()
+    print(json.dumps({
+        "status": status,
+        "import_ms": round((imported - start) * 1000, 1),
+        "startup_ms": round((started - imported) * 1000, 1),
+        "first_request_ms": round((answered - started) * 1000, 1),
+    }))
+
+
+def run_inprocess(db_url: str) -> dict:
+    begin = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child"],
+        cwd=SERVICE_DIR, env={**os.environ, "AUTH_DATABASE_URL": db_url},
+        check=True, capture_output=True, text=True,
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["total_ms"] = round((time.perf_counter() - begin) * 1000, 1)
+    return result
+
+
+def run_uvicorn(db_url: str, port: int) -> dict:
+    import httpx
+
+    begin = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "run.py", "--port", str(port), "--host", "127.0.0.1", "--log-level", "warning"],
+        cwd=SERVICE_DIR, env={**os.environ, "AUTH_DATABASE_URL": db_url},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while proc.poll() is None:
+            try:
+                status = httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code
+                return {"status": status, "total_ms": round((time.perf_counter() - begin) * 1000, 1)}
+            except httpx.HTTPError:
+                time.sleep(0.005)
+        raise RuntimeError("auth-service did not start")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--port", type=int, default=8194)
+    parser.add_argument("--max-ms", type=float, help="fail when a median total_ms is above this")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return 0
+
+    over = []
+    for mode in args.modes:
+        for database in ("fresh", "bootstrapped"):
+            totals = []
+            for _ in range(args.runs):
+                directory = tempfile.mkdtemp(prefix="auth-startup-")
+                db_url = "sqlite:///" + os.path.join(directory, "auth.db")
+                if database == "bootstrapped":
+                    run_inprocess(db_url)
+                result = run_inprocess(db_url) if mode == "inprocess" else run_uvicorn(db_url, args.port)
+                shutil.rmtree(directory)
+                if result["status"] != 200:
+                    raise RuntimeError(f"/health answered {result['status']}")
+                print(json.dumps({"mode": mode, "database": database, **result}))
+                totals.append(result["total_ms"])
+            median = statistics.median(totals)
+            print(f"{mode:<10} {database:<13} median {median:8.1f} ms")
+            if args.max_ms is not None and median > args.max_ms:
+                over.append(f"{mode}/{database}")
+    if over:
+        print(f"over the {args.max_ms} ms budget: {', '.join(over)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
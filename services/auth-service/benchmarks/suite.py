@@ -0,0 +1,188 @@
+"""End-to-end benchmark suite for auth-service.
+
+Seeds ``auth.db`` with ``--users`` synthetic accounts (one per student,
+all sharing one precomputed bcrypt hash), then drives each scenario against
+``app.main:app`` in-process (httpx ASGI transport, no network) and over
+uvicorn:
+
+- login_storm: logins spread over the seeded accounts (bcrypt bound); the
+  hash queue (``AUTH_HASH_QUEUE``) is as deep as ``--concurrency`` so that
+  every login waits for its hash instead of being shed with 503, which is
+  what ``benchmarks.login_storm`` measures;
+- validate_heavy: what the gateway sends on every request, mostly
+  ``/auth/validate`` with some ``/auth/me`` and ``/auth/refresh``.
+
+Seeded databases are kept in ``--data-dir`` and reused; every scenario runs
+on a fresh copy. Rate limiting is off (``AUTH_RATE_LIMIT=0``): every
+request comes from 127.0.0.1, and its cost is measured by
+``benchmarks.ratelimit``. Results (req/s, p50/p95/p99) are printed and, with
+``--output``, written as JSON for ``services/benchmarks/run.py``, which
+compares them against the stored baseline.
+
+    python -m benchmarks.suite --users 10000 100000 --output results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+
+import bcrypt
+import httpx
+from sqlalchemy import create_engine, insert
+
+from benchmarks.common import drive, start_server
+
+SERVICE = "auth-service"
+MODES = ("inprocess", "uvicorn")
+PASSWORD = "password123"
+# accounts logged in up front for validate_heavy
+TOKEN_USERS = 50
+
+os.environ.setdefault("AUTH_DB_PROFILE", "wal")
+os.environ.setdefault("AUTH_RATE_LIMIT", "0")
+
+
+def login_body(rnd: random.Random, users: int) -> dict:
+    return {"email": f"user{rnd.randint(1, users)}@university.com", "password": PASSWORD}
+
+
+async def login_storm(http, users: int):
+    rnd = random.Random(1)
+
+    def next_request(i: int):
+        return "POST", "/auth/login", {"json": login_body(rnd, users)}
+
+    return next_request
+
+
+async def validate_heavy(http, users: int):
+    rnd = random.Random(2)
+    tokens = []
+    for _ in range(TOKEN_USERS):
+        r = await http.post("/auth/login", json=login_body(rnd, users))
+        r.raise_for_status()
+        tokens.append(r.json())
+
+    def next_request(i: int):
+        token = rnd.choice(tokens)
+        roll = rnd.random()
+        if roll < 0.85:
+            return "GET", "/auth/validate", {"headers": {"Authorization": f"Bearer {token['access_token']}"}}
+        if roll < 0.95:
+            return "GET", "/auth/me", {"headers": {"Authorization": f"Bearer {token['access_token']}"}}
+        return "POST", "/auth/refresh", {"headers": {"Authorization": f"Bearer {token['refresh_token']}"}}
+
+    return next_request
+
+
+SCENARIOS = {"login_storm": login_storm, "validate_heavy": validate_heavy}
+
+
+def seeded_database(data_dir: str, users: int, rounds: int) -> str:
+    """Path of a seeded ``auth.db`` with ``users`` accounts, built once."""
+    path = os.path.join(data_dir, f"{users}-{rounds}", "auth.db")
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    building = path + ".building"
+    from app.database import Base
+    from app.models import User
+
+    engine = create_engine("sqlite:///" + building)
+    Base.metadata.create_all(bind=engine)
+    hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds)).decode()
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        for start in range(1, users + 1, 10000):
+            conn.execute(insert(User), [
+                {"email": f"user{i}@university.com", "password": hashed, "full_name": f"User {i}",
+                 "role": "ETUDIANT", "is_active": 1, "created_at": now, "updated_at": now}
+                for i in range(start, min(start + 10000, users + 1))
+            ])
+    engine.dispose()
+    os.replace(building, path)
+    return path
+
+
+def load_app(db_url: str):
+    os.environ["AUTH_DATABASE_URL"] = db_url
+    for name in [m for m in sys.modules if m == "app" or m.startswith("app.")]:
+        del sys.modules[name]
+    from app.main import app
+    from app import hashing
+    from app.database import engine
+
+    return app, engine, hashing
+
+
+async def run_inprocess(db_url: str, scenario, users: int, requests: int, concurrency: int) -> dict:
+    app, engine, hashing = load_app(db_url)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as http:
+            next_request = await scenario(http, users)
+            return await drive(http, next_request, requests, concurrency, warmup=min(50, requests // 10))
+    finally:
+        hashing.shutdown()
+        engine.dispose()
+
+
+async def run_uvicorn(db_url: str, scenario, users: int, requests: int, concurrency: int, port: int) -> dict:
+    proc = start_server(port, {}, db_url=db_url)
+    try:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=300) as http:
+            next_request = await scenario(http, users)
+            return await drive(http, next_request, requests, concurrency, warmup=min(50, requests // 10))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def run(args) -> list:
+    os.environ["AUTH_BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    os.environ.setdefault("AUTH_HASH_QUEUE", str(args.concurrency))
+    results = []
+    for users in args.users:
+        template = seeded_database(args.data_dir, users, args.bcrypt_rounds)
+        for name in args.scenarios:
+            requests = args.login_requests if name == "login_storm" else args.requests
+            for mode in args.modes:
+                db_path = os.path.join(tempfile.mkdtemp(prefix="auth-bench-"), "auth.db")
+                shutil.copy(template, db_path)
+                db_url = "sqlite:///" + db_path
+                if mode == "inprocess":
+                    result = asyncio.run(run_inprocess(db_url, SCENARIOS[name], users, requests, args.concurrency))
+                else:
+                    result = asyncio.run(run_uvicorn(db_url, SCENARIOS[name], users, requests,
+                                                     args.concurrency, args.port))
+                record = {"service": SERVICE, "scenario": name, "mode": mode, "size": users,
+                          "concurrency": args.concurrency, **result}
+                print(json.dumps(record))
+                results.append(record)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, nargs="+", default=[10_000])
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--login-requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--bcrypt-rounds", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8193)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "auth-bench-data"))
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
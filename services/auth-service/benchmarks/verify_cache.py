@@ -0,0 +1,27 @@
+"""verify_token throughput with the verified-token cache off and on."""
+import argparse
+import random
+
+from benchmarks.common import throughput
+
+from app import jwt_handler
+from app.token_cache import VerifiedTokenCache
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=1000, help="distinct live tokens presented")
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    tokens = [jwt_handler.create_access_token({"sub": str(i), "role": "ETUDIANT"}) for i in range(args.tokens)]
+    rnd = random.Random(1)
+
+    for label, size in (("no cache", 0), ("cache", 10000)):
+        jwt_handler.token_cache = VerifiedTokenCache(max_size=size)
+        rate = throughput(lambda: jwt_handler.verify_token(rnd.choice(tokens), "access"), args.seconds)
+        print(f"{label:<9} {rate:>10,.0f} verify/s  {jwt_handler.token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
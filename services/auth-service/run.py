@@ -1,9 +1,84 @@
-#!/home/mehdi/Documents/lsi3/SOA/services/auth-service/venv/bin/python3
+#!/usr/bin/env python3
 """
 Run auth-service on port 8001
 Execute: ./run.py or python3 run.py
+
+Production launcher: ``--workers`` processes (``AUTH_WORKERS``, ``auto`` =
+one per CPU), uvloop and httptools when they are installed, and graceful
+shutdown (in-flight requests get ``--graceful-timeout`` seconds on SIGTERM).
+The app is preloaded here before any worker starts: an import error fails
+the launch once, and tables are created and default users seeded once
+(``app/bootstrap.py``), so workers start against a ready database and skip
+that step. ``--reload`` is for development (one process, file watcher).
+
+With several workers, revoked tokens and rate-limit buckets default to the
+shared ``sql`` stores (``AUTH_REVOCATION_BACKEND``,
+``AUTH_RATE_LIMIT_BACKEND``): the per-process ``memory`` stores would let a
+token logged out on one worker through on the others, and let N workers
+admit N times the configured rate.
+
+    python run.py --workers 4
+    python run.py --reload
 """
+import argparse
+import os
+
 import uvicorn
 
+APP = "app.main:app"
+
+
+def worker_count(value: str) -> int:
+    return (os.cpu_count() or 1) if value == "auto" else int(value)
+
+
+def preload():
+    # bootstrapped once here: neither the app below nor the workers do it on startup
+    os.environ["AUTH_BOOTSTRAP"] = "0"
+    from app.bootstrap import bootstrap
+    from app.database import engine
+    from app.main import app
+
+    bootstrap()
+    # workers open their own connections
+    engine.dispose()
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("AUTH_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("AUTH_PORT", "8001")))
+    parser.add_argument("--workers", default=os.getenv("AUTH_WORKERS", "1"), help='number or "auto"')
+    parser.add_argument("--loop", choices=["auto", "asyncio", "uvloop"], default=os.getenv("AUTH_LOOP", "auto"))
+    parser.add_argument("--http", choices=["auto", "h11", "httptools"], default=os.getenv("AUTH_HTTP", "auto"))
+    parser.add_argument("--graceful-timeout", type=float, default=float(os.getenv("AUTH_GRACEFUL_TIMEOUT", "30")))
+    parser.add_argument("--log-level", default=os.getenv("AUTH_LOG_LEVEL", "info"))
+    parser.add_argument("--reload", action="store_true", help="development only")
+    args = parser.parse_args()
+
+    if args.reload:
+        uvicorn.run(APP, host=args.host, port=args.port, reload=True, log_level=args.log_level)
+        return
+    workers = worker_count(args.workers)
+    if workers > 1:
+        # read by every worker when it imports the app: revocations and rate
+        # limits must be shared, or each worker would enforce its own
+        os.environ.setdefault("AUTH_REVOCATION_BACKEND", "sql")
+        os.environ.setdefault("AUTH_RATE_LIMIT_BACKEND", "sql")
+    app = preload()
+    uvicorn.run(
+        # a single worker serves the preloaded app; several re-import it by name
+        app if workers == 1 else APP,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=args.loop,
+        http=args.http,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        log_level=args.log_level,
+    )
+
+
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8001, reload=True)
+    main()
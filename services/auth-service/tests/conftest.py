@@ -0,0 +1,28 @@
+"""The deterministic checks in benchmarks/, run by pytest.
+
+Each test runs one of them as ``python -m benchmarks.<name>`` from the
+service directory, in a process of its own (the checks set ``AUTH_*``
+variables and time fresh imports), and passes when it exits 0.
+
+    python -m pytest tests
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def run_check():
+    def run(name: str, *args: str, timeout: float = 600) -> str:
+        result = subprocess.run(
+            [sys.executable, "-m", f"benchmarks.{name}", *args],
+            cwd=SERVICE_DIR, capture_output=True, text=True, timeout=timeout,
+        )
+        assert result.returncode == 0, result.stdout + result.stderr
+        return result.stdout
+
+    return run
@@ -0,0 +1,34 @@
+"""Importing the app must not touch the database (tables and default users
+are created at startup or by ``python -m app.bootstrap``)."""
+import os
+import subprocess
+import sys
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# run in a fresh interpreter: the settings are read at import time
+IMPORT_APP = """
+import os, sys
+from sqlalchemy import event
+import app.database as database
+statements = []
+event.listen(database.engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+import app.main
+assert statements == [], statements
+assert not os.path.exists(sys.argv[1]), "database file created"
+"""
+
+
+def test_import_has_no_database_side_effects(tmp_path):
+    db = tmp_path / "auth.db"
+    env = {
+        **os.environ,
+        "AUTH_DATABASE_URL": f"sqlite:///{db}",
+        "AUTH_REVOCATION_BACKEND": "sql",
+        "AUTH_RATE_LIMIT_BACKEND": "sql",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_APP, str(db)],
+        cwd=SERVICE_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
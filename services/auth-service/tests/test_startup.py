@@ -0,0 +1,9 @@
+import os
+
+# from a fresh interpreter to the first answered request; slower CI hosts
+# can raise it
+BUDGET_MS = os.getenv("AUTH_STARTUP_BUDGET_MS", "1500")
+
+
+def test_startup_within_budget(run_check):
+    run_check("startup", "--modes", "inprocess", "--runs", "1", "--max-ms", BUDGET_MS)
@@ -0,0 +1,143 @@
+"""Run the auth-service and student-service benchmark suites and check for regressions.
+
+Each service's ``benchmarks/suite.py`` runs in its own interpreter (both
+services are the ``app`` package), from its service directory. Results are
+merged into one JSON file and compared with the stored baseline: a scenario
+regresses when its successful req/s (responses below 400; a fast 503 is not
+throughput) drops by more than ``--tolerance``, its p95
+latency grows by more than ``--latency-tolerance`` (tail latency is noisier)
+or its error rate grows by more than ``--error-tolerance``. The exit status
+is 1 if anything regressed.
+
+    python services/benchmarks/run.py                      # compare with baseline.json
+    python services/benchmarks/run.py --update-baseline    # record a new baseline
+
+Baselines only compare runs on the same machine and settings; record one on
+the machine that runs the check.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SERVICES = os.path.dirname(HERE)
+BASELINE = os.path.join(HERE, "baseline.json")
+
+
+def run_suite(service: str, args: list) -> list:
+    fd, output = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.suite", *args, "--output", output],
+            cwd=os.path.join(SERVICES, service),
+            check=True,
+        )
+        with open(output) as f:
+            return json.load(f)
+    finally:
+        os.remove(output)
+
+
+def key(result: dict) -> str:
+    return f"{result['service']}/{result['scenario']}/{result['mode']}/{result['size']}"
+
+
+def error_rate(result: dict) -> float:
+    return result["errors"] / result["requests"] if result["requests"] else 0.0
+
+
+def ok_req_s(result: dict) -> float:
+    return round(result["req_s"] * (1 - error_rate(result)), 1)
+
+
+def compare(results: list, baseline: dict, tolerance: float, latency_tolerance: float, error_tolerance: float) -> list:
+    """Print each result next to its baseline; return the regressed keys."""
+    previous = {key(r): r for r in baseline["results"]}
+    regressions = []
+    print(f"{'scenario':<52} {'ok req/s':>9} {'base':>9} {'p95 ms':>9} {'base':>9}  status")
+    for result in results:
+        base = previous.get(key(result))
+        if base is None:
+            print(f"{key(result):<52} {ok_req_s(result):>9} {'-':>9} {result['p95_ms']:>9} {'-':>9}  new")
+            continue
+        problems = []
+        if ok_req_s(result) < ok_req_s(base) * (1 - tolerance):
+            problems.append("throughput")
+        if result["p95_ms"] > base["p95_ms"] * (1 + latency_tolerance):
+            problems.append("p95")
+        if error_rate(result) > error_rate(base) + error_tolerance:
+            problems.append("errors")
+        if problems:
+            regressions.append(key(result))
+        print(f"{key(result):<52} {ok_req_s(result):>9} {ok_req_s(base):>9} {result['p95_ms']:>9} {base['p95_ms']:>9}"
+              f"  {'REGRESSED (' + ', '.join(problems) + ')' if problems else 'ok'}")
+    return regressions
+
+
+def machine() -> dict:
+    return {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000],
+                        help="students seeded in students.db, and accounts in auth.db")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--modes", nargs="+", choices=["inprocess", "uvicorn"], default=["inprocess", "uvicorn"])
+    parser.add_argument("--services", nargs="+", choices=["auth-service", "student-service"],
+                        default=["auth-service", "student-service"])
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed drop of successful req/s")
+    parser.add_argument("--latency-tolerance", type=float, default=0.5, help="allowed p95 growth")
+    parser.add_argument("--error-tolerance", type=float, default=0.05, help="allowed error rate growth")
+    args = parser.parse_args()
+
+    common = ["--requests", str(args.requests), "--concurrency", str(args.concurrency), "--modes", *args.modes]
+    results = []
+    if "auth-service" in args.services:
+        results += run_suite("auth-service", ["--users", *map(str, args.sizes), *common])
+    if "student-service" in args.services:
+        results += run_suite("student-service", ["--sizes", *map(str, args.sizes), *common])
+
+    run = {
+        "meta": {"date": datetime.now(timezone.utc).isoformat(timespec="seconds"), "machine": machine(),
+                 "requests": args.requests, "concurrency": args.concurrency},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(run, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"baseline updated: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; record one with --update-baseline")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline["meta"].get("machine") != run["meta"]["machine"]:
+        print(f"warning: baseline recorded on {baseline['meta'].get('machine')}")
+    for setting in ("requests", "concurrency"):
+        if baseline["meta"].get(setting) != run["meta"][setting]:
+            print(f"warning: baseline recorded with {setting}={baseline['meta'].get(setting)}")
+    regressions = compare(results, baseline, args.tolerance, args.latency_tolerance, args.error_tolerance)
+    if regressions:
+        print(f"{len(regressions)} regression(s)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import and_, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import Student
+from app.schemas import StudentCreate, StudentOut
+from app.outbox import CREATED, STUDENT, record_changes
+from app.search import index_many
+from app.stats import adjust
+
+# Rows validated and inserted per transaction during a bulk import
+CHUNK_SIZE = 1000
+# Rows fetched per round trip while exporting
+EXPORT_BATCH = 1000
+
+NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+CSV_TYPES = {"text/csv", "application/csv"}
+
+# Export columns, in StudentOut order, so an export can be re-imported as is
+EXPORT_COLUMNS = ["id"] + [name for name in StudentOut.model_fields if name != "id"]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a streamed request body into decoded lines, line endings kept."""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig") + "\n"
+    if pending:
+        yield pending.decode("utf-8-sig")
+
+
+async def csv_records(lines: AsyncIterator[str]) -> AsyncIterator[List[str]]:
+    """Group lines into CSV records: a line that leaves a quoted field open
+    (odd number of quotes so far) continues on the next one, as ``to_csv``
+    writes fields holding newlines."""
+    pending = []
+    quotes = 0
+    async for line in lines:
+        pending.append(line)
+        quotes += line.count('"')
+        if quotes % 2 == 0:
+            yield pending
+            pending, quotes = [], 0
+    if pending:
+        yield pending
+
+
+async def iter_records(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield ``(row_number, record, parse_error)`` for each non-blank record.
+
+    CSV input needs a header line; quoted fields may span lines.
+    """
+    header = None
+    row = 0
+    async for text in csv_records(lines) if fmt == "csv" else lines:
+        if not "".join(text).strip():
+            continue
+        if fmt == "csv" and header is None:
+            header = next(csv.reader(text))
+            continue
+        row += 1
+        try:
+            if fmt == "csv":
+                values = next(csv.reader(text))
+                if len(values) != len(header):
+                    raise ValueError(f"expected {len(header)} columns, got {len(values)}")
+                # empty cells mean "not provided"
+                record = {k: v for k, v in zip(header, values) if v != ""}
+            else:
+                record = json.loads(text)
+                if not isinstance(record, dict):
+                    raise ValueError("expected a JSON object")
+            yield row, record, None
+        except (ValueError, csv.Error) as e:
+            yield row, None, str(e)
+
+
+def validate(record: dict) -> Tuple[Optional[StudentCreate], Optional[str]]:
+    try:
+        return StudentCreate(**record), None
+    except ValidationError as e:
+        first = e.errors()[0]
+        field = ".".join(str(p) for p in first["loc"])
+        return None, f"{field}: {first['msg']}" if field else first["msg"]
+
+
+def insert_chunk(
+    db: Session,
+    chunk: List[Tuple[int, StudentCreate]],
+    seen_emails: set,
+    seen_matricules: set,
+) -> Tuple[int, List[Dict]]:
+    """Insert one chunk in a single transaction; return ``(inserted, errors)``.
+
+    Uniqueness against the table is checked with one ``IN`` query per column,
+    and against earlier rows of the same import through ``seen_*``.
+    """
+    emails = [s.email for _, s in chunk]
+    matricules = [s.matricule for _, s in chunk]
+    taken_emails = set(db.scalars(
+        select(Student.email).where(and_(Student.email.in_(emails), Student.deleted_at.is_(None)))
+    ))
+    taken_matricules = set(db.scalars(
+        select(Student.matricule).where(and_(Student.matricule.in_(matricules), Student.deleted_at.is_(None)))
+    ))
+
+    errors = []
+    rows = []
+    for row, student in chunk:
+        if student.email in taken_emails or student.email in seen_emails:
+            errors.append({"row": row, "error": "Email already exists"})
+        elif student.matricule in taken_matricules or student.matricule in seen_matricules:
+            errors.append({"row": row, "error": "Matricule already exists"})
+        else:
+            seen_emails.add(student.email)
+            seen_matricules.add(student.matricule)
+            rows.append((row, student.dict()))
+    if not rows:
+        return 0, errors
+
+    try:
+        created = _insert(db, [data for _, data in rows])
+        db.commit()
+    except IntegrityError:
+        # a constraint the pre-checks can't see (or a concurrent writer):
+        # retry row by row so only the offending rows are rejected
+        db.rollback()
+        created = []
+        for row, data in rows:
+            try:
+                with db.begin_nested():
+                    created.extend(_insert(db, [data]))
+            except IntegrityError:
+                errors.append({"row": row, "error": "Email or matricule already exists"})
+        db.commit()
+    return len(created), sorted(errors, key=lambda e: e["row"])
+
+
+def _insert(db: Session, rows: List[dict]) -> list:
+    """executemany INSERT that also indexes, counts and records the new rows."""
+    created = db.execute(
+        insert(Student).returning(
+            Student.id, Student.fullname, Student.nom, Student.prenom, Student.matricule,
+            sort_by_parameter_order=True,
+        ),
+        rows,
+    ).all()
+    index_many(db, created)
+    adjust(db, added=rows)
+    record_changes(db, CREATED, STUDENT, [{**data, "id": c.id} for c, data in zip(created, rows)])
+    return created
+
+
+def export_rows(db: Session, filters) -> Iterator[dict]:
+    """Stream active students as plain dicts, ``EXPORT_BATCH`` rows at a time."""
+    stmt = (
+        select(*(Student.__table__.c[name] for name in EXPORT_COLUMNS))
+        .where(Student.deleted_at.is_(None), *filters)
+        .order_by(Student.id)
+        .execution_options(stream_results=True, yield_per=EXPORT_BATCH)
+    )
+    for row in db.execute(stmt):
+        yield row._asdict()
+
+
+def to_ndjson(rows: Iterator[dict]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row, default=str, ensure_ascii=False) + "\n"
+
+
+def to_csv(rows: Iterator[dict]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for i, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if i % EXPORT_BATCH == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
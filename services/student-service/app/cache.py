@@ -0,0 +1,189 @@
+"""In-process cache of serialized read responses with strong ETags.
+
+``GET /students/{id}``, ``GET /students/{id}/history`` and the filtered
+``GET /students`` list are cached as ready-to-send JSON bytes. Entries are
+evicted least-recently-used beyond ``STUD_CACHE_MAX_ENTRIES`` entries or
+``STUD_CACHE_MAX_BYTES`` bytes, and expire after ``STUD_CACHE_TTL_SECONDS``
+(the cache is per process: the TTL bounds how long a write made through
+another worker can go unnoticed). Write routes invalidate what they touch.
+
+A request whose ``If-None-Match`` matches the cached ETag gets a 304 without
+any database access. ``STUD_CACHE_MAX_ENTRIES=0`` disables the cache.
+Concurrent misses for the same key are built once (app/singleflight.py).
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.singleflight import SINGLE_FLIGHT, SingleFlight
+
+# tag carried by every cached list page, dropped on any student write
+LISTS = "lists"
+
+
+def student_key(student_id: int) -> str:
+    return f"student:{student_id}"
+
+
+def history_key(student_id: int) -> str:
+    return f"history:{student_id}"
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires: compressed responses carry
+    ``W/"<etag>"`` (see app/compression.py)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (t.strip().removeprefix("W/") for t in header.split(","))
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "headers", "tags", "expires_at")
+
+    def __init__(self, body: bytes, headers: Dict[str, str], tags: Iterable[str], ttl: float):
+        self.body = body
+        self.etag = make_etag(body)
+        self.headers = headers
+        self.tags = frozenset(tags)
+        self.expires_at = time.monotonic() + ttl
+
+    def to_response(self, request: Request) -> Response:
+        headers = {**self.headers, "ETag": self.etag}
+        if etag_matches(request, self.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 30,
+        single_flight: bool = True,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # bumped by every invalidation; a response built across one isn't stored
+        self._epoch = 0
+        self.flights = SingleFlight(enabled=single_flight)
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: CachedResponse, epoch: int) -> None:
+        if len(entry.body) > self.max_bytes:
+            return
+        with self._lock:
+            if epoch != self._epoch:
+                return  # a write happened while this response was being built
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._bytes += len(entry.body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+    def invalidate(self, *keys: str, tags: Iterable[str] = ()) -> None:
+        tags = set(tags)
+        with self._lock:
+            self._epoch += 1
+            for key in keys:
+                if key in self._entries:
+                    self._drop(key)
+            if tags:
+                for key in [k for k, e in self._entries.items() if e.tags & tags]:
+                    self._drop(key)
+        self.flights.forget(keys, tags)
+
+    def invalidate_student(self, student_id: int) -> None:
+        """A student row changed: drop it and every list page."""
+        self.invalidate(student_key(student_id), history_key(student_id), tags=[LISTS])
+
+    def invalidate_lists(self) -> None:
+        self.invalidate(tags=[LISTS])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._bytes = 0
+        self.flights.clear()
+
+    def respond(
+        self,
+        request: Request,
+        key: str,
+        build: Callable[[], Tuple[bytes, Dict[str, str]]],
+        tags: Iterable[str] = (),
+    ) -> Response:
+        """Serve ``key`` from the cache, or ``build()`` the body and cache it."""
+        entry = self.get(key) if self.enabled else None
+        if entry is None:
+            entry = self.flights.do(key, lambda: self._build(key, build, tags), tags)
+        if etag_matches(request, entry.etag):
+            self.not_modified += 1
+        return entry.to_response(request)
+
+    def _build(self, key: str, build, tags: Iterable[str]) -> CachedResponse:
+        epoch = self._epoch
+        body, headers = build()
+        entry = CachedResponse(body, headers, tags, self.ttl)
+        if self.enabled:
+            self.put(key, entry, epoch)
+        return entry
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            **self.flights.stats(),
+        }
+
+
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("STUD_CACHE_MAX_ENTRIES", "1000")),
+    max_bytes=int(os.getenv("STUD_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.getenv("STUD_CACHE_TTL_SECONDS", "30")),
+    single_flight=SINGLE_FLIGHT,
+)
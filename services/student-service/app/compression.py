@@ -0,0 +1,134 @@
+"""Negotiated response compression: brotli or gzip.
+
+Responses of at least ``STUD_COMPRESS_MIN_BYTES`` (default 1024) are
+compressed for clients that accept it: brotli when the optional ``brotli``
+package is installed and the client lists ``br``, gzip otherwise. Streamed
+bodies (whose size is unknown up front) are compressed chunk by chunk.
+Server-sent events and responses that already carry a Content-Encoding are
+left alone. The ETag of a compressed response is made weak, since its bytes
+differ; ``If-None-Match`` compares weakly, so revalidation still gets 304.
+
+``STUD_COMPRESSION=0`` turns it off, e.g. when a proxy compresses instead.
+"""
+import os
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSION = os.getenv("STUD_COMPRESSION", "1") == "1"
+MIN_BYTES = int(os.getenv("STUD_COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+# brotli's default (11) is meant for static files; 4 is about gzip's speed, smaller output
+BROTLI_QUALITY = 4
+
+_SKIP_TYPES = ("text/event-stream",)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """``"br"``, ``"gzip"`` or None, from an Accept-Encoding header."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(coding)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Incremental compressor: ``compress`` chunks, then ``finish`` once."""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            self.compress, self.finish = compressor.process, compressor.finish
+        else:
+            compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+            self.compress, self.finish = compressor.compress, compressor.flush
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware, so streamed bodies stay streamed."""
+
+    def __init__(self, app, minimum_size: int = MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _Responder(send, encoding, self.minimum_size).send)
+
+
+class _Responder:
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def send(self, message) -> None:
+        if message["type"] == "http.response.start":
+            # held back until the first body chunk tells whether to compress
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            headers = MutableHeaders(raw=self.start["headers"])
+            if (
+                self.start["status"] < 200
+                or self.start["status"] in (204, 304)
+                or "content-encoding" in headers
+                or headers.get("content-type", "").startswith(_SKIP_TYPES)
+                or (not more_body and len(body) < self.minimum_size)
+            ):
+                self.passthrough = True
+                await self._send(self.start)
+                await self._send(message)
+                return
+            self.compressor = _Compressor(self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+            del headers["content-length"]
+            body = self.compressor.compress(body)
+            if not more_body:
+                body += self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+            await self._send(self.start)
+            await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+        body = self.compressor.compress(body)
+        if not more_body:
+            body += self.compressor.finish()
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
@@ -1,11 +1,148 @@
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, run a single worker there
+    fcntl = None
+
 DATABASE_URL = os.getenv("STUD_DATABASE_URL", "sqlite:///./students.db")
 
 connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+# SQLite engine profile (STUD_DB_PROFILE), PRAGMAs applied on every new connection:
+# - default: SQLite's own settings (rollback journal, readers blocked by writers)
+# - wal: write-ahead log so readers never wait for the writer, fsync only at
+#   checkpoints, larger page cache, memory-mapped reads and a busy timeout
+#   instead of failing at once with "database is locked"
+SQLITE_PROFILES = {
+    "default": {},
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,  # KiB
+        "mmap_size": 256 * 1024 * 1024,
+        "busy_timeout": 5000,  # ms
+        "temp_store": "MEMORY",
+    },
+}
+DB_PROFILE = os.getenv("STUD_DB_PROFILE", "default")
+PRAGMAS = SQLITE_PROFILES[DB_PROFILE] if DATABASE_URL.startswith("sqlite") else {}
+
+
+def pool_options(prefix: str, url: str) -> dict:
+    """Explicit pool sizing; in-memory SQLite keeps its single-connection pool."""
+    if url in ("sqlite://", "sqlite:///:memory:"):
+        return {}
+    return {
+        "pool_size": int(os.getenv(f"{prefix}_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv(f"{prefix}_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv(f"{prefix}_POOL_TIMEOUT", "30")),
+    }
+
+
+def apply_pragmas(engine, pragmas: dict) -> None:
+    if not pragmas:
+        return
+
+    @event.listens_for(getattr(engine, "sync_engine", engine), "connect")
+    def _set_pragmas(dbapi_conn, record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+engine = create_engine(DATABASE_URL, connect_args=connect_args, **pool_options("STUD_DB", DATABASE_URL))
+apply_pragmas(engine, PRAGMAS)
 SessionLocal = sessionmaker(bind=engine, autoflush=False)
 Base = declarative_base()
+
+
+@contextmanager
+def schema_lock(engine, key: int):
+    """Cross-process lock held while creating tables or seeding, so that
+    workers starting together run it one after the other: a lock file next
+    to a SQLite database, a session advisory lock (``key``) on PostgreSQL.
+    """
+    url = engine.url
+    if url.get_backend_name() == "postgresql":
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": key})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+        return
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:") or fcntl is None:
+        yield
+        return
+    with open(url.database + ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def begin_snapshot(session) -> None:
+    """Begin ``session``'s transaction so that all of its reads see one
+    snapshot: pysqlite only emits BEGIN before a write (each SELECT is then
+    its own snapshot), and PostgreSQL's READ COMMITTED takes one per statement."""
+    if session.get_bind().dialect.name == "sqlite":
+        session.connection().exec_driver_sql("BEGIN")
+    else:
+        session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+
+# Optional read-only pool used by GET routes: a replica (STUD_DATABASE_READ_URL)
+# or, with STUD_DB_READ_POOL=1, a second pool on the same SQLite file whose
+# connections refuse writes (PRAGMA query_only). In WAL mode its readers run
+# alongside the writer instead of queueing behind it in the main pool.
+READ_URL = os.getenv("STUD_DATABASE_READ_URL") or (
+    DATABASE_URL if os.getenv("STUD_DB_READ_POOL", "0") == "1" else None
+)
+READ_PRAGMAS = {**PRAGMAS, "query_only": "ON"} if READ_URL and READ_URL.startswith("sqlite") else {}
+
+read_engine = None
+ReadSessionLocal = SessionLocal
+if READ_URL:
+    read_engine = create_engine(READ_URL, connect_args=connect_args, **pool_options("STUD_DB_READ", READ_URL))
+    apply_pragmas(read_engine, READ_PRAGMAS)
+    ReadSessionLocal = sessionmaker(bind=read_engine, autoflush=False)
+
+
+# Opt-in async mode (STUD_ASYNC=1): the same database through an async driver,
+# aiosqlite for SQLite and asyncpg for PostgreSQL.
+ASYNC_MODE = os.getenv("STUD_ASYNC", "0") == "1"
+
+
+def async_url(url: str) -> str:
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith(("postgresql:", "postgres:")):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+
+async_engine = None
+AsyncSessionLocal = None
+async_read_engine = None
+AsyncReadSessionLocal = None
+if ASYNC_MODE:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(async_url(DATABASE_URL), **pool_options("STUD_DB", DATABASE_URL))
+    apply_pragmas(async_engine, PRAGMAS)
+    # results are serialized after the handler returns, outside the session's
+    # greenlet, so loaded attributes must not be expired on commit
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    AsyncReadSessionLocal = AsyncSessionLocal
+    if READ_URL:
+        async_read_engine = create_async_engine(async_url(READ_URL), **pool_options("STUD_DB_READ", READ_URL))
+        apply_pragmas(async_read_engine, READ_PRAGMAS)
+        AsyncReadSessionLocal = async_sessionmaker(
+            bind=async_read_engine, autoflush=False, expire_on_commit=False
+        )
@@ -0,0 +1,153 @@
+"""Batched academic history inserts.
+
+``insert_history`` writes many rows for one student with a single
+``executemany INSERT ... RETURNING`` (``POST /students/{id}/history:batch``).
+
+With ``STUD_HISTORY_GROUP_COMMIT=1``, single ``POST /students/{id}/history``
+calls go through ``GroupCommitter`` instead: records posted by concurrent
+requests are queued, and a writer thread inserts everything that arrived
+within ``STUD_HISTORY_GROUP_COMMIT_MS`` (default 5) in one transaction, so
+a burst of N appends costs one commit (one fsync) instead of N. Each caller
+still gets back its own rows, or its own 404.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Set
+
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import AcademicHistory, Student
+from app.outbox import CREATED, HISTORY, record_changes
+from app.schemas import AcademicHistoryCreate
+
+# upper bound on records per batch call, and per group commit
+MAX_HISTORY_BATCH = 1000
+
+GROUP_COMMIT = os.getenv("STUD_HISTORY_GROUP_COMMIT", "0") == "1"
+GROUP_COMMIT_MS = float(os.getenv("STUD_HISTORY_GROUP_COMMIT_MS", "5"))
+
+_RETURNING = (AcademicHistory.id, AcademicHistory.student_id, AcademicHistory.annee, AcademicHistory.details)
+
+
+def active_students(db: Session, student_ids) -> Set[int]:
+    return set(db.scalars(
+        select(Student.id).where(Student.id.in_(set(student_ids)), Student.deleted_at.is_(None))
+    ))
+
+
+def history_rows(student_id: int, items: Sequence[AcademicHistoryCreate]) -> List[Dict[str, Any]]:
+    now = datetime.utcnow()
+    return [
+        {"student_id": student_id, "annee": item.annee, "details": item.details, "created_at": now}
+        for item in items
+    ]
+
+
+def insert_rows(db: Session, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """executemany INSERT of history rows, recorded in the change feed; rows come back in order."""
+    if not rows:
+        return []
+    created = db.execute(
+        insert(AcademicHistory).returning(*_RETURNING, sort_by_parameter_order=True), rows
+    ).mappings().all()
+    created = [dict(row) for row in created]
+    record_changes(db, CREATED, HISTORY, created)
+    return created
+
+
+def insert_history(db: Session, student_id: int, items: Sequence[AcademicHistoryCreate]) -> List[Dict[str, Any]]:
+    """Insert ``items`` for an active student in the caller's transaction (404 otherwise)."""
+    if len(items) > MAX_HISTORY_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_HISTORY_BATCH} records per request")
+    if not active_students(db, [student_id]):
+        raise HTTPException(status_code=404, detail="Student not found")
+    return insert_rows(db, history_rows(student_id, items))
+
+
+class GroupCommitter:
+    """Writer thread inserting queued history records in shared transactions."""
+
+    def __init__(self, session_factory, window_ms: float, max_rows: int = MAX_HISTORY_BATCH):
+        self.session_factory = session_factory
+        self.window = window_ms / 1000
+        self.max_rows = max_rows
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        # groups committed and records written (see benchmarks/history.py)
+        self.commits = 0
+        self.records = 0
+
+    def submit(self, student_id: int, items: Sequence[AcademicHistoryCreate]) -> Future:
+        """Queue ``items``; the future resolves to their rows once committed."""
+        future: Future = Future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="history-group-commit", daemon=True)
+                self._thread.start()
+        self._queue.put((future, student_id, history_rows(student_id, items)))
+        return future
+
+    def stop(self) -> None:
+        """Commit what is queued, then stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            group, size = [first], len(first[2])
+            deadline = time.monotonic() + self.window
+            stopping = False
+            while size < self.max_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                group.append(entry)
+                size += len(entry[2])
+            self._commit(group)
+            if stopping:
+                return
+
+    def _commit(self, group: list) -> None:
+        try:
+            with self.session_factory() as db:
+                present = active_students(db, [student_id for _, student_id, _ in group])
+                accepted = [entry for entry in group if entry[1] in present]
+                created = insert_rows(db, [row for _, _, rows in accepted for row in rows])
+                db.commit()
+        except Exception as exc:
+            for future, _, _ in group:
+                future.set_exception(exc)
+            return
+        self.commits += 1
+        self.records += len(created)
+        start = 0
+        for future, student_id, rows in group:
+            if student_id not in present:
+                future.set_exception(HTTPException(status_code=404, detail="Student not found"))
+                continue
+            future.set_result(created[start:start + len(rows)])
+            start += len(rows)
+
+
+group_committer = GroupCommitter(SessionLocal, GROUP_COMMIT_MS) if GROUP_COMMIT else None
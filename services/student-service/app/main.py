@@ -1,9 +1,57 @@
-from fastapi import FastAPI
-from app.database import Base, engine
-from app.routes import students
+import os
 
-Base.metadata.create_all(bind=engine)
+from fastapi import Depends, FastAPI
+from app.cache import response_cache
+from app.compression import COMPRESSION, CompressionMiddleware
+from app.database import ASYNC_MODE, async_engine, async_read_engine, engine, read_engine
+from app.metrics import install as install_metrics
+from app.history import group_committer
+from app.migrations import migrate
+from app.outbox import PRUNE_SECONDS, RETENTION_DAYS, Pruner
+from app.stats import RECONCILE_SECONDS, Reconciler
+from app.token_verifier import REQUIRE_AUTH, require_token
 
 app = FastAPI(title="Student Service")
+install_metrics(app, db=engine, db_read=read_engine, db_async=async_engine, db_async_read=async_read_engine)
+# gzip / brotli for large bodies (see app/compression.py)
+if COMPRESSION:
+    app.add_middleware(CompressionMiddleware)
 
-app.include_router(students.router)
+
+# Schema changes are versioned migrations (app/migrations.py), applied before
+# the first request rather than at import time
+@app.on_event("startup")
+def apply_migrations():
+    migrate(engine)
+
+
+# Background jobs: periodic rebuild of the student_stats summary table (see
+# app/stats.py) and deletion of student_changes rows older than the retention
+# window (see app/outbox.py). With several workers run.py runs them once, in
+# the launcher, and sets STUD_BACKGROUND_JOBS=0 for the workers.
+stats_reconciler = Reconciler(engine, RECONCILE_SECONDS)
+outbox_pruner = Pruner(engine, PRUNE_SECONDS, RETENTION_DAYS)
+if os.getenv("STUD_BACKGROUND_JOBS", "1") == "1":
+    for job in (stats_reconciler, outbox_pruner):
+        app.on_event("startup")(job.start)
+        app.on_event("shutdown")(job.stop)
+# STUD_HISTORY_GROUP_COMMIT=1: commit the queued history appends before exiting
+if group_committer is not None:
+    app.on_event("shutdown")(group_committer.stop)
+
+
+# STUD_ASYNC=1 serves the same routes with async handlers and an async engine
+if ASYNC_MODE:
+    from app.routes import students_async as students
+else:
+    from app.routes import students
+
+# STUD_REQUIRE_AUTH=1 checks access tokens in-process (see app/token_verifier.py)
+auth = [Depends(require_token)] if REQUIRE_AUTH else []
+app.include_router(students.router, dependencies=auth)
+
+
+# hit ratio and size of the read response cache (see app/cache.py)
+@app.get("/cache/stats")
+def cache_stats():
+    return response_cache.stats()
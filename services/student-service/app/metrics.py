@@ -0,0 +1,240 @@
+"""Prometheus-style request and database metrics, served on ``GET /metrics``.
+
+``install(app, db=engine)`` adds:
+
+- an ASGI middleware recording, per method and route template, the request
+  count by status, a latency histogram and a histogram of the SQL statements
+  each request ran, plus an in-flight gauge per method;
+- SQLAlchemy engine hooks timing every statement (labelled by its verb);
+- connection pool gauges, read when ``/metrics`` is scraped.
+
+Everything is kept in process memory with plain dicts under a lock and
+rendered in the Prometheus text format (0.0.4); no client library needed.
+"""
+import bisect
+import contextvars
+import functools
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import FastAPI, Response
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labels: Tuple[str, ...] = ()):
+        self.name, self.doc, self.labels = name, doc, labels
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_labels(self.labels, labels)} {value}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name, self.doc, self.labels = name, doc, labels
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = [(labels, list(s[0]), s[1], s[2]) for labels, s in self._values.items()]
+        for labels, counts, total, count in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), counts):
+                cumulative += n
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_labels(self.labels, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {total}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {count}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: list = []
+        # called at scrape time, return (name, kind, doc, [(labels dict, value)])
+        self.collectors: List[Callable[[], Iterable[Tuple[str, str, str, list]]]] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for m in self.metrics:
+            lines.append(f"# HELP {m.name} {m.doc}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            lines.extend(m.samples())
+        for collect in self.collectors:
+            for name, kind, doc, values in collect():
+                lines.append(f"# HELP {name} {doc}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in values:
+                    lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUESTS = registry.register(Counter(
+    "http_requests_total", "HTTP requests handled.", ("method", "route", "status")))
+LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route")))
+# by method only: the route is not known until the router has matched
+IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests being handled.", ("method",)))
+QUERIES_PER_REQUEST = registry.register(Histogram(
+    "http_request_db_queries", "SQL statements run per HTTP request.", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS))
+DB_LATENCY = registry.register(Histogram(
+    "db_statement_duration_seconds", "SQL statement execution time.", ("engine", "operation")))
+
+# mutable [count] of the current request, shared with the threadpool copies of the context
+_query_count: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("query_count", default=None)
+
+
+def route_label(scope) -> str:
+    # the template of the route the router matched keeps the label set bounded
+    # (/students/{student_id}); 404s and the like share one label
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware; cheaper per request than ``BaseHTTPMiddleware``."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status = 500
+        counter = [0]
+        token = _query_count.set(counter)
+        IN_FLIGHT.inc(method)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.dec(method)
+            _query_count.reset(token)
+            route = route_label(scope)
+            REQUESTS.inc(method, route, status)
+            LATENCY.observe(elapsed, method, route)
+            QUERIES_PER_REQUEST.observe(counter[0], method, route)
+
+
+@functools.lru_cache(maxsize=1024)
+def _operation(statement: str) -> str:
+    words = statement.split(None, 1)
+    return words[0].upper() if words else "OTHER"
+
+
+def instrument_engine(engine, name: str = "default") -> None:
+    """Time every statement run by ``engine`` (sync or async)."""
+    engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        DB_LATENCY.observe(time.perf_counter() - context._metrics_started, name, _operation(statement))
+        counter = _query_count.get()
+        if counter is not None:
+            counter[0] += 1
+
+
+def pool_stats(engine) -> Dict:
+    """Connection pool figures; pools without a fixed size report what they can."""
+    pool = getattr(engine, "sync_engine", engine).pool
+    stats = {"class": type(pool).__name__}
+    for attr in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, attr, None)
+        if callable(fn):
+            stats[attr] = fn()
+    return stats
+
+
+def _pool_collector(engines: Dict[str, object]):
+    def collect():
+        for attr in ("size", "checkedin", "checkedout", "overflow"):
+            values = []
+            for name, engine in engines.items():
+                value = pool_stats(engine).get(attr)
+                if value is not None:
+                    values.append(({"engine": name}, value))
+            yield f"db_pool_{attr}", "gauge", f"Connection pool {attr}.", values
+    return collect
+
+
+def metrics_endpoint() -> Response:
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
+def install(app: FastAPI, **engines) -> None:
+    """Instrument ``app`` and the given named engines, and serve ``/metrics``."""
+    app.add_middleware(MetricsMiddleware)
+    for name, engine in engines.items():
+        if engine is not None:
+            instrument_engine(engine, name)
+    registry.collectors.append(_pool_collector({n: e for n, e in engines.items() if e is not None}))
+    app.add_api_route("/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False)
@@ -0,0 +1,131 @@
+"""Versioned schema migrations, applied in order when the service starts.
+
+Applied versions are recorded in ``schema_migrations``; each migration runs
+once per database. Migrations must stay idempotent (``checkfirst``, ``IF
+EXISTS``): databases created before this runner existed start at version 0
+whatever state their schema is in.
+
+Add a migration by appending ``(version, name, function)`` to ``MIGRATIONS``;
+never edit or reorder one that has shipped.
+
+    python -m app.migrations            # apply pending migrations
+    python -m app.migrations --status   # list applied / pending versions
+"""
+import argparse
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, insert, select, text
+
+from app.database import Base, schema_lock
+from app.models import AcademicHistory, Student, StudentChange, StudentChangesPruned, StudentStat
+from app.search import ensure_search_index
+from app.stats import reconcile
+from app.uniqueness import migrate_unique_indexes
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# arbitrary PostgreSQL advisory lock key: one migrating worker at a time
+LOCK_KEY = 7310
+
+
+def create_tables(conn) -> None:
+    """Create missing tables and add the model columns older tables lack."""
+    Base.metadata.create_all(bind=conn)
+    insp = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {c["name"] for c in insp.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                type_ = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {type_}'))
+
+
+def create_query_indexes(conn) -> None:
+    """Composite indexes for the list filters and the history listing."""
+    # superseded by ix_academic_history_student_created (same leading column)
+    conn.execute(text("DROP INDEX IF EXISTS ix_academic_history_student_id"))
+    for table in (Student.__table__, AcademicHistory.__table__):
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def create_student_stats(conn) -> None:
+    """Summary table behind GET /students/stats, filled from the current rows."""
+    StudentStat.__table__.create(conn, checkfirst=True)
+    reconcile(conn)
+
+
+def create_student_changes(conn) -> None:
+    """Outbox table behind GET /students/changes; the feed starts empty."""
+    StudentChange.__table__.create(conn, checkfirst=True)
+
+
+def create_change_retention(conn) -> None:
+    """Index and watermark used by the outbox retention prune (app/outbox.py)."""
+    for index in StudentChange.__table__.indexes:
+        index.create(conn, checkfirst=True)
+    pruned = StudentChangesPruned.__table__
+    pruned.create(conn, checkfirst=True)
+    if conn.execute(select(pruned.c.id)).first() is None:
+        conn.execute(insert(pruned).values(id=1, seq=0))
+
+
+MIGRATIONS = [
+    (1, "create tables and missing columns", create_tables),
+    (2, "partial unique indexes on email and matricule", migrate_unique_indexes),
+    (3, "full-text search index", ensure_search_index),
+    (4, "composite indexes for list and history queries", create_query_indexes),
+    (5, "student_stats summary table", create_student_stats),
+    (6, "student_changes outbox table", create_student_changes),
+    (7, "student_changes retention index and watermark", create_change_retention),
+]
+
+
+def applied_versions(conn) -> List[int]:
+    if not inspect(conn).has_table(schema_migrations.name):
+        return []
+    return sorted(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def migrate(engine) -> List[int]:
+    """Apply pending migrations in one transaction; return the versions applied.
+
+    Workers starting together wait for each other (``schema_lock``): the
+    first applies the migrations, the others find them recorded.
+    """
+    applied = []
+    with schema_lock(engine, LOCK_KEY), engine.begin() as conn:
+        schema_migrations.create(conn, checkfirst=True)
+        done = set(applied_versions(conn))
+        for version, name, step in MIGRATIONS:
+            if version in done:
+                continue
+            step(conn)
+            conn.execute(insert(schema_migrations).values(
+                version=version, name=name, applied_at=datetime.utcnow(),
+            ))
+            applied.append(version)
+    return applied
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    parser = argparse.ArgumentParser(description="Apply student-service schema migrations.")
+    parser.add_argument("--status", action="store_true", help="only list applied and pending versions")
+    args = parser.parse_args()
+    if args.status:
+        with engine.connect() as conn:
+            done = set(applied_versions(conn))
+        for version, name, _ in MIGRATIONS:
+            print(f"{version:>4}  {'applied' if version in done else 'pending':<8} {name}")
+    else:
+        versions = migrate(engine)
+        print(f"applied: {versions}" if versions else "schema up to date")
@@ -1,6 +1,10 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime
+from sqlalchemy import Column, Integer, String, Date, DateTime, Index, Text, text
 from .database import Base
 
+# email and matricule are unique among active students only: a soft-deleted
+# student must not block re-registering the same email or matricule
+ACTIVE = text("deleted_at IS NULL")
+
 class Student(Base):
     __tablename__ = "students"
 
@@ -9,9 +13,9 @@ class Student(Base):
     # Added separate name fields to support search by nom/prenom
     nom = Column(String, nullable=True)
     prenom = Column(String, nullable=True)
-    email = Column(String, unique=True, index=True)
+    email = Column(String)
     age = Column(Integer)
-    matricule = Column(String, unique=True, index=True)
+    matricule = Column(String)
     dateNaissance = Column(Date, nullable=True)
     telephone = Column(String, nullable=True)
     adresse = Column(String, nullable=True)
@@ -22,13 +26,62 @@ class Student(Base):
     statut = Column(String, default="ACTIF", index=True)  # ACTIF, SUSPENDU, DIPLOME
     deleted_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        Index("uq_students_email_active", "email", unique=True,
+              sqlite_where=ACTIVE, postgresql_where=ACTIVE),
+        Index("uq_students_matricule_active", "matricule", unique=True,
+              sqlite_where=ACTIVE, postgresql_where=ACTIVE),
+    )
+
 
 class AcademicHistory(Base):
     __tablename__ = "academic_history"
 
     id = Column(Integer, primary_key=True, index=True)
-    student_id = Column(Integer, index=True)
+    student_id = Column(Integer)
     # basic academic record info; can be extended (semester, gpa, etc.)
     annee = Column(Integer, nullable=True)
     details = Column(String, nullable=True)
     created_at = Column(DateTime, nullable=True)
+
+
+class StudentStat(Base):
+    """Active students per (dimension, value), kept up to date by app/stats.py."""
+    __tablename__ = "student_stats"
+
+    dimension = Column(String, primary_key=True)  # filiere, niveau, statut, anneeInscription, total
+    value = Column(String, primary_key=True)  # "" for NULL
+    count = Column(Integer, nullable=False, default=0)
+
+
+class StudentChange(Base):
+    """Outbox row: one committed mutation, served by GET /students/changes (app/outbox.py)."""
+    __tablename__ = "student_changes"
+    # seq is never reused, even after old rows are deleted
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    student_id = Column(Integer, nullable=False)
+    entity = Column(String, nullable=False)  # student, history
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)  # created, updated, deleted
+    data = Column(Text, nullable=True)  # JSON of the row after the change (before, for deletes)
+    created_at = Column(DateTime, nullable=False)
+
+
+class StudentChangesPruned(Base):
+    """Single row: the highest seq deleted from the outbox by the retention prune."""
+    __tablename__ = "student_changes_pruned"
+
+    id = Column(Integer, primary_key=True)  # always 1
+    seq = Column(Integer, nullable=False)
+
+
+# Composite indexes matching the route queries (see app/migrations.py):
+# list filters on active students, and a student's history newest first
+Index("ix_students_active_filters",
+      Student.deleted_at, Student.filiere, Student.niveau, Student.anneeInscription)
+Index("ix_academic_history_student_created",
+      AcademicHistory.student_id, AcademicHistory.created_at.desc())
+# outbox retention: the prune looks up the newest row older than the window
+Index("ix_student_changes_created_at", StudentChange.created_at)
@@ -0,0 +1,280 @@
+"""Change feed of student mutations (transactional outbox).
+
+Every write route records what it changed in ``student_changes`` inside its
+own transaction, so a change is visible in the feed exactly when the write
+is committed. Rows are numbered by ``seq``; consumers resume from the last
+``seq`` they processed:
+
+    GET /students/changes?since=0&limit=100          # one page
+    GET /students/changes?since=42&wait=30           # long-poll up to 30 s
+    GET /students/changes?since=42  (Accept: text/event-stream)   # SSE
+
+Waiting clients are woken in-process right after a commit that wrote to the
+outbox; writes made by other workers are picked up by re-reading the table
+every ``STUD_CHANGES_POLL_SECONDS`` (default 1).
+
+Retention: rows older than ``STUD_CHANGES_RETENTION_DAYS`` (default 7, 0
+keeps everything) are deleted in the background every
+``STUD_CHANGES_PRUNE_SECONDS`` (default 3600, 0 disables), and the highest
+deleted seq is kept in ``student_changes_pruned``. A consumer whose ``since``
+is below it has missed changes: the feed answers 410 with
+``{"detail", "pruned", "next"}`` (an SSE stream ends with an ``event: pruned``
+carrying the same data). It must resync from GET /students and then resume
+with ``since=next``, the newest seq at the time of the 410; changes made
+during the resync are replayed, so applying them must be idempotent.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, event, func, select, text, update
+from sqlalchemy.orm import Session
+
+from app.models import StudentChange, StudentChangesPruned
+from app.schemas import AcademicHistoryOut, StudentOut
+
+# entity / op values
+STUDENT, HISTORY = "student", "history"
+CREATED, UPDATED, DELETED = "created", "updated", "deleted"
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+MAX_WAIT_SECONDS = 60
+POLL_SECONDS = float(os.getenv("STUD_CHANGES_POLL_SECONDS", "1"))
+# SSE comment sent when nothing happened for this long, keeps proxies from closing the stream
+KEEPALIVE_SECONDS = 15
+RETENTION_DAYS = float(os.getenv("STUD_CHANGES_RETENTION_DAYS", "7"))
+PRUNE_SECONDS = float(os.getenv("STUD_CHANGES_PRUNE_SECONDS", "3600"))
+# rows deleted per transaction, so that writers are not held up for long
+PRUNE_BATCH = 10_000
+
+# PostgreSQL: outbox writers are serialized by this transaction-level advisory
+# lock so that seq order is commit order and no consumer skips a late commit
+LOCK_KEY = 7311
+
+_PENDING = "outbox_pending"
+
+log = logging.getLogger(__name__)
+
+
+class ChangesPruned(Exception):
+    """Changes after the consumer's ``since`` were deleted by the retention prune."""
+
+    def __init__(self, pruned: int, latest: int):
+        super().__init__(f"changes up to seq {pruned} were pruned")
+        self.pruned = pruned
+        self.latest = latest
+
+    def body(self) -> Dict[str, Any]:
+        return {
+            "detail": "Changes after since were pruned; resync, then resume from next",
+            "pruned": self.pruned,
+            "next": self.latest,
+        }
+
+
+def _payload(entity: str, obj) -> str:
+    schema = StudentOut if entity == STUDENT else AcademicHistoryOut
+    if isinstance(obj, dict):
+        return schema.model_validate(obj).model_dump_json()
+    return schema.model_validate(obj, from_attributes=True).model_dump_json()
+
+
+def record_change(db: Session, op: str, student=None, history=None) -> None:
+    """Add one change to the caller's transaction (after the row was flushed)."""
+    record_changes(db, op, HISTORY if history is not None else STUDENT,
+                   [history if history is not None else student])
+
+
+def record_changes(db: Session, op: str, entity: str, objects: Iterable) -> None:
+    """Same for many students or history rows (ORM objects or dicts with ``id``)."""
+    now = datetime.utcnow()
+    rows = []
+    for obj in objects:
+        get = obj.get if isinstance(obj, dict) else lambda name: getattr(obj, name)
+        rows.append({
+            "student_id": get("id") if entity == STUDENT else get("student_id"),
+            "entity": entity,
+            "entity_id": get("id"),
+            "op": op,
+            "data": _payload(entity, obj),
+            "created_at": now,
+        })
+    if not rows:
+        return
+    if db.get_bind().dialect.name == "postgresql" and not db.info.get(_PENDING):
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": LOCK_KEY})
+    db.info[_PENDING] = True
+    db.execute(StudentChange.__table__.insert(), rows)
+
+
+def read_changes(db: Session, since: int, limit: int) -> List[Dict[str, Any]]:
+    """Changes after ``since``; ChangesPruned if some of them were deleted."""
+    rows = db.execute(
+        select(StudentChange).where(StudentChange.seq > since).order_by(StudentChange.seq).limit(limit)
+    ).scalars().all()
+    # the watermark is read after the rows: a prune committing in between
+    # can only cause a needless 410, never a silently skipped change
+    if not rows or rows[0].seq != since + 1:
+        pruned = db.execute(select(StudentChangesPruned.seq)).scalar() or 0
+        if since < pruned:
+            latest = db.execute(select(func.max(StudentChange.seq))).scalar() or pruned
+            raise ChangesPruned(pruned, latest)
+    return [
+        {
+            "seq": row.seq,
+            "op": row.op,
+            "entity": row.entity,
+            "id": row.entity_id,
+            "student_id": row.student_id,
+            "at": row.created_at.isoformat(),
+            "data": json.loads(row.data) if row.data else None,
+        }
+        for row in rows
+    ]
+
+
+class ChangeNotifier:
+    """Wakes the waiting feed requests of this process after an outbox commit.
+
+    ``notify`` is called from whatever thread committed; waiters are asyncio
+    tasks, woken through their own event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = set()
+
+    def notify(self) -> None:
+        with self._lock:
+            waiters = list(self._waiters)
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(waiter.set)
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait for a commit for up to ``timeout`` seconds; True if one happened."""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+notifier = ChangeNotifier()
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    if session.info.pop(_PENDING, False):
+        notifier.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+async def _fetch(session_factory: Callable[[], Session], since: int, limit: int) -> List[Dict[str, Any]]:
+    def fetch():
+        with session_factory() as db:
+            return read_changes(db, since, limit)
+
+    return await run_in_threadpool(fetch)
+
+
+async def poll(session_factory: Callable[[], Session], since: int, limit: int, wait: float) -> List[Dict[str, Any]]:
+    """Changes after ``since``, waiting up to ``wait`` seconds for the first one."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    changes = await _fetch(session_factory, since, limit)
+    while not changes:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        await notifier.wait(min(remaining, POLL_SECONDS))
+        changes = await _fetch(session_factory, since, limit)
+    return changes
+
+
+async def stream(request: Request, session_factory: Callable[[], Session], since: int, limit: int) -> AsyncIterator[bytes]:
+    """Server-sent events, one per change (``id`` is the seq), until the client leaves."""
+    loop = asyncio.get_running_loop()
+    idle_since = loop.time()
+    while not await request.is_disconnected():
+        try:
+            changes = await _fetch(session_factory, since, limit)
+        except ChangesPruned as exc:
+            yield f"event: pruned\ndata: {json.dumps(exc.body())}\n\n".encode()
+            return
+        for change in changes:
+            yield f"id: {change['seq']}\ndata: {json.dumps(change, ensure_ascii=False)}\n\n".encode()
+        if changes:
+            since = changes[-1]["seq"]
+            idle_since = loop.time()
+            if len(changes) == limit:
+                continue  # more rows are waiting
+        elif loop.time() - idle_since >= KEEPALIVE_SECONDS:
+            yield b": keepalive\n\n"
+            idle_since = loop.time()
+        await notifier.wait(POLL_SECONDS)
+
+
+def prune(engine, before: datetime) -> int:
+    """Delete the changes recorded before ``before``, oldest first, in
+    batches of PRUNE_BATCH; returns how many were deleted."""
+    table = StudentChange.__table__
+    watermark = StudentChangesPruned.__table__
+    deleted = 0
+    while True:
+        with engine.begin() as conn:
+            # seq follows commit order, so everything up to the newest old row goes
+            last = conn.execute(select(func.max(table.c.seq)).where(table.c.created_at < before)).scalar()
+            if last is None:
+                return deleted
+            first = conn.execute(select(func.min(table.c.seq))).scalar()
+            upto = min(last, first + PRUNE_BATCH - 1)
+            deleted += conn.execute(delete(table).where(table.c.seq <= upto)).rowcount
+            conn.execute(update(watermark).where(watermark.c.seq < upto).values(seq=upto))
+        if upto == last:
+            return deleted
+
+
+class Pruner:
+    """Daemon thread running ``prune`` every ``interval`` seconds."""
+
+    def __init__(self, engine, interval: float, retention_days: float):
+        self.engine = engine
+        self.interval = interval
+        self.retention_days = retention_days
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self.interval <= 0 or self.retention_days <= 0 or self._thread is not None:
+            return
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="outbox-prune", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                prune(self.engine, datetime.utcnow() - timedelta(days=self.retention_days))
+            except Exception:
+                log.exception("student_changes prune failed")
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread = None
@@ -0,0 +1,132 @@
+import base64
+from typing import Iterator, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.orm import Query, Session
+
+from app.database import begin_snapshot
+from app.models import Student
+
+# Header carrying the opaque cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int, rank: Optional[float] = None) -> str:
+    raw = f"id:{last_id}" if rank is None else f"rank:{rank!r}:{last_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[float], int]:
+    """Return ``(rank, last_id)``; rank is None for plain id cursors."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        if raw.startswith("id:"):
+            return None, int(raw[3:])
+        if raw.startswith("rank:"):
+            rank, _, last_id = raw[5:].rpartition(":")
+            return float(rank), int(last_id)
+        raise ValueError(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _position(q, page: int, limit: int, cursor: Optional[str], rank):
+    """Order ``q`` and skip to the page; returns ``(q, offset)``."""
+    if rank is not None:
+        q = q.add_columns(rank).order_by(rank, Student.id)
+    else:
+        q = q.order_by(Student.id)
+
+    if cursor:
+        last_rank, last_id = decode_cursor(cursor)
+        if (last_rank is None) != (rank is None):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if rank is None:
+            return q.filter(Student.id > last_id), 0
+        return q.filter(or_(rank > last_rank, and_(rank == last_rank, Student.id > last_id))), 0
+    return q, (page - 1) * limit
+
+
+def page_rows(
+    q: Query,
+    page: int = 1,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    rank=None,
+    db: Optional[Session] = None,
+) -> Tuple[list, Optional[str]]:
+    """Page a Student query ordered by id, or by ``(rank, id)`` when given.
+
+    With ``cursor`` the page starts right after the last row seen (keyset
+    pagination, constant cost whatever the depth); otherwise the legacy
+    ``page`` offset is used. Returns the rows and the cursor of the next
+    page, None on the last one.
+
+    ``q`` may also be a Core ``select`` of Student columns (including id),
+    executed on ``db``; rows are then returned as Core rows.
+    """
+    if page < 1:
+        page = 1
+    if limit < 1:
+        limit = 10
+    q, offset = _position(q, page, limit, cursor, rank)
+
+    # fetch one extra row to know whether another page exists
+    if offset:
+        q = q.offset(offset)
+    q = q.limit(limit + 1)
+    rows = db.execute(q).all() if isinstance(q, Select) else q.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    ranks = None
+    if rank is not None:
+        ranks = [r for _, r in rows]
+        rows = [student for student, _ in rows]
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(rows[-1].id, ranks[-1] if ranks else None)
+    return rows, next_cursor
+
+
+def stream_query(q: Select, page: int, limit: int, cursor: Optional[str] = None, rank=None):
+    """Order and position ``q`` for ``stream_rows``; returns ``(q, offset, limit)``.
+    No I/O: a bad cursor fails here, before the response starts."""
+    if page < 1:
+        page = 1
+    if limit < 1:
+        limit = 10
+    q, offset = _position(q, page, limit, cursor, rank)
+    return q, offset, limit
+
+
+def stream_rows(
+    db: Session,
+    q: Select,
+    offset: int,
+    limit: int,
+    rank=None,
+    batch: int = 1000,
+) -> Tuple[Iterator[list], Optional[str]]:
+    """``page_rows`` for pages too large to hold: the rows of ``q`` (from
+    ``stream_query``) come back as an iterator of lists of at most ``batch``
+    Core rows, read with ``yield_per``.
+
+    The next cursor has to be known before the first row is sent, so it is
+    read first, from the last row of the page and the one after it. Both
+    queries run in one snapshot, so the cursor matches the rows sent even
+    if a write lands in between.
+    """
+    begin_snapshot(db)
+    probe = db.execute(q.offset(offset + limit - 1).limit(2)).all()
+    next_cursor = None
+    if len(probe) == 2:
+        last = probe[0]
+        next_cursor = encode_cursor(last.id, last[-1] if rank is not None else None)
+
+    result = db.execute(q.offset(offset).limit(limit).execution_options(yield_per=batch))
+    if rank is None:
+        return result.partitions(), next_cursor
+    # drop the rank column
+    return ([row[:-1] for row in rows] for rows in result.partitions()), next_cursor
@@ -0,0 +1,41 @@
+"""Sparse fieldsets: read only the requested student columns.
+
+``fields=fullname,email`` on the list routes (and ``fields`` in batchGet)
+selects just those columns with a Core ``select`` and serializes the rows as
+plain dicts: no ORM entities, identity map or per-row ``StudentOut``
+validation. ``id`` is always returned.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+
+from app.models import Student
+from app.schemas import StudentOut
+
+# selectable fields, in StudentOut order
+FIELDS = list(StudentOut.model_fields)
+
+
+def parse_fields(raw: Optional[str]) -> Optional[List[str]]:
+    """``"fullname, email"`` -> ``["fullname", "email"]``; None when absent or empty."""
+    if raw is None:
+        return None
+    fields = [name.strip() for name in raw.split(",") if name.strip()]
+    return fields or None
+
+
+def student_columns(fields: Optional[Iterable[str]]) -> list:
+    """Columns for a field subset (all StudentOut fields when None); 400 on unknown names."""
+    if not fields:
+        return [Student.__table__.c[name] for name in FIELDS]
+    wanted = set(fields)
+    unknown = sorted(wanted - set(FIELDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+    wanted.add("id")
+    return [Student.__table__.c[name] for name in FIELDS if name in wanted]
+
+
+def as_dicts(rows, columns) -> List[Dict[str, Any]]:
+    names = [c.name for c in columns]
+    return [dict(zip(names, row)) for row in rows]
@@ -1,10 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import and_, select
 from datetime import datetime
 
-from app.database import SessionLocal
+from app.database import ReadSessionLocal, SessionLocal
 from app.models import Student, AcademicHistory
+from app.bulk import (
+    CHUNK_SIZE,
+    CSV_TYPES,
+    NDJSON_TYPES,
+    export_rows,
+    insert_chunk,
+    iter_lines,
+    iter_records,
+    to_csv,
+    to_ndjson,
+    validate,
+)
+from app.batch import BatchGetRequest, batch_get, parse_ids
+from app.history import group_committer, insert_history
+from app.cache import LISTS, history_key, response_cache, student_key
+from app.pagination import NEXT_CURSOR_HEADER, page_rows
+from app.projection import as_dicts, parse_fields, student_columns
+from app.outbox import (
+    CREATED,
+    DEFAULT_LIMIT,
+    DELETED,
+    MAX_LIMIT,
+    MAX_WAIT_SECONDS,
+    UPDATED,
+    ChangesPruned,
+    poll,
+    record_change,
+    stream,
+)
+from app.search import index_student, search_query, unindex_student
+from app.serialization import Serializer, dumps
+from app.streaming import MAX_PAGE_LIMIT, should_stream, stream_page
+from app.stats import adjust, read_stats, snapshot
+from app.uniqueness import flush_unique
 from app.schemas import (
     StudentCreate,
     StudentOut,
@@ -15,8 +51,29 @@ from app.schemas import (
 
 router = APIRouter(tags=["Students"])
 
-def get_db():
-    db = SessionLocal()
+# JSON encoders for the read routes (same bytes as the response models, see app/serialization.py)
+student_json = Serializer(StudentOut)
+history_json = Serializer(AcademicHistoryOut)
+
+# ids passed to GET /students?ids= that matched no active student
+MISSING_IDS_HEADER = "X-Missing-Ids"
+
+
+# methods served from the read-only pool when one is configured (app/database.py)
+READ_METHODS = {"GET", "HEAD"}
+
+
+def get_db(request: Request):
+    db = ReadSessionLocal() if request.method in READ_METHODS else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db():
+    """For POST routes that only read (batchGet)."""
+    db = ReadSessionLocal()
     try:
         yield db
     finally:
@@ -25,92 +82,238 @@ def get_db():
 # CREATE
 @router.post("/students", response_model=StudentOut)
 def create_student(student: StudentCreate, db: Session = Depends(get_db)):
-    # Uniqueness checks (only among non-deleted)
-    exists_email = (
-        db.query(Student)
-        .filter(and_(Student.email == student.email, Student.deleted_at.is_(None)))
-        .first()
-    )
-    if exists_email:
-        raise HTTPException(status_code=400, detail="Email already exists")
-
-    exists_matricule = (
-        db.query(Student)
-        .filter(and_(Student.matricule == student.matricule, Student.deleted_at.is_(None)))
-        .first()
-    )
-    if exists_matricule:
-        raise HTTPException(status_code=400, detail="Matricule already exists")
-
+    # email / matricule must be unique among active students (partial unique indexes)
     new_student = Student(**student.dict())
     db.add(new_student)
+    flush_unique(db)
+    index_student(db, new_student)
+    adjust(db, added=[new_student])
+    record_change(db, CREATED, student=new_student)
     db.commit()
+    response_cache.invalidate_lists()
     db.refresh(new_student)
     return new_student
 
 # READ ALL with optional filters and pagination
+# Pass the X-Next-Cursor response header back as ?cursor= for keyset paging
+# ?ids=3,1,2 returns those students in that order instead (missing ones in X-Missing-Ids)
+# ?fields=fullname,email returns only those columns (plus id), see app/projection.py
+# Served from the response cache (ETag / If-None-Match aware); pages above
+# STUD_STREAM_ROWS rows, or requested as NDJSON, are streamed (app/streaming.py)
 @router.get("/students", response_model=list[StudentOut])
 def get_students(
+    request: Request,
     filiere: str | None = None,
     niveau: str | None = None,
     anneeInscription: int | None = Query(None, alias="annee"),
     page: int = 1,
-    limit: int = 10,
+    limit: int = Query(10, le=MAX_PAGE_LIMIT),
+    cursor: str | None = None,
+    ids: str | None = None,
+    fields: str | None = None,
     db: Session = Depends(get_db),
 ):
-    q = db.query(Student).filter(Student.deleted_at.is_(None))
+    wanted_fields = parse_fields(fields)
+    columns = student_columns(wanted_fields) if wanted_fields else None
+    field_key = ",".join(c.name for c in columns) if columns else ""
+
+    if ids is not None:
+        wanted = parse_ids(ids)
+
+        def build():
+            students, missing, _ = batch_get(db, ids=wanted, fields=wanted_fields)
+            headers = {MISSING_IDS_HEADER: ",".join(map(str, missing))} if missing else {}
+            return dumps(students), headers
+
+        key = f"ids:{','.join(map(str, wanted))}|{field_key}"
+        return response_cache.respond(request, key, build, tags=[LISTS])
+
+    filters = [Student.deleted_at.is_(None)]
     if filiere:
-        q = q.filter(Student.filiere == filiere)
+        filters.append(Student.filiere == filiere)
     if niveau:
-        q = q.filter(Student.niveau == niveau)
+        filters.append(Student.niveau == niveau)
     if anneeInscription is not None:
-        q = q.filter(Student.anneeInscription == anneeInscription)
+        filters.append(Student.anneeInscription == anneeInscription)
+    # Core rows of the selected columns: no ORM entities, serialized as plain dicts
+    selected = columns or student_columns(None)
+    q = select(*selected).where(*filters)
 
-    # pagination
-    if page < 1:
-        page = 1
-    if limit < 1:
-        limit = 10
-    offset = (page - 1) * limit
-    return q.offset(offset).limit(limit).all()
+    if should_stream(request, limit):
+        return stream_page(request, q, selected, page, limit, cursor)
 
+    def build():
+        rows, next_cursor = page_rows(q, page=page, limit=limit, cursor=cursor, db=db)
+        body = dumps(as_dicts(rows, columns)) if columns else student_json.rows(rows)
+        headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+        return body, headers
 
-# SEARCH endpoint by q across fullname and matricule
+    key = f"list:{filiere}|{niveau}|{anneeInscription}|{page}|{limit}|{cursor}|{field_key}"
+    return response_cache.respond(request, key, build, tags=[LISTS])
+
+
+# SEARCH endpoint by q across fullname, nom, prenom and matricule
+# Backed by the FTS index (accent/case folded, prefix match, best match first)
 # IMPORTANT: This must come BEFORE /students/{student_id} to avoid route conflicts
 @router.get("/students/search", response_model=list[StudentOut])
 def search_students(
+    request: Request,
     q: str = Query(..., min_length=1),
     page: int = 1,
-    limit: int = 10,
+    limit: int = Query(10, le=MAX_PAGE_LIMIT),
+    cursor: str | None = None,
     db: Session = Depends(get_db),
 ):
-    base = db.query(Student).filter(Student.deleted_at.is_(None))
-    base = base.filter(
-        or_(
-            Student.fullname.ilike(f"%{q}%"),
-            Student.nom.ilike(f"%{q}%"),
-            Student.prenom.ilike(f"%{q}%"),
-            Student.matricule.ilike(f"%{q}%"),
+    base, rank = search_query(db, q)
+    if should_stream(request, limit):
+        columns = student_columns(None)
+        return stream_page(request, base.with_entities(*columns).statement, columns, page, limit, cursor, rank)
+    rows, next_cursor = page_rows(base, page=page, limit=limit, cursor=cursor, rank=rank)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    return Response(content=student_json.objects(rows), media_type="application/json", headers=headers)
+
+
+# BATCH GET: many students by id and/or matricule in one query
+# Body: {"ids": [3, 1], "matricules": ["2021-0001"], "fields": ["fullname", "email"]}
+# Students come back in request order; unknown or deleted ones are listed as missing
+@router.post("/students:batchGet")
+def batch_get_students(payload: BatchGetRequest, db: Session = Depends(get_read_db)):
+    students, missing_ids, missing_matricules = batch_get(
+        db, ids=payload.ids, matricules=payload.matricules, fields=payload.fields
+    )
+    body = {"students": students, "missing_ids": missing_ids, "missing_matricules": missing_matricules}
+    return Response(content=dumps(body), media_type="application/json")
+
+# BULK IMPORT: streamed CSV (header line first) or NDJSON, one student per row.
+# Rows are validated one by one and inserted CHUNK_SIZE at a time; invalid or
+# duplicate rows are reported by row number and do not stop the import.
+@router.post("/students/bulk")
+async def bulk_import_students(request: Request, db: Session = Depends(get_db)):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_TYPES:
+        fmt = "ndjson"
+    elif content_type in CSV_TYPES:
+        fmt = "csv"
+    else:
+        raise HTTPException(status_code=415, detail="Expected a text/csv or application/x-ndjson body")
+
+    inserted = 0
+    errors = []
+    chunk = []
+    seen_emails, seen_matricules = set(), set()
+
+    async def flush():
+        nonlocal inserted
+        count, chunk_errors = await run_in_threadpool(
+            insert_chunk, db, list(chunk), seen_emails, seen_matricules
         )
+        inserted += count
+        errors.extend(chunk_errors)
+        chunk.clear()
+
+    async for row, record, parse_error in iter_records(iter_lines(request.stream()), fmt):
+        if parse_error:
+            errors.append({"row": row, "error": parse_error})
+            continue
+        student, invalid = validate(record)
+        if invalid:
+            errors.append({"row": row, "error": invalid})
+            continue
+        chunk.append((row, student))
+        if len(chunk) >= CHUNK_SIZE:
+            await flush()
+    if chunk:
+        await flush()
+    if inserted:
+        response_cache.invalidate_lists()
+
+    errors.sort(key=lambda e: e["row"])
+    return {"inserted": inserted, "failed": len(errors), "errors": errors}
+
+
+# EXPORT: stream active students as CSV or NDJSON without loading the table
+@router.get("/students/export")
+def export_students(
+    format: str = Query("ndjson", pattern="^(csv|ndjson)$"),
+    filiere: str | None = None,
+    niveau: str | None = None,
+    anneeInscription: int | None = Query(None, alias="annee"),
+):
+    filters = []
+    if filiere:
+        filters.append(Student.filiere == filiere)
+    if niveau:
+        filters.append(Student.niveau == niveau)
+    if anneeInscription is not None:
+        filters.append(Student.anneeInscription == anneeInscription)
+
+    encode = to_csv if format == "csv" else to_ndjson
+
+    # the session lives as long as the response body is being streamed
+    def stream():
+        db = ReadSessionLocal()
+        try:
+            yield from encode(export_rows(db, filters))
+        finally:
+            db.close()
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=students.{format}"},
     )
-    if page < 1:
-        page = 1
-    if limit < 1:
-        limit = 10
-    offset = (page - 1) * limit
-    return base.offset(offset).limit(limit).all()
+
+# STATS: active students per filiere, niveau, statut and anneeInscription
+# Read from the student_stats summary table (app/stats.py), not by counting students
+@router.get("/students/stats")
+def student_stats(request: Request, db: Session = Depends(get_db)):
+    def build():
+        return dumps(read_stats(db)), {}
+
+    return response_cache.respond(request, "stats", build, tags=[LISTS])
+
+# CHANGE FEED: committed mutations after ?since=<seq>, oldest first (app/outbox.py)
+# ?wait=30 long-polls until a change arrives; Accept: text/event-stream streams
+# them as server-sent events (Last-Event-ID resumes). 410 when changes after
+# since were pruned (retention): the client resyncs and resumes from "next"
+@router.get("/students/changes")
+async def student_changes(
+    request: Request,
+    since: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS),
+):
+    if "text/event-stream" in request.headers.get("accept", ""):
+        last_event_id = request.headers.get("last-event-id", "")
+        if last_event_id.isdigit():
+            since = int(last_event_id)
+        return StreamingResponse(
+            stream(request, ReadSessionLocal, since, limit),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    try:
+        changes = await poll(ReadSessionLocal, since, limit, wait)
+    except ChangesPruned as exc:
+        return Response(content=dumps(exc.body()), status_code=410, media_type="application/json")
+    body = {"changes": changes, "next": changes[-1]["seq"] if changes else since}
+    return Response(content=dumps(body), media_type="application/json")
 
 # READ ONE (exclude soft-deleted)
 @router.get("/students/{student_id}", response_model=StudentOut)
-def get_student(student_id: int, db: Session = Depends(get_db)):
-    student = (
-        db.query(Student)
-        .filter(and_(Student.id == student_id, Student.deleted_at.is_(None)))
-        .first()
-    )
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
-    return student
+def get_student(student_id: int, request: Request, db: Session = Depends(get_db)):
+    def build():
+        student = (
+            db.query(Student)
+            .filter(and_(Student.id == student_id, Student.deleted_at.is_(None)))
+            .first()
+        )
+        if not student:
+            raise HTTPException(status_code=404, detail="Student not found")
+        return student_json.one(student), {}
+
+    return response_cache.respond(request, student_key(student_id), build)
 
 # UPDATE (exclude soft-deleted) with uniqueness checks
 @router.put("/students/{student_id}", response_model=StudentOut)
@@ -123,27 +326,17 @@ def update_student(student_id: int, data: StudentCreate, db: Session = Depends(g
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    # Enforce uniqueness for email and matricule among other active records
-    other_email = (
-        db.query(Student)
-        .filter(and_(Student.email == data.email, Student.id != student_id, Student.deleted_at.is_(None)))
-        .first()
-    )
-    if other_email:
-        raise HTTPException(status_code=400, detail="Email already exists")
-
-    other_matricule = (
-        db.query(Student)
-        .filter(and_(Student.matricule == data.matricule, Student.id != student_id, Student.deleted_at.is_(None)))
-        .first()
-    )
-    if other_matricule:
-        raise HTTPException(status_code=400, detail="Matricule already exists")
-
+    before = snapshot(student)
     for key, value in data.dict().items():
         setattr(student, key, value)
-    
+    # email / matricule uniqueness is enforced by partial unique indexes
+    flush_unique(db)
+    index_student(db, student)
+    adjust(db, removed=[before], added=[student])
+    record_change(db, UPDATED, student=student)
+
     db.commit()
+    response_cache.invalidate_student(student_id)
     db.refresh(student)
     return student
 
@@ -159,7 +352,11 @@ def delete_student(student_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Student not found")
 
     student.deleted_at = datetime.utcnow()
+    unindex_student(db, student.id)
+    adjust(db, removed=[student])
+    record_change(db, DELETED, student=student)
     db.commit()
+    response_cache.invalidate_student(student_id)
     return {"message": "Student soft-deleted"}
 
 
@@ -178,45 +375,43 @@ def update_profile(
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    # email uniqueness check if updating email
-    if data.email:
-        exists_email = (
-            db.query(Student)
-            .filter(and_(Student.email == data.email, Student.id != student_id, Student.deleted_at.is_(None)))
-            .first()
-        )
-        if exists_email:
-            raise HTTPException(status_code=400, detail="Email already exists")
-
     if data.email is not None:
         student.email = data.email
     if data.telephone is not None:
         student.telephone = data.telephone
     if data.adresse is not None:
         student.adresse = data.adresse
+    flush_unique(db)
+    index_student(db, student)
+    record_change(db, UPDATED, student=student)
 
     db.commit()
+    response_cache.invalidate_student(student_id)
     db.refresh(student)
     return student
 
 
 # Academic history endpoints
 @router.get("/students/{student_id}/history", response_model=list[AcademicHistoryOut])
-def list_academic_history(student_id: int, db: Session = Depends(get_db)):
-    # ensure student exists
-    student = (
-        db.query(Student)
-        .filter(and_(Student.id == student_id, Student.deleted_at.is_(None)))
-        .first()
-    )
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
-    return (
-        db.query(AcademicHistory)
-        .filter(AcademicHistory.student_id == student_id)
-        .order_by(AcademicHistory.created_at.desc())
-        .all()
-    )
+def list_academic_history(student_id: int, request: Request, db: Session = Depends(get_db)):
+    def build():
+        # ensure student exists
+        student = (
+            db.query(Student)
+            .filter(and_(Student.id == student_id, Student.deleted_at.is_(None)))
+            .first()
+        )
+        if not student:
+            raise HTTPException(status_code=404, detail="Student not found")
+        records = (
+            db.query(AcademicHistory)
+            .filter(AcademicHistory.student_id == student_id)
+            .order_by(AcademicHistory.created_at.desc())
+            .all()
+        )
+        return history_json.objects(records), {}
+
+    return response_cache.respond(request, history_key(student_id), build)
 
 
 @router.post("/students/{student_id}/history", response_model=AcademicHistoryOut, status_code=201)
@@ -225,6 +420,12 @@ def add_academic_history(
     payload: AcademicHistoryCreate,
     db: Session = Depends(get_db),
 ):
+    if group_committer is not None:
+        # shares a transaction with concurrent appends (STUD_HISTORY_GROUP_COMMIT=1)
+        [record] = group_committer.submit(student_id, [payload]).result()
+        response_cache.invalidate(history_key(student_id))
+        return record
+
     student = (
         db.query(Student)
         .filter(and_(Student.id == student_id, Student.deleted_at.is_(None)))
@@ -240,11 +441,27 @@ def add_academic_history(
         created_at=datetime.utcnow(),
     )
     db.add(record)
+    db.flush()
+    record_change(db, CREATED, history=record)
     db.commit()
+    response_cache.invalidate(history_key(student_id))
     db.refresh(record)
     return record
 
 
+# BATCH APPEND: many history records for one student in one INSERT and one commit
+@router.post("/students/{student_id}/history:batch", response_model=list[AcademicHistoryOut], status_code=201)
+def add_academic_history_batch(
+    student_id: int,
+    payload: list[AcademicHistoryCreate],
+    db: Session = Depends(get_db),
+):
+    records = insert_history(db, student_id, payload)
+    db.commit()
+    response_cache.invalidate(history_key(student_id))
+    return records
+
+
 @router.delete("/students/{student_id}/history/{history_id}")
 def delete_academic_history(student_id: int, history_id: int, db: Session = Depends(get_db)):
     student = (
@@ -264,5 +481,7 @@ def delete_academic_history(student_id: int, history_id: int, db: Session = Depe
         raise HTTPException(status_code=404, detail="History record not found")
 
     db.delete(record)
+    record_change(db, DELETED, history=record)
     db.commit()
+    response_cache.invalidate(history_key(student_id))
     return {"message": "History record deleted"}
@@ -0,0 +1,151 @@
+"""Async versions of the student routes, mounted instead of ``students.router``
+when STUD_ASYNC=1.
+
+Each handler awaits an ``AsyncSession`` and runs the matching sync handler
+from ``app.routes.students`` through ``run_sync``: the query code is shared,
+but database I/O is awaited on the event loop instead of occupying a
+threadpool thread for the whole request.
+"""
+import asyncio
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncReadSessionLocal, AsyncSessionLocal
+from app.batch import BatchGetRequest
+from app.cache import history_key, response_cache
+from app.history import group_committer
+from app.routes import students
+from app.schemas import (
+    StudentCreate,
+    StudentOut,
+    ProfileUpdate,
+    AcademicHistoryCreate,
+    AcademicHistoryOut,
+)
+
+router = APIRouter(tags=["Students"])
+
+
+async def get_async_db(request: Request):
+    factory = AsyncReadSessionLocal if request.method in students.READ_METHODS else AsyncSessionLocal
+    async with factory() as db:
+        yield db
+
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+async def call(db: AsyncSession, handler, **kwargs):
+    return await db.run_sync(lambda session: handler(db=session, **kwargs))
+
+
+@router.post("/students", response_model=StudentOut)
+async def create_student(student: StudentCreate, db: AsyncSession = Depends(get_async_db)):
+    return await call(db, students.create_student, student=student)
+
+
+@router.get("/students", response_model=list[StudentOut])
+async def get_students(
+    request: Request,
+    filiere: str | None = None,
+    niveau: str | None = None,
+    anneeInscription: int | None = Query(None, alias="annee"),
+    page: int = 1,
+    limit: int = Query(10, le=students.MAX_PAGE_LIMIT),
+    cursor: str | None = None,
+    ids: str | None = None,
+    fields: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await call(
+        db, students.get_students, request=request, filiere=filiere, niveau=niveau,
+        anneeInscription=anneeInscription, page=page, limit=limit, cursor=cursor, ids=ids,
+        fields=fields,
+    )
+
+
+@router.get("/students/search", response_model=list[StudentOut])
+async def search_students(
+    request: Request,
+    q: str = Query(..., min_length=1),
+    page: int = 1,
+    limit: int = Query(10, le=students.MAX_PAGE_LIMIT),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await call(
+        db, students.search_students, request=request, q=q, page=page, limit=limit, cursor=cursor,
+    )
+
+
+@router.post("/students:batchGet")
+async def batch_get_students(payload: BatchGetRequest, db: AsyncSession = Depends(get_async_read_db)):
+    return await call(db, students.batch_get_students, payload=payload)
+
+
+# Bulk import and export already stream their I/O, and the change feed is
+# async already; they are shared as is
+router.add_api_route("/students/bulk", students.bulk_import_students, methods=["POST"])
+router.add_api_route("/students/export", students.export_students, methods=["GET"])
+router.add_api_route("/students/changes", students.student_changes, methods=["GET"])
+
+
+@router.get("/students/stats")
+async def student_stats(request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await call(db, students.student_stats, request=request)
+
+
+@router.get("/students/{student_id}", response_model=StudentOut)
+async def get_student(student_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await call(db, students.get_student, student_id=student_id, request=request)
+
+
+@router.put("/students/{student_id}", response_model=StudentOut)
+async def update_student(student_id: int, data: StudentCreate, db: AsyncSession = Depends(get_async_db)):
+    return await call(db, students.update_student, student_id=student_id, data=data)
+
+
+@router.delete("/students/{student_id}")
+async def delete_student(student_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await call(db, students.delete_student, student_id=student_id)
+
+
+@router.patch("/students/{student_id}/profile", response_model=StudentOut)
+async def update_profile(student_id: int, data: ProfileUpdate, db: AsyncSession = Depends(get_async_db)):
+    return await call(db, students.update_profile, student_id=student_id, data=data)
+
+
+@router.get("/students/{student_id}/history", response_model=list[AcademicHistoryOut])
+async def list_academic_history(student_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await call(db, students.list_academic_history, student_id=student_id, request=request)
+
+
+@router.post("/students/{student_id}/history", response_model=AcademicHistoryOut, status_code=201)
+async def add_academic_history(
+    student_id: int,
+    payload: AcademicHistoryCreate,
+    db: AsyncSession = Depends(get_async_db),
+):
+    if group_committer is not None:
+        # awaited without holding the event loop while the group commits
+        [record] = await asyncio.wrap_future(group_committer.submit(student_id, [payload]))
+        response_cache.invalidate(history_key(student_id))
+        return record
+    return await call(db, students.add_academic_history, student_id=student_id, payload=payload)
+
+
+@router.post("/students/{student_id}/history:batch", response_model=list[AcademicHistoryOut], status_code=201)
+async def add_academic_history_batch(
+    student_id: int,
+    payload: list[AcademicHistoryCreate],
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await call(db, students.add_academic_history_batch, student_id=student_id, payload=payload)
+
+
+@router.delete("/students/{student_id}/history/{history_id}")
+async def delete_academic_history(student_id: int, history_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await call(db, students.delete_academic_history, student_id=student_id, history_id=history_id)
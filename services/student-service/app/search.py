@@ -0,0 +1,128 @@
+import re
+import unicodedata
+from typing import Optional
+
+from sqlalchemy import Engine, Float, Integer, column, inspect, or_, text
+from sqlalchemy.orm import Session
+
+from app.models import Student
+
+# FTS5 index over student names and matricule; rowid == students.id.
+# Text is accent/case folded in Python before indexing so that "Hélène",
+# "HELENE" and "helene" all hit the same tokens.
+FTS_TABLE = "students_fts"
+
+# bm25 weights per column (names, matricule): a matricule hit ranks first
+_BM25 = f"bm25({FTS_TABLE}, 1.0, 10.0)"
+_INSERT = f"INSERT INTO {FTS_TABLE} (rowid, names, matricule) VALUES (:id, :names, :matricule)"
+
+
+def fold(value: Optional[str]) -> str:
+    """Lowercase and strip accents (é -> e, Ç -> c)."""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def uses_fts(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def ensure_search_index(bind) -> None:
+    """Create the FTS table and backfill it the first time it appears.
+
+    ``bind`` is an engine, or a connection whose transaction is the caller's.
+    """
+    if not uses_fts(bind):
+        return
+    if inspect(bind).has_table(FTS_TABLE):
+        return
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            _create_search_index(conn)
+    else:
+        _create_search_index(bind)
+
+
+def _create_search_index(conn) -> None:
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+        "names, matricule, tokenize = 'unicode61 remove_diacritics 2')"
+    ))
+    rows = conn.execute(text(
+        "SELECT id, fullname, nom, prenom, matricule FROM students "
+        "WHERE deleted_at IS NULL"
+    ))
+    docs = [_document(*row) for row in rows]
+    if docs:
+        conn.execute(text(_INSERT), docs)
+
+
+def _document(student_id, fullname, nom, prenom, matricule) -> dict:
+    names = " ".join(fold(v) for v in (fullname, nom, prenom) if v)
+    return {"id": student_id, "names": names, "matricule": fold(matricule)}
+
+
+def index_student(db: Session, student: Student) -> None:
+    """(Re)index a student inside the caller's transaction."""
+    if not uses_fts(db.get_bind()):
+        return
+    if student.deleted_at is not None:
+        unindex_student(db, student.id)
+        return
+    db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": student.id})
+    db.execute(
+        text(_INSERT),
+        _document(student.id, student.fullname, student.nom, student.prenom, student.matricule),
+    )
+
+
+def index_many(db: Session, rows) -> None:
+    """Index freshly inserted rows of (id, fullname, nom, prenom, matricule)."""
+    if not rows or not uses_fts(db.get_bind()):
+        return
+    db.execute(text(_INSERT), [_document(*row) for row in rows])
+
+
+def unindex_student(db: Session, student_id: int) -> None:
+    if not uses_fts(db.get_bind()):
+        return
+    db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": student_id})
+
+
+def match_expression(q: str) -> Optional[str]:
+    """Turn free text into an FTS5 prefix query: 'dup mar' -> '"dup"* "mar"*'."""
+    tokens = re.findall(r"\w+", fold(q))
+    if not tokens:
+        return None
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+def search_query(db: Session, q: str):
+    """Return ``(query, rank)`` for active students matching ``q``.
+
+    ``rank`` is the bm25 score column (lower is better) on SQLite and None on
+    other backends, where the legacy ILIKE filter is used instead.
+    """
+    base = db.query(Student).filter(Student.deleted_at.is_(None))
+    if not uses_fts(db.get_bind()):
+        return base.filter(
+            or_(
+                Student.fullname.ilike(f"%{q}%"),
+                Student.nom.ilike(f"%{q}%"),
+                Student.prenom.ilike(f"%{q}%"),
+                Student.matricule.ilike(f"%{q}%"),
+            )
+        ), None
+
+    expr = match_expression(q)
+    if expr is None:
+        return base.filter(text("0")), None
+    hits = (
+        text(f"SELECT rowid AS student_id, {_BM25} AS rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match")
+        .bindparams(match=expr)
+        .columns(column("student_id", Integer), column("rank", Float))
+        .subquery("hits")
+    )
+    return base.join(hits, hits.c.student_id == Student.id), hits.c.rank
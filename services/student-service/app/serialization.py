@@ -0,0 +1,63 @@
+"""JSON bodies of the read routes, without per-row validation.
+
+Routes with ``response_model=list[StudentOut]`` used to validate every ORM
+object into a ``StudentOut`` and encode it again; on a ``limit=500`` page
+that is most of the request. Rows read from the database already have the
+column types the schemas declare, so ``Serializer`` takes the schema's field
+names once and dumps rows (Core rows in field order, or ORM objects) as
+plain dicts with orjson. The bytes are the ones Pydantic produces: same key
+order, compact separators, UTF-8 text, ISO dates.
+
+``STUD_FAST_JSON=0``, or orjson not installed, validates through Pydantic
+as before.
+"""
+import os
+from operator import attrgetter
+from typing import Any, Iterable, Sequence
+
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # optional: the Pydantic path is used instead
+    orjson = None
+
+FAST_JSON = os.getenv("STUD_FAST_JSON", "1") == "1" and orjson is not None
+
+_any_json = TypeAdapter(Any)
+
+
+def dumps(value) -> bytes:
+    """Plain dicts / lists (projected rows, stats, change feed) to JSON."""
+    if FAST_JSON:
+        return orjson.dumps(value)
+    return _any_json.dump_json(value)
+
+
+class Serializer:
+    """Encoder for one output schema, built once at import."""
+
+    def __init__(self, schema: type[BaseModel]):
+        self.names = tuple(schema.model_fields)
+        self._get = attrgetter(*self.names)
+        self._one = TypeAdapter(schema)
+        self._many = TypeAdapter(list[schema])
+
+    def rows(self, rows: Iterable[Sequence]) -> bytes:
+        """Core rows selecting exactly the schema fields, in field order."""
+        names = self.names
+        dicts = [dict(zip(names, row)) for row in rows]
+        if FAST_JSON:
+            return orjson.dumps(dicts)
+        return self._many.dump_json(self._many.validate_python(dicts))
+
+    def objects(self, objects: Iterable) -> bytes:
+        """ORM objects (or anything with the schema fields as attributes)."""
+        if FAST_JSON:
+            return self.rows(map(self._get, objects))
+        return self._many.dump_json(self._many.validate_python(objects, from_attributes=True))
+
+    def one(self, obj) -> bytes:
+        if FAST_JSON:
+            return orjson.dumps(dict(zip(self.names, self._get(obj))))
+        return self._one.dump_json(self._one.validate_python(obj, from_attributes=True))
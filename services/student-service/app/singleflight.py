@@ -0,0 +1,98 @@
+"""Single-flight: concurrent identical reads share one build.
+
+When a class opens the same roster, dozens of identical requests arrive
+before the first one has filled the response cache. The first request for a
+key (the leader) runs the query and serializes the body; the others
+(followers) wait for that result instead of running their own. Keys are the
+response cache's (route plus normalized query parameters, see
+app/routes/students.py), so this covers every cached read route even with
+the cache turned off.
+
+A write invalidating a key or tag (``ResponseCache.invalidate``) also
+detaches the flights in progress for it: requests arriving after the write
+start a new query, while those already waiting get the result they were
+promised. Under ``STUD_ASYNC=1`` the handlers run in SQLAlchemy's
+``run_sync`` greenlets on the event loop, so followers await the result
+there rather than block the loop.
+
+``STUD_SINGLE_FLIGHT=0`` turns it off.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, TypeVar
+
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+SINGLE_FLIGHT = os.getenv("STUD_SINGLE_FLIGHT", "1") == "1"
+
+T = TypeVar("T")
+
+
+class _Flight:
+    __slots__ = ("future", "tags")
+
+    def __init__(self, tags: Iterable[str]):
+        self.future: Future = Future()
+        self.tags = frozenset(tags)
+
+
+class SingleFlight:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], T], tags: Iterable[str] = ()) -> T:
+        """``fn()``, or the result of the call already running for ``key``."""
+        if not self.enabled:
+            return fn()
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight(tags)
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return self._wait(flight.future)
+        try:
+            result = fn()
+        except BaseException as exc:
+            flight.future.set_exception(exc)
+            raise
+        else:
+            flight.future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+    @staticmethod
+    def _wait(future: Future):
+        if in_greenlet():
+            # AsyncSession.run_sync: yield to the event loop, which runs the leader
+            return await_only(asyncio.wrap_future(future))
+        return future.result()
+
+    def forget(self, keys: Iterable[str] = (), tags: Iterable[str] = ()) -> None:
+        """Later calls for these keys or tags start a new flight."""
+        tags = set(tags)
+        with self._lock:
+            for key in keys:
+                self._flights.pop(key, None)
+            if tags:
+                for key in [k for k, f in self._flights.items() if f.tags & tags]:
+                    del self._flights[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._flights.clear()
+
+    def stats(self) -> Dict:
+        return {"in_flight": len(self._flights), "leaders": self.leaders, "coalesced": self.coalesced}
@@ -0,0 +1,156 @@
+"""Student counts per filiere, niveau, statut and anneeInscription.
+
+Counts live in the ``student_stats`` summary table, one row per (dimension,
+value), so ``GET /students/stats`` reads O(groups) rows instead of counting
+students. Every write path adjusts the affected groups in its own
+transaction with an atomic ``count = count + delta`` upsert; ``reconcile``
+recomputes the whole table from ``students`` and runs in the background
+every ``STUD_STATS_RECONCILE_SECONDS`` (default 3600, 0 disables) to repair
+any drift, e.g. from rows edited outside the API.
+
+    python -m app.stats            # reconcile now and print the stats
+"""
+import logging
+import os
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable
+
+from sqlalchemy import String, cast, delete, func, literal, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models import Student, StudentStat
+
+log = logging.getLogger(__name__)
+
+DIMENSIONS = ("filiere", "niveau", "statut", "anneeInscription")
+# (dimension, value) row holding the number of active students
+TOTAL = ("total", "")
+# NULL is stored as "" (part of the primary key) and reported as null
+NULL = ""
+
+RECONCILE_SECONDS = float(os.getenv("STUD_STATS_RECONCILE_SECONDS", "3600"))
+
+
+def _value(student, name: str):
+    return student.get(name) if isinstance(student, dict) else getattr(student, name)
+
+
+def groups(student) -> list:
+    """The (dimension, value) groups an active student counts in."""
+    keys = [TOTAL]
+    for name in DIMENSIONS:
+        value = _value(student, name)
+        keys.append((name, NULL if value is None else str(value)))
+    return keys
+
+
+def snapshot(student) -> Dict[str, Any]:
+    """The dimension values of ``student`` now, to diff after an update."""
+    return {name: _value(student, name) for name in DIMENSIONS}
+
+
+def adjust(db, removed: Iterable = (), added: Iterable = ()) -> None:
+    """Move students out of / into their groups within the caller's transaction.
+
+    ``removed`` and ``added`` hold students, row dicts or ``snapshot``s.
+    """
+    deltas = Counter()
+    for student in removed:
+        deltas.subtract(groups(student))
+    for student in added:
+        deltas.update(groups(student))
+    rows = [
+        {"dimension": dimension, "value": value, "count": delta}
+        for (dimension, value), delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        return  # left to the reconciliation job
+    insert = (sqlite if dialect == "sqlite" else postgresql).insert(StudentStat)
+    stmt = insert.on_conflict_do_update(
+        index_elements=[StudentStat.dimension, StudentStat.value],
+        set_={"count": StudentStat.count + insert.excluded.count},
+    )
+    db.execute(stmt, rows)
+
+
+def read_stats(db) -> Dict[str, Any]:
+    """``{"total": n, "filiere": [{"value": "GL", "count": 12}, ...], ...}``."""
+    rows = db.execute(
+        select(StudentStat.dimension, StudentStat.value, StudentStat.count)
+        .where(StudentStat.count > 0)
+        .order_by(StudentStat.dimension, StudentStat.value)
+    ).all()
+    stats: Dict[str, Any] = {"total": 0, **{name: [] for name in DIMENSIONS}}
+    for dimension, value, count in rows:
+        if (dimension, value) == TOTAL:
+            stats["total"] = count
+        elif dimension in stats:
+            if value == NULL:
+                value = None
+            elif dimension == "anneeInscription":
+                value = int(value)
+            stats[dimension].append({"value": value, "count": count})
+    return stats
+
+
+def reconcile(conn) -> None:
+    """Recompute every group from ``students`` in the caller's transaction."""
+    if conn.dialect.name == "postgresql":
+        # writers wait for the rebuild, so none of their increments is lost
+        conn.execute(text("LOCK TABLE student_stats IN EXCLUSIVE MODE"))
+    conn.execute(delete(StudentStat))
+    active = Student.deleted_at.is_(None)
+    conn.execute(StudentStat.__table__.insert().from_select(
+        ["dimension", "value", "count"],
+        select(literal(TOTAL[0]), literal(TOTAL[1]), func.count()).where(active),
+    ))
+    for name in DIMENSIONS:
+        column = func.coalesce(cast(Student.__table__.c[name], String), NULL)
+        conn.execute(StudentStat.__table__.insert().from_select(
+            ["dimension", "value", "count"],
+            select(literal(name), column, func.count()).where(active).group_by(column),
+        ))
+
+
+class Reconciler:
+    """Daemon thread running ``reconcile`` every ``interval`` seconds."""
+
+    def __init__(self, engine, interval: float):
+        self.engine = engine
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stats-reconcile", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                with self.engine.begin() as conn:
+                    reconcile(conn)
+            except Exception:
+                log.exception("student stats reconciliation failed")
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread = None
+
+
+if __name__ == "__main__":
+    import json
+
+    from app.database import SessionLocal, engine
+
+    with engine.begin() as conn:
+        reconcile(conn)
+    with SessionLocal() as db:
+        print(json.dumps(read_stats(db), indent=2, ensure_ascii=False))
@@ -0,0 +1,113 @@
+"""Large list and search pages, streamed instead of built in memory.
+
+A page of more than ``STUD_STREAM_ROWS`` rows (default 1000), or any page
+requested with ``Accept: application/x-ndjson``, is read through a
+``yield_per`` cursor and sent while it is encoded, ``STUD_STREAM_BATCH``
+rows (default 1000) at a time: a JSON array with the same bytes as a
+buffered page, or one student per line. The worker holds one batch
+whatever the page size. Streamed pages skip the response cache. The query
+runs in the threadpool once the response is being sent, in one snapshot
+(``X-Next-Cursor`` agrees with the rows), also under ``STUD_ASYNC=1``.
+
+``limit`` is capped at ``STUD_MAX_PAGE_LIMIT`` (default 10000) on the list
+and search routes.
+"""
+import os
+from typing import Iterable, Iterator, List, Optional
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from app.bulk import NDJSON_TYPES
+from app.database import ReadSessionLocal
+from app.pagination import NEXT_CURSOR_HEADER, stream_query, stream_rows
+from app.serialization import dumps
+
+MAX_PAGE_LIMIT = int(os.getenv("STUD_MAX_PAGE_LIMIT", "10000"))
+STREAM_ROWS = int(os.getenv("STUD_STREAM_ROWS", "1000"))
+STREAM_BATCH = int(os.getenv("STUD_STREAM_BATCH", "1000"))
+
+
+def wants_ndjson(request: Request) -> bool:
+    accept = request.headers.get("accept", "")
+    return any(media_type in accept for media_type in NDJSON_TYPES)
+
+
+def should_stream(request: Request, limit: int) -> bool:
+    return limit > STREAM_ROWS or wants_ndjson(request)
+
+
+def json_array(batches: Iterable[list], names: List[str]) -> Iterator[bytes]:
+    yield b"["
+    first = True
+    for rows in batches:
+        if not rows:
+            continue
+        # the encoded batch without its brackets
+        items = dumps([dict(zip(names, row)) for row in rows])[1:-1]
+        yield items if first else b"," + items
+        first = False
+    yield b"]"
+
+
+def ndjson_lines(batches: Iterable[list], names: List[str]) -> Iterator[bytes]:
+    for rows in batches:
+        yield b"".join(dumps(dict(zip(names, row))) + b"\n" for row in rows)
+
+
+class PageStream(StreamingResponse):
+    """Streamed page whose query runs when the response is sent, in the
+    threadpool: under STUD_ASYNC=1 the handlers run inside ``run_sync`` on
+    the event loop, where reading the cursor probe and the first batch would
+    block every other request."""
+
+    def __init__(self, open_page, media_type: str):
+        self._open = open_page
+        super().__init__(iter(()), media_type=media_type)
+
+    async def __call__(self, scope, receive, send):
+        db, chunks, next_cursor = await run_in_threadpool(self._open)
+        try:
+            if next_cursor:
+                self.headers[NEXT_CURSOR_HEADER] = next_cursor
+            self.body_iterator = iterate_in_threadpool(chunks)
+            await super().__call__(scope, receive, send)
+        finally:
+            # also when the client leaves before the body is done
+            await run_in_threadpool(db.close)
+
+
+def stream_page(
+    request: Request,
+    q,
+    columns: list,
+    page: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    rank=None,
+) -> StreamingResponse:
+    """Stream the page of Core select ``q`` (of ``columns``) as JSON or NDJSON."""
+    # a bad cursor is a 400 now, before anything is read
+    q, offset, limit = stream_query(q, page, limit, cursor, rank)
+    names = [c.name for c in columns]
+    ndjson = wants_ndjson(request)
+
+    def open_page():
+        # a session of its own, open as long as the body is being sent
+        db = ReadSessionLocal()
+        try:
+            batches, next_cursor = stream_rows(db, q, offset, limit, rank=rank, batch=STREAM_BATCH)
+        except BaseException:
+            db.close()
+            raise
+
+        def body():
+            try:
+                yield from (ndjson_lines if ndjson else json_array)(batches, names)
+            finally:
+                db.close()
+
+        return db, body(), next_cursor
+
+    return PageStream(open_page, "application/x-ndjson" if ndjson else "application/json")
@@ -0,0 +1,106 @@
+"""In-process verification of auth-service access tokens.
+
+Instead of calling ``GET /auth/validate`` on every request, tokens are
+checked locally:
+
+- RS256/ES256 tokens against the public keys published at
+  ``STUD_AUTH_JWKS_URL`` (auth-service ``/auth/.well-known/jwks.json``).
+  Keys are cached for ``STUD_JWKS_TTL_SECONDS`` and refetched early when a
+  token names an unknown ``kid``, which is how a key rotation shows up.
+- HS256 tokens with the shared ``STUD_JWT_SECRET`` (auth-service
+  ``AUTH_JWT_SECRET``).
+
+Revocation (logout) is only known to auth-service; a revoked access token
+stays valid here until its ``exp``, at most AUTH_ACCESS_EXPIRE_MINUTES.
+
+Set ``STUD_REQUIRE_AUTH=1`` to make every student route require a valid
+access token.
+"""
+import json
+import os
+import threading
+import time
+import urllib.request
+from typing import Dict, Optional
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError, jwt
+
+REQUIRE_AUTH = os.getenv("STUD_REQUIRE_AUTH", "0") == "1"
+
+ASYMMETRIC_ALGORITHMS = ["RS256", "ES256"]
+
+
+class TokenVerifier:
+    # never refetch the JWKS more often than this (unknown kids, outages)
+    MIN_REFRESH_INTERVAL = 10
+
+    def __init__(self, jwks_url: Optional[str] = None, secret: Optional[str] = None, ttl: int = 300):
+        self.jwks_url = jwks_url
+        self.secret = secret
+        self.ttl = ttl
+        self._keys: Dict[str, Dict] = {}
+        self._fetched_at = float("-inf")
+        self._retry_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        with urllib.request.urlopen(self.jwks_url, timeout=5) as resp:
+            keys = json.load(resp).get("keys", [])
+        self._keys = {k["kid"]: k for k in keys if "kid" in k}
+        self._fetched_at = time.monotonic()
+
+    def _public_key(self, kid: Optional[str]) -> Optional[Dict]:
+        if not self.jwks_url or not kid:
+            return None
+        now = time.monotonic()
+        stale = now - self._fetched_at > self.ttl
+        if (stale or kid not in self._keys) and now >= self._retry_at:
+            with self._lock:
+                # another thread may have refreshed while we waited
+                if now >= self._retry_at:
+                    self._retry_at = now + self.MIN_REFRESH_INTERVAL
+                    try:
+                        self._refresh()
+                    except (OSError, ValueError):
+                        pass  # keep serving the cached keys while auth-service is unreachable
+        return self._keys.get(kid)
+
+    def verify(self, token: str, expected_type: Optional[str] = "access") -> Optional[Dict]:
+        """Return the token claims, or None if it isn't a valid token."""
+        try:
+            header = jwt.get_unverified_header(token)
+            alg = header.get("alg")
+            # the key type follows from the algorithm, never from the token alone
+            if alg == "HS256":
+                key = self.secret
+            elif alg in ASYMMETRIC_ALGORITHMS:
+                key = self._public_key(header.get("kid"))
+            else:
+                return None
+            if key is None:
+                return None
+            payload = jwt.decode(token, key, algorithms=[alg])
+        except JWTError:
+            return None
+        if expected_type and payload.get("type") != expected_type:
+            return None
+        return payload
+
+
+verifier = TokenVerifier(
+    jwks_url=os.getenv("STUD_AUTH_JWKS_URL"),
+    secret=os.getenv("STUD_JWT_SECRET"),
+    ttl=int(os.getenv("STUD_JWKS_TTL_SECONDS", "300")),
+)
+
+security = HTTPBearer(auto_error=False)
+
+
+def require_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> Dict:
+    """Router dependency returning the verified access token claims."""
+    payload = verifier.verify(credentials.credentials) if credentials else None
+    if not payload:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return payload
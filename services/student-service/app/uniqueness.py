@@ -0,0 +1,84 @@
+"""Email / matricule uniqueness among active students.
+
+Enforced by the partial unique indexes declared on ``Student`` (``WHERE
+deleted_at IS NULL``): writes simply flush and a violation comes back as an
+``IntegrityError``, mapped here to the API's usual 400 messages. One
+statement per write instead of SELECT probes, and no race between the probe
+and the write.
+"""
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import Student
+
+UNIQUE_INDEXES = {index.name for index in Student.__table__.indexes if index.unique}
+
+
+def unique_violation(exc: IntegrityError) -> Optional[str]:
+    """The 400 detail for a duplicate email / matricule, None for other errors."""
+    message = str(exc.orig).lower()
+    # sqlite: "UNIQUE constraint failed: students.email"
+    # postgresql: 'duplicate key value violates unique constraint "uq_students_email_active"'
+    if "unique" not in message and "duplicate" not in message:
+        return None
+    if "matricule" in message:
+        return "Matricule already exists"
+    if "email" in message:
+        return "Email already exists"
+    return None
+
+
+def flush_unique(db: Session) -> None:
+    """Flush pending writes, turning a duplicate email / matricule into a 400."""
+    try:
+        db.flush()
+    except IntegrityError as exc:
+        db.rollback()
+        detail = unique_violation(exc)
+        if detail is None:
+            raise
+        raise HTTPException(status_code=400, detail=detail)
+
+
+def migrate_unique_indexes(conn) -> None:
+    """Move an existing ``students`` table to the partial unique indexes.
+
+    Older databases carry plain unique indexes (``ix_students_email``) or, for
+    the oldest ones, a table-level ``UNIQUE (email)`` that SQLite can only
+    drop by rebuilding the table. Fails if active students already share an
+    email or matricule; those have to be fixed by hand first.
+    """
+    insp = inspect(conn)
+    if not insp.has_table(Student.__tablename__):
+        return
+    constraints = insp.get_unique_constraints(Student.__tablename__)
+    legacy = [
+        ix["name"] for ix in insp.get_indexes(Student.__tablename__)
+        if ix["unique"] and ix["name"] not in UNIQUE_INDEXES
+    ]
+    if constraints:
+        if conn.dialect.name == "sqlite":
+            _rebuild_students(conn)
+        else:
+            for uc in constraints:
+                conn.execute(text(f'ALTER TABLE students DROP CONSTRAINT "{uc["name"]}"'))
+    for name in legacy:
+        conn.execute(text(f'DROP INDEX IF EXISTS "{name}"'))
+    for index in Student.__table__.indexes:
+        index.create(conn, checkfirst=True)
+
+
+def _rebuild_students(conn) -> None:
+    """Recreate ``students`` from the model, keeping ids and the columns it had."""
+    old_columns = {c["name"] for c in inspect(conn).get_columns(Student.__tablename__)}
+    new = Student.__table__.to_metadata(MetaData(), name="students_rebuild")
+    new.indexes.clear()  # created under their real names once renamed
+    new.create(conn)
+    kept = ", ".join(f'"{c.name}"' for c in new.columns if c.name in old_columns)
+    conn.execute(text(f"INSERT INTO students_rebuild ({kept}) SELECT {kept} FROM students"))
+    conn.execute(text("DROP TABLE students"))
+    conn.execute(text("ALTER TABLE students_rebuild RENAME TO students"))
@@ -0,0 +1,56 @@
+"""Resolving N student ids: N x GET /students/{id} vs one POST /students:batchGet.
+
+Requests go through the ASGI app in-process with the response cache off, so
+the figures compare per-request and per-query overhead, not network latency.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+from benchmarks.common import seed_students, temp_db_url
+
+
+def make_client(db_url: str):
+    os.environ["STUD_DATABASE_URL"] = db_url
+    os.environ["STUD_CACHE_MAX_ENTRIES"] = "0"
+    for name in [m for m in sys.modules if m == "app" or m.startswith("app.")]:
+        del sys.modules[name]
+    from fastapi.testclient import TestClient
+
+    from app.database import engine
+    from app.main import app
+    from app.migrations import migrate
+
+    migrate(engine)
+    return TestClient(app), engine
+
+
+def run(size: int, batches, repeat: int) -> None:
+    client, engine = make_client(temp_db_url())
+    seed_students(engine, size)
+    rnd = random.Random(9)
+    with client:
+        for n in batches:
+            ids = rnd.sample(range(1, size + 1), n)
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                for i in ids:
+                    client.get(f"/students/{i}")
+            one_by_one = (time.perf_counter() - t0) / repeat * 1000
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                client.post("/students:batchGet", json={"ids": ids})
+            batched = (time.perf_counter() - t0) / repeat * 1000
+            print(f"{n:>5} ids  one by one {one_by_one:9.1f} ms   batchGet {batched:7.1f} ms"
+                  f"   x{one_by_one / batched:.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=20_000)
+    parser.add_argument("--batches", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.size, args.batches, args.repeat)
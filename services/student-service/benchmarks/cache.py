@@ -0,0 +1,89 @@
+"""Read-heavy workload (95% reads / 5% writes) with the response cache on and off.
+
+Reads are spread over GET /students/{id}, /students/{id}/history and a few
+filtered list pages, skewed towards a hot set of students; writes are PATCH
+/profile and history inserts, which invalidate the affected entries. A
+quarter of the reads revalidate with If-None-Match. Requests go through the
+ASGI app in-process, so the numbers measure the service, not the network.
+"""
+import argparse
+import os
+import random
+import sys
+
+from benchmarks.common import FILIERES, NIVEAUX, seed_students, summary, temp_db_url, timed
+
+
+def make_client(db_url: str, cache_entries: int):
+    os.environ["STUD_DATABASE_URL"] = db_url
+    os.environ["STUD_CACHE_MAX_ENTRIES"] = str(cache_entries)
+    for name in [m for m in sys.modules if m == "app" or m.startswith("app.")]:
+        del sys.modules[name]
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.database import engine
+    from app.migrations import migrate
+
+    migrate(engine)
+    return TestClient(app), engine
+
+
+def workload(client, size: int, write_ratio: float, rnd: random.Random):
+    hot = list(range(1, min(size, 200) + 1))
+    etags = {}
+
+    def pick_id():
+        return rnd.choice(hot) if rnd.random() < 0.8 else rnd.randint(1, size)
+
+    def step():
+        student_id = pick_id()
+        if rnd.random() < write_ratio:
+            if rnd.random() < 0.5:
+                client.patch(f"/students/{student_id}/profile", json={"adresse": f"rue {rnd.random()}"})
+            else:
+                client.post(
+                    f"/students/{student_id}/history",
+                    json={"annee": 2024, "details": "Semestre validé"},
+                )
+            return
+        roll = rnd.random()
+        if roll < 0.6:
+            url = f"/students/{student_id}"
+        elif roll < 0.85:
+            url = f"/students/{student_id}/history"
+        else:
+            url = f"/students?filiere={rnd.choice(FILIERES)}&niveau={rnd.choice(NIVEAUX)}&limit=20"
+        headers = {}
+        if url in etags and rnd.random() < 0.25:
+            headers["If-None-Match"] = etags[url]
+        resp = client.get(url, headers=headers)
+        if "etag" in resp.headers:
+            etags[url] = resp.headers["etag"]
+
+    return step
+
+
+def run(size: int, requests: int, write_ratio: float) -> None:
+    db_url = temp_db_url()
+    seeded = False
+    for label, entries in (("no cache", 0), ("cache", 1000)):
+        client, engine = make_client(db_url, entries)
+        if not seeded:
+            seed_students(engine, size)
+            seeded = True
+        with client:
+            step = workload(client, size, write_ratio, random.Random(11))
+            timed(step, min(requests // 10, 500))  # warm-up
+            samples = timed(step, requests)
+            stats = client.get("/cache/stats").json()
+        print(f"{size:>8} students  {label:<8} {summary(samples)}  hit_ratio={stats['hit_ratio']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--write-ratio", type=float, default=0.05)
+    args = parser.parse_args()
+    run(args.size, args.requests, args.write_ratio)
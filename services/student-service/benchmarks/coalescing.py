@@ -0,0 +1,152 @@
+"""Bursts of identical concurrent reads, with single-flight on and off.
+
+A uvicorn process per mode (sync and STUD_ASYNC=1) and per
+``STUD_SINGLE_FLIGHT`` setting receives ``--rounds`` bursts of
+``--concurrency`` identical requests (a filtered roster page, then one
+student), all sent at once. The response cache is off (``--cache`` keeps
+it), so every burst reaches the database: this measures the coalescing
+alone. For each run: latency percentiles, burst duration, and how many
+times the body was actually built ("builds", the single-flight leaders).
+
+Exits 1 if a response differs from the others in its burst, if a request
+fails, or if single-flight saves less than ``--min-saved`` of the builds.
+How much it saves depends on how many requests arrive while a build is
+running. On a small host with the client sharing the server's CPU, a build
+of a 200-row page is over before the next requests are read, so few of them
+overlap. ``--leader-delay-ms`` (default 20) holds every build that long, like
+a slower query on a loaded database would, so the overlap no longer depends
+on the host; with ``--leader-delay-ms 0`` the gate is only a report
+(``--min-saved 0``) unless set explicitly.
+
+    python -m benchmarks.coalescing --size 100000 --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+from benchmarks.common import summary
+from benchmarks.load import seeded_db, start_server
+
+
+def delayed_app():
+    """uvicorn factory: the service with every build held ``BENCH_LEADER_DELAY_MS``
+    (with single-flight off, every request's)."""
+    from app.cache import response_cache
+    from app.main import app
+
+    delay = float(os.environ["BENCH_LEADER_DELAY_MS"]) / 1000
+    flights = response_cache.flights
+    do = flights.do
+
+    def slow_do(key, fn, tags=()):
+        def build():
+            if in_greenlet():
+                await_only(asyncio.sleep(delay))  # STUD_ASYNC: don't block the loop
+            else:
+                time.sleep(delay)
+            return fn()
+
+        return do(key, build, tags)
+
+    flights.do = slow_do
+    return app
+
+
+async def burst(http: httpx.AsyncClient, url: str, concurrency: int, latencies: list) -> set:
+    async def one():
+        t0 = time.perf_counter()
+        r = await http.get(url)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        r.raise_for_status()
+        return r.content
+
+    return set(await asyncio.gather(*(one() for _ in range(concurrency))))
+
+
+async def drive(base_url: str, urls: list, concurrency: int, rounds: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    latencies, bursts = [], []
+    consistent = True
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as http:
+        # open the connections first, so bursts measure requests, not handshakes
+        await asyncio.gather(*(http.get("/cache/stats") for _ in range(concurrency)))
+        before = (await http.get("/cache/stats")).json()
+        for _ in range(rounds):
+            for url in urls:
+                t0 = time.perf_counter()
+                bodies = await burst(http, url, concurrency, latencies)
+                bursts.append((time.perf_counter() - t0) * 1000)
+                consistent = consistent and len(bodies) == 1
+        after = (await http.get("/cache/stats")).json()
+    requests = len(latencies)
+    leaders = after["leaders"] - before["leaders"]
+    return {
+        "requests": requests,
+        # with single-flight off every request builds its own body
+        "builds": leaders if leaders else requests,
+        "coalesced": after["coalesced"] - before["coalesced"],
+        "burst_ms": round(sum(bursts) / len(bursts), 1),
+        "consistent": consistent,
+        **summary(latencies),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=200, help="rows in the roster page")
+    parser.add_argument("--modes", nargs="+", choices=["sync", "async"], default=["sync", "async"])
+    parser.add_argument("--cache", action="store_true", help="keep the response cache on")
+    parser.add_argument("--leader-delay-ms", type=float, default=20.0, help="added to every build")
+    parser.add_argument("--min-saved", type=float, help="fraction of builds saved (default 0.2, 0 without delay)")
+    parser.add_argument("--port", type=int, default=8196)
+    args = parser.parse_args()
+    if args.min_saved is None:
+        args.min_saved = 0.2 if args.leader_delay_ms else 0.0
+
+    db_url = seeded_db(args.size)
+    os.environ["STUD_CACHE_MAX_ENTRIES"] = "1000" if args.cache else "0"
+    # a burst can outlast uvicorn's 5 s keep-alive, which would drop the idle connections
+    os.environ["UVICORN_TIMEOUT_KEEP_ALIVE"] = "300"
+    os.environ["BENCH_LEADER_DELAY_MS"] = str(args.leader_delay_ms)
+    urls = [f"/students?filiere=GL&niveau=L3&limit={args.limit}", "/students/1"]
+
+    failed = False
+    print(f"{args.concurrency} identical requests per burst, {args.rounds} rounds of {urls}, "
+          f"{args.leader_delay_ms:g} ms added to each build")
+    for mode in args.modes:
+        builds = {}
+        for single_flight in ("0", "1"):
+            os.environ["STUD_SINGLE_FLIGHT"] = single_flight
+            proc = start_server(db_url, args.port, async_mode=mode == "async",
+                                app="benchmarks.coalescing:delayed_app", factory=True)
+            try:
+                result = asyncio.run(drive(f"http://127.0.0.1:{args.port}", urls, args.concurrency, args.rounds))
+            except httpx.HTTPError as exc:
+                print(f"{mode:<5} single_flight={single_flight}: request failed: {exc!r}")
+                failed = True
+                continue
+            finally:
+                proc.terminate()
+                proc.wait()
+            builds[single_flight] = result["builds"]
+            failed = failed or not result["consistent"]
+            print(f"{mode:<5} single_flight={single_flight} {result}")
+        if len(builds) == 2:
+            saved = 1 - builds["1"] / builds["0"]
+            print(f"{mode}: single-flight saved {saved:.0%} of the builds")
+            if saved < args.min_saved:
+                print(f"  less than {args.min_saved:.0%}")
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
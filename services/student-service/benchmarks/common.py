@@ -0,0 +1,135 @@
+"""Helpers shared by the student-service benchmarks.
+
+Run benchmarks from the service directory, e.g.::
+
+    python -m benchmarks.search --sizes 10000 100000
+"""
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert
+
+from app.database import Base
+from app.models import AcademicHistory, Student
+
+FILIERES = ["GL", "RT", "IIA", "IMI", "CH", "BIO"]
+NIVEAUX = ["L1", "L2", "L3", "M1", "M2"]
+PRENOMS = ["Mehdi", "Hélène", "Yassine", "Amira", "Sami", "Inès", "Rania", "Aymen", "Zoé"]
+# ~8k synthetic surnames so that name searches are as selective as real ones
+_SYLLABLES = ["ben", "tra", "bel", "gha", "ham", "jeb", "man", "sour", "dou", "zizi",
+              "ri", "ma", "lé", "si", "ka", "mou", "sa", "di", "na", "ché"]
+NOMS = sorted({(a + b + c).capitalize() for a in _SYLLABLES for b in _SYLLABLES for c in _SYLLABLES})
+
+
+def temp_db_url(name: str = "bench.db") -> str:
+    return "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="stud-bench-"), name)
+
+
+def temp_engine(name: str = "bench.db"):
+    engine = create_engine(temp_db_url(name), connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def student_row(i: int, rnd: random.Random) -> dict:
+    nom, prenom = rnd.choice(NOMS), rnd.choice(PRENOMS)
+    return {
+        "fullname": f"{prenom} {nom}",
+        "nom": nom,
+        "prenom": prenom,
+        "email": f"student{i}@university.com",
+        "age": rnd.randint(18, 30),
+        "matricule": f"{2015 + i % 10}-{i:07d}",
+        "filiere": rnd.choice(FILIERES),
+        "niveau": rnd.choice(NIVEAUX),
+        "anneeInscription": 2015 + i % 10,
+        "statut": "ACTIF",
+    }
+
+
+def seed_students(engine, count: int, seed: int = 42, chunk: int = 10000) -> None:
+    rnd = random.Random(seed)
+    with engine.begin() as conn:
+        for start in range(0, count, chunk):
+            rows = [student_row(i, rnd) for i in range(start, min(start + chunk, count))]
+            conn.execute(insert(Student), rows)
+
+
+def seed_history(engine, students: int, per_student: int, seed: int = 7, chunk: int = 20000) -> None:
+    """``per_student`` history rows for students 1..``students``."""
+    rnd = random.Random(seed)
+    now = datetime.utcnow()
+    rows = (
+        {"student_id": sid, "annee": 2015 + rnd.randint(0, 9), "details": f"semestre {k + 1}", "created_at": now}
+        for sid in range(1, students + 1) for k in range(per_student)
+    )
+    with engine.begin() as conn:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk:
+                conn.execute(insert(AcademicHistory), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(AcademicHistory), batch)
+
+
+def timed(fn, repeat: int):
+    """Run ``fn`` ``repeat`` times and return latencies in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def percentile(ordered, p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def summary(samples) -> dict:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(percentile(ordered, 0.95), 3),
+        "p99_ms": round(percentile(ordered, 0.99), 3),
+    }
+
+
+async def drive(http, next_request, requests: int, concurrency: int, warmup: int = 0) -> dict:
+    """Send ``requests`` requests from ``concurrency`` concurrent tasks.
+
+    ``next_request(i)`` returns ``(method, url, httpx kwargs)`` for request
+    ``i``; the first ``warmup`` are sent one by one and not measured.
+    """
+    for i in range(warmup):
+        method, url, kwargs = next_request(i)
+        await http.request(method, url, **kwargs)
+
+    latencies, statuses = [], {}
+    pending = iter(range(warmup, warmup + requests))
+
+    async def worker():
+        for i in pending:
+            method, url, kwargs = next_request(i)
+            t0 = time.perf_counter()
+            try:
+                status = str((await http.request(method, url, **kwargs)).status_code)
+            except Exception as exc:
+                status = type(exc).__name__
+            latencies.append((time.perf_counter() - t0) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    errors = sum(n for status, n in statuses.items() if not status.isdigit() or int(status) >= 400)
+    return {"requests": len(latencies), "errors": errors, "statuses": statuses, "seconds": round(elapsed, 3),
+            "req_s": round(len(latencies) / elapsed, 1), **summary(latencies)}
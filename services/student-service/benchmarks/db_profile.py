@@ -0,0 +1,125 @@
+"""Mixed read/write throughput under each SQLite engine profile.
+
+Worker threads share one seeded database file and run a mix of reads
+(student by id, filtered list page) and writes (profile update, history
+insert) through the service's own session factories, as the routes would.
+Profiles compared:
+
+- default: rollback journal, one pool (STUD_DB_PROFILE=default)
+- wal: WAL + tuned PRAGMAs (STUD_DB_PROFILE=wal)
+- wal+read: the same plus the read-only pool for reads (STUD_DB_READ_POOL=1)
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy.exc import OperationalError
+
+from benchmarks.common import FILIERES, NIVEAUX, seed_students, summary, temp_db_url
+
+PROFILES = [
+    ("default", {"STUD_DB_PROFILE": "default", "STUD_DB_READ_POOL": "0"}),
+    ("wal", {"STUD_DB_PROFILE": "wal", "STUD_DB_READ_POOL": "0"}),
+    ("wal+read", {"STUD_DB_PROFILE": "wal", "STUD_DB_READ_POOL": "1"}),
+]
+
+
+def load_database(db_url: str, env: dict):
+    os.environ.update(env, STUD_DATABASE_URL=db_url)
+    for name in [m for m in sys.modules if m == "app" or m.startswith("app.")]:
+        del sys.modules[name]
+    from app import database, models
+    from app.migrations import migrate
+
+    migrate(database.engine)
+    return database, models
+
+
+def run(label: str, env: dict, template: str, size: int, threads: int, seconds: float, write_ratio: float):
+    # each profile starts from a copy of the same seeded file
+    db_url = temp_db_url()
+    shutil.copy(template, db_url[len("sqlite:///"):])
+    database, models = load_database(db_url, env)
+    Student, AcademicHistory = models.Student, models.AcademicHistory
+
+    def read(rnd):
+        with database.ReadSessionLocal() as db:
+            if rnd.random() < 0.7:
+                db.query(Student).filter(Student.id == rnd.randint(1, size), Student.deleted_at.is_(None)).first()
+            else:
+                (db.query(Student)
+                 .filter(Student.deleted_at.is_(None), Student.filiere == rnd.choice(FILIERES),
+                         Student.niveau == rnd.choice(NIVEAUX))
+                 .order_by(Student.id).limit(20).all())
+
+    def write(rnd):
+        with database.SessionLocal() as db:
+            student_id = rnd.randint(1, size)
+            if rnd.random() < 0.5:
+                db.query(Student).filter(Student.id == student_id).update(
+                    {Student.telephone: f"+216 {rnd.randint(10**7, 10**8 - 1)}"})
+            else:
+                db.add(AcademicHistory(student_id=student_id, annee=2024, details="bench",
+                                       created_at=datetime.utcnow()))
+            db.commit()
+
+    reads, writes, errors = [], [], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(seed: int):
+        rnd = random.Random(seed)
+        local_reads, local_writes, local_errors = [], [], 0
+        while time.perf_counter() < deadline:
+            is_write = rnd.random() < write_ratio
+            t0 = time.perf_counter()
+            try:
+                (write if is_write else read)(rnd)
+            except OperationalError:
+                local_errors += 1  # database is locked
+                continue
+            (local_writes if is_write else local_reads).append((time.perf_counter() - t0) * 1000)
+        with lock:
+            reads.extend(local_reads)
+            writes.extend(local_writes)
+            errors[0] += local_errors
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    t0 = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - t0
+    database.engine.dispose()
+    if database.read_engine is not None:
+        database.read_engine.dispose()
+
+    ops = len(reads) + len(writes)
+    print(f"{label:<9} threads={threads} ops/s={ops / elapsed:8.1f} errors={errors[0]}")
+    print(f"          reads  {summary(reads) if reads else {}}")
+    print(f"          writes {summary(writes) if writes else {}}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=50_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[4, 16])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    template_url = temp_db_url("template.db")
+    database, _ = load_database(template_url, PROFILES[0][1])
+    seed_students(database.engine, args.size)
+    database.engine.dispose()
+    template = template_url[len("sqlite:///"):]
+
+    for threads in args.threads:
+        for label, env in PROFILES:
+            run(label, env, template, args.size, threads, args.seconds, args.write_ratio)
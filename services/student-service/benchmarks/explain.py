@@ -0,0 +1,180 @@
+"""Print SQLite's EXPLAIN QUERY PLAN for every query the student routes run.
+
+Every route is called once against a seeded temporary database (migrated
+like a real one, then ANALYZEd); the SQL statements each call executes are
+captured with their parameters and explained. With ``--check``, any full
+table scan of ``students``, ``academic_history`` or ``student_changes``
+outside the routes that legitimately read everything exits non-zero, so a
+lost index fails CI. Routes with several query shapes (offset and cursor
+pages, ``?ids=``, ``?fields=``, batch reads and writes, the change feed)
+are called once per shape; add a call here with every new route or shape::
+
+    python -m benchmarks.explain
+    python -m benchmarks.explain --check --size 20000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, insert, text
+
+from benchmarks.common import seed_students, temp_db_url
+
+# a full scan reads every row: "SCAN students", "SCAN students USING INDEX ..."
+# (not "SEARCH ...", nor the FTS virtual table)
+FULL_SCAN = re.compile(r"^SCAN (students|academic_history|student_changes)\b(?! VIRTUAL TABLE)")
+
+NDJSON, CSV = "application/x-ndjson", "text/csv"
+
+
+def route_calls(student_id: int, history_id: int, cursors: dict):
+    """(label, method, path, body, full scans allowed) for every route and query
+    shape. ``body`` is sent as JSON, or as is when it is a (content type, text)
+    pair; ``cursors`` holds the X-Next-Cursor of the first page of "list" and
+    "list filiere+niveau"."""
+    body = {
+        "fullname": "Plan Test", "nom": "Test", "prenom": "Plan", "email": "plan@university.com",
+        "age": 21, "matricule": "PLAN-0001", "filiere": "GL", "niveau": "L3", "anneeInscription": 2021,
+    }
+    ndjson = "\n".join(
+        '{"fullname": "Bulk %d", "email": "bulk%d@university.com", "age": 20, "matricule": "BULK-%04d"}' % (i, i, i)
+        for i in range(20)
+    )
+    csv = "fullname,email,age,matricule\n" + "\n".join(
+        f"Csv {i},csv{i}@university.com,20,CSV-{i:04d}" for i in range(20)
+    )
+    ids = ",".join(str(student_id + k) for k in (0, 7, 3))
+    return [
+        ("create", "POST", "/students", body, False),
+        ("list", "GET", "/students?limit=20", None, True),
+        ("list offset", "GET", "/students?page=50&limit=20", None, True),
+        ("list cursor", "GET", f"/students?limit=20&cursor={cursors['list']}", None, False),
+        ("list fields", "GET", "/students?limit=20&fields=fullname,email", None, True),
+        ("list ids", "GET", f"/students?ids={ids}", None, False),
+        # a page above STUD_STREAM_ROWS is streamed in batches
+        ("list streamed", "GET", "/students?limit=2000", None, True),
+        # one filiere in six: walking the table in id order stops at LIMIT sooner
+        # than sorting every match, and SQLite rightly prefers that
+        ("list filiere", "GET", "/students?filiere=GL&limit=20", None, True),
+        ("list filiere+niveau", "GET", "/students?filiere=GL&niveau=L3&limit=20", None, False),
+        ("list filiere+niveau cursor", "GET",
+         f"/students?filiere=GL&niveau=L3&limit=20&cursor={cursors['list filiere+niveau']}", None, False),
+        ("list all filters", "GET", "/students?filiere=GL&niveau=L3&annee=2021&limit=20", None, False),
+        ("search", "GET", "/students/search?q=ben&limit=20", None, False),
+        ("batch get ids", "POST", "/students:batchGet", {"ids": [student_id, student_id + 1, 999999999]}, False),
+        ("batch get matricules", "POST", "/students:batchGet",
+         {"matricules": ["PLAN-0001", "NOPE"], "fields": ["fullname"]}, False),
+        ("bulk ndjson", "POST", "/students/bulk", (NDJSON, ndjson), False),
+        ("bulk csv", "POST", "/students/bulk", (CSV, csv), False),
+        ("export", "GET", "/students/export?format=ndjson", None, True),
+        # student_stats is the summary table itself, read whole by design
+        ("stats", "GET", "/students/stats", None, False),
+        ("changes", "GET", "/students/changes?since=0&limit=50", None, False),
+        ("changes since", "GET", "/students/changes?since=3", None, False),
+        # nothing newer: the retention watermark is read too
+        ("changes caught up", "GET", "/students/changes?since=1000000000", None, False),
+        ("get", "GET", f"/students/{student_id}", None, False),
+        ("update", "PUT", f"/students/{student_id}", {**body, "email": "plan2@university.com",
+                                                      "matricule": "PLAN-0002"}, False),
+        ("profile", "PATCH", f"/students/{student_id}/profile", {"telephone": "+216 00 000 000"}, False),
+        ("history list", "GET", f"/students/{student_id}/history", None, False),
+        ("history add", "POST", f"/students/{student_id}/history", {"annee": 2024, "details": "x"}, False),
+        ("history batch", "POST", f"/students/{student_id}/history:batch",
+         [{"annee": 2024, "details": f"batch {k}"} for k in range(5)], False),
+        ("history delete", "DELETE", f"/students/{student_id}/history/{history_id}", None, False),
+        ("delete", "DELETE", f"/students/{student_id}", None, False),
+    ]
+
+
+def seed_history(engine, students: int, per_student: int = 3) -> None:
+    rnd = random.Random(5)
+    start = datetime(2020, 9, 1)
+    rows = [
+        {"student_id": sid, "annee": 2020 + k, "details": "Semestre validé",
+         "created_at": start + timedelta(days=rnd.randint(0, 1500))}
+        for sid in range(1, students + 1) for k in range(per_student)
+    ]
+    from app.models import AcademicHistory
+
+    with engine.begin() as conn:
+        conn.execute(insert(AcademicHistory), rows)
+
+
+def main(size: int, check: bool) -> int:
+    os.environ["STUD_DATABASE_URL"] = temp_db_url("explain.db")
+    os.environ["STUD_CACHE_MAX_ENTRIES"] = "0"  # every call must reach the database
+    for name in [m for m in sys.modules if m == "app" or m.startswith("app.")]:
+        del sys.modules[name]  # benchmarks.common already bound app.database to the default URL
+    from fastapi.testclient import TestClient
+
+    from app.database import engine
+    from app.main import app
+    from app.migrations import migrate
+    from app.pagination import NEXT_CURSOR_HEADER
+    from app.search import ensure_search_index
+
+    migrate(engine)
+    seed_students(engine, size)
+    seed_history(engine, size)
+    # rebuild the FTS index over the seeded rows
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE students_fts"))
+    ensure_search_index(engine)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    captured = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "INSERT", "UPDATE", "DELETE")):
+            # executemany: a list of parameter sets, except for the batches of
+            # "insertmanyvalues", which arrive as one flat set
+            many = executemany and parameters and isinstance(parameters[0], (tuple, list, dict))
+            captured.append((statement, parameters[0] if many else parameters))
+
+    failures = 0
+    client = TestClient(app)
+    with client:
+        history_id = client.post(
+            f"/students/{size // 2}/history", json={"annee": 2024, "details": "plan"}
+        ).json()["id"]
+        cursors = {
+            "list": client.get("/students?limit=20").headers[NEXT_CURSOR_HEADER],
+            "list filiere+niveau": client.get("/students?filiere=GL&niveau=L3&limit=20").headers[NEXT_CURSOR_HEADER],
+        }
+        for label, method, path, body, allow_scan in route_calls(size // 2, history_id, cursors):
+            captured.clear()
+            if isinstance(body, tuple):
+                resp = client.request(method, path, content=body[1], headers={"content-type": body[0]})
+            else:
+                resp = client.request(method, path, json=body)
+            statements = list(captured)
+            print(f"== {label}: {method} {path} -> {resp.status_code}")
+            with engine.connect() as conn:
+                for statement, params in statements:
+                    plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, params).all()
+                    print("   " + " ".join(statement.split())[:160])
+                    for row in plan:
+                        detail = row[-1]
+                        scan = bool(FULL_SCAN.match(detail))
+                        flag = ""
+                        if scan and not allow_scan:
+                            flag = "   <-- full scan"
+                            failures += 1
+                        print(f"      {detail}{flag}")
+    if check and failures:
+        print(f"{failures} unexpected full scan(s)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=5000, help="students seeded")
+    parser.add_argument("--check", action="store_true", help="exit 1 on unexpected full scans")
+    args = parser.parse_args()
+    sys.exit(main(args.size, args.check))
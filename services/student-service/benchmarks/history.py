@@ -0,0 +1,102 @@
+"""Academic history appends per second: one commit per record vs group commit vs batch.
+
+Worker threads call the history route handlers directly (as the threadpool
+would), each with its own session:
+
+- single: ``POST /students/{id}/history``, one transaction per record;
+- group: the same with ``STUD_HISTORY_GROUP_COMMIT=1``, concurrent records
+  share a transaction every ``--window-ms``;
+- batch: ``POST /students/{id}/history:batch`` with ``--batch`` records per call.
+
+Commits are fsync-bound, so the default is the rollback-journal profile with
+``synchronous=FULL``; pass ``--profile wal`` for the tuned one.
+"""
+import argparse
+import os
+import shutil
+import sys
+import threading
+import time
+
+from benchmarks.common import seed_students, temp_db_url
+
+MODES = [
+    ("single", {"STUD_HISTORY_GROUP_COMMIT": "0"}),
+    ("group", {"STUD_HISTORY_GROUP_COMMIT": "1"}),
+    ("batch", {"STUD_HISTORY_GROUP_COMMIT": "0"}),
+]
+
+
+def load_app(db_url: str, env: dict):
+    os.environ.update(env, STUD_DATABASE_URL=db_url, STUD_CACHE_MAX_ENTRIES="0")
+    for name in [m for m in sys.modules if m == "app" or m.startswith("app.")]:
+        del sys.modules[name]
+    from app import database, history
+    from app.migrations import migrate
+    from app.routes import students
+    from app.schemas import AcademicHistoryCreate
+
+    migrate(database.engine)
+    return database, history, students, AcademicHistoryCreate
+
+
+def run(label: str, env: dict, template: str, size: int, threads: int, seconds: float, batch: int):
+    db_url = temp_db_url()
+    shutil.copy(template, db_url[len("sqlite:///"):])
+    database, history, students, AcademicHistoryCreate = load_app(db_url, env)
+
+    def append(i: int, n: int):
+        student_id = i % size + 1
+        with database.SessionLocal() as db:
+            if label == "batch":
+                items = [AcademicHistoryCreate(annee=2024, details=f"note {j}") for j in range(n)]
+                return len(students.add_academic_history_batch(student_id, items, db=db))
+            students.add_academic_history(student_id, AcademicHistoryCreate(annee=2024, details="note"), db=db)
+            return 1
+
+    counts = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def worker(k: int):
+        i = k
+        while time.perf_counter() < deadline:
+            counts[k] += append(i, batch)
+            i += threads
+
+    workers = [threading.Thread(target=worker, args=(k,)) for k in range(threads)]
+    t0 = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - t0
+    committer = history.group_committer
+    if committer is not None:
+        committer.stop()
+        extra = f"  commits={committer.commits} records/commit={committer.records / max(committer.commits, 1):.1f}"
+    else:
+        extra = ""
+    database.engine.dispose()
+    print(f"{label:<7} threads={threads:<3} inserts/s={sum(counts) / elapsed:9.1f}{extra}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--window-ms", default="5")
+    parser.add_argument("--profile", default="default")
+    args = parser.parse_args()
+
+    base = {"STUD_DB_PROFILE": args.profile, "STUD_HISTORY_GROUP_COMMIT_MS": args.window_ms}
+    template_url = temp_db_url("template.db")
+    database, *_ = load_app(template_url, base)
+    seed_students(database.engine, args.size)
+    database.engine.dispose()
+    template = template_url[len("sqlite:///"):]
+
+    for threads in args.threads:
+        for label, env in MODES:
+            run(label, {**base, **env}, template, args.size, threads, args.seconds, args.batch)
@@ -0,0 +1,106 @@
+"""Load test: sync vs async (STUD_ASYNC=1) student-service under uvicorn.
+
+Starts one uvicorn process per mode on a seeded temporary database and drives
+a read mix (GET /students/{id} and filtered GET /students) from N concurrent
+clients, reporting req/s and latency percentiles for each concurrency level.
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+from sqlalchemy import create_engine
+
+from app.database import Base
+from benchmarks.common import FILIERES, NIVEAUX, seed_students, summary, temp_db_url
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def seeded_db(size: int) -> str:
+    url = temp_db_url()
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    seed_students(engine, size)
+    engine.dispose()
+    return url
+
+
+def start_server(db_url: str, port: int, async_mode: bool, app: str = "app.main:app",
+                 factory: bool = False) -> subprocess.Popen:
+    env = dict(os.environ, STUD_DATABASE_URL=db_url, STUD_ASYNC="1" if async_mode else "0")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning",
+         *(["--factory"] if factory else [])],
+        cwd=SERVICE_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline and proc.poll() is None:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/students?limit=1", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("student-service did not start")
+
+
+async def drive(base_url: str, size: int, clients: int, requests_per_client: int) -> dict:
+    rnd = random.Random(clients)
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    latencies = []
+    errors = 0
+
+    async def client(http: httpx.AsyncClient):
+        nonlocal errors
+        for _ in range(requests_per_client):
+            if rnd.random() < 0.7:
+                url = f"/students/{rnd.randint(1, size)}"
+            else:
+                url = f"/students?filiere={rnd.choice(FILIERES)}&niveau={rnd.choice(NIVEAUX)}&limit=20"
+            t0 = time.perf_counter()
+            try:
+                r = await http.get(url)
+                if r.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as http:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(clients)))
+        elapsed = time.perf_counter() - t0
+
+    return {"req_s": round(len(latencies) / elapsed, 1), "errors": errors, **summary(latencies)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 100, 200, 500])
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--port", type=int, default=8190)
+    args = parser.parse_args()
+
+    db_url = seeded_db(args.size)
+    for label, async_mode in (("sync", False), ("async", True)):
+        proc = start_server(db_url, args.port, async_mode)
+        try:
+            for clients in args.clients:
+                result = asyncio.run(drive(f"http://127.0.0.1:{args.port}", args.size, clients, args.requests))
+                print(f"{label:<6} clients={clients:<4} {result}")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
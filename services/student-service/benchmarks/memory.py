@@ -0,0 +1,97 @@
+"""Peak RSS of the server while it sends one large list page.
+
+For each ``--sizes`` N, a fresh uvicorn process serves ``GET /students?limit=N``
+once, and its peak resident set (``VmHWM`` in ``/proc``, so Linux only) is
+read afterwards. Every size is run streamed (the default above
+``STUD_STREAM_ROWS``), as NDJSON, and buffered (``STUD_STREAM_ROWS`` raised
+above N), which is how every page was served before.
+
+The exit status is 1 when the streamed peak grows by more than
+``--max-growth-mb`` from the smallest size to the largest, so this can run
+as a check. The server uses SQLite's default settings unless ``--db-profile
+wal``: that profile's 64 MB page cache and 256 MB mmap fill up with database
+pages as a large table is read, which is bounded by those settings rather
+than by the page size and would hide what the response itself costs.
+
+    python -m benchmarks.memory --sizes 1000 10000 100000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+import httpx
+
+from benchmarks.common import temp_db_url
+from benchmarks.load import start_server
+from benchmarks.suite import seeded_database
+
+MODES = ("streamed", "ndjson", "buffered")
+
+
+def peak_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("VmHWM not found")
+
+
+def measure(db_url: str, size: int, mode: str, port: int) -> dict:
+    os.environ["STUD_STREAM_ROWS"] = str(size) if mode == "buffered" else "1000"
+    proc = start_server(db_url, port, async_mode=False)
+    try:
+        before = peak_rss_mb(proc.pid)
+        headers = {"Accept": "application/x-ndjson"} if mode == "ndjson" else {}
+        received = 0
+        with httpx.stream("GET", f"http://127.0.0.1:{port}/students?limit={size}", headers=headers, timeout=600) as r:
+            r.raise_for_status()
+            for chunk in r.iter_raw():
+                received += len(chunk)
+        return {"size": size, "mode": mode, "bytes": received,
+                "idle_mb": round(before, 1), "peak_mb": round(peak_rss_mb(proc.pid), 1)}
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--max-growth-mb", type=float, default=10.0)
+    parser.add_argument("--db-profile", choices=["default", "wal"], default="default")
+    parser.add_argument("--port", type=int, default=8195)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "stud-bench-data"))
+    args = parser.parse_args()
+
+    sizes = sorted(args.sizes)
+    db_url = temp_db_url("students.db")
+    shutil.copy(seeded_database(args.data_dir, sizes[-1], 0), db_url[len("sqlite:///"):])
+    # the cap is what is being exceeded here
+    os.environ["STUD_MAX_PAGE_LIMIT"] = str(sizes[-1])
+    os.environ["STUD_COMPRESSION"] = "0"
+    os.environ["STUD_DB_PROFILE"] = args.db_profile
+
+    peaks = {}
+    print(f"{'rows':>8} {'mode':<9} {'body MB':>8} {'idle MB':>8} {'peak MB':>8}")
+    for size in sizes:
+        for mode in args.modes:
+            result = measure(db_url, size, mode, args.port)
+            peaks[(mode, size)] = result["peak_mb"]
+            print(f"{size:>8} {mode:<9} {result['bytes'] / 2**20:>8.1f} {result['idle_mb']:>8.1f} {result['peak_mb']:>8.1f}")
+
+    failed = False
+    for mode in ("streamed", "ndjson"):
+        if mode in args.modes and len(sizes) > 1:
+            growth = peaks[(mode, sizes[-1])] - peaks[(mode, sizes[0])]
+            print(f"{mode}: peak grew {growth:.1f} MB from {sizes[0]} to {sizes[-1]} rows")
+            if growth > args.max_growth_mb:
+                print(f"  more than the allowed {args.max_growth_mb} MB")
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Overhead of the metrics instrumentation (app/metrics.py).
+
+- request path: a trivial route called straight through the ASGI interface
+  (no HTTP server, no client), with and without ``MetricsMiddleware``;
+- statement path: ``SELECT 1`` on an in-memory SQLite engine, with and
+  without the engine hooks.
+
+The difference of the medians is the per-request / per-statement cost.
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from app.metrics import MetricsMiddleware, instrument_engine
+from benchmarks.common import summary, timed
+
+
+def make_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/students/{student_id}")
+    async def ping(student_id: int):
+        return {"id": student_id}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def call(app, path: str) -> None:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+def bench_requests(repeat: int) -> None:
+    loop = asyncio.new_event_loop()
+    for label, instrumented in (("plain", False), ("metrics", True)):
+        app = make_app(instrumented)
+        loop.run_until_complete(call(app, "/students/1"))  # builds the middleware stack
+        samples = timed(lambda: loop.run_until_complete(call(app, "/students/1")), repeat)
+        print(f"request    {label:<8} {summary(samples)}")
+    loop.close()
+
+
+def bench_statements(repeat: int) -> None:
+    for label, instrumented in (("plain", False), ("metrics", True)):
+        engine = create_engine("sqlite://")
+        if instrumented:
+            instrument_engine(engine, "bench")
+        with engine.connect() as conn:
+            stmt = text("SELECT 1")
+            conn.execute(stmt)
+            t0 = time.perf_counter()
+            samples = timed(lambda: conn.execute(stmt).scalar(), repeat)
+        print(f"statement  {label:<8} {summary(samples)}  total={time.perf_counter() - t0:.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20_000)
+    args = parser.parse_args()
+    bench_requests(args.repeat)
+    bench_statements(args.repeat)
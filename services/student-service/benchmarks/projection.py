@@ -0,0 +1,77 @@
+"""Cost per 1,000 rows of listing students: full ORM entities vs projected Core rows.
+
+- orm: ``db.query(Student)`` entities dumped through the ``StudentOut``
+  serializer (app/serialization.py);
+- core all: a Core ``select`` of every StudentOut column, dumped as rows by
+  the same serializer (the default ``GET /students`` path);
+- core N: a Core ``select`` of a few list columns, dumped as dicts
+  (``?fields=``).
+
+Reports fetch (query + row construction) and serialize times separately.
+"""
+import argparse
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Student
+from app.projection import as_dicts, student_columns
+from app.routes.students import student_json
+from app.serialization import dumps
+from benchmarks.common import seed_students, summary, temp_engine
+
+LIST_FIELDS = ["fullname", "matricule", "filiere", "niveau"]
+
+
+def measure(fetch, serialize, repeat: int):
+    fetch_ms, serialize_ms = [], []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        rows = fetch()
+        t1 = time.perf_counter()
+        serialize(rows)
+        t2 = time.perf_counter()
+        fetch_ms.append((t1 - t0) * 1000)
+        serialize_ms.append((t2 - t1) * 1000)
+    return summary(fetch_ms), summary(serialize_ms)
+
+
+def run(size: int, rows: int, repeat: int) -> None:
+    engine = temp_engine()
+    seed_students(engine, size)
+    Session = sessionmaker(bind=engine)
+    scale = 1000 / rows
+
+    def orm():
+        with Session() as db:
+            return db.query(Student).filter(Student.deleted_at.is_(None)).order_by(Student.id).limit(rows).all()
+
+    def core(columns):
+        def fetch():
+            with Session() as db:
+                q = select(*columns).where(Student.deleted_at.is_(None)).order_by(Student.id).limit(rows)
+                return db.execute(q).all()
+        return fetch
+
+    all_columns = student_columns(None)
+    few_columns = student_columns(LIST_FIELDS)
+    cases = [
+        ("orm", orm, student_json.objects),
+        ("core all", core(all_columns), student_json.rows),
+        (f"core {len(few_columns)}", core(few_columns), lambda r: dumps(as_dicts(r, few_columns))),
+    ]
+    print(f"ms per 1000 rows ({rows} rows per call, p50)")
+    for label, fetch, serialize in cases:
+        fetched, serialized = measure(fetch, serialize, repeat)
+        print(f"  {label:<9} fetch {fetched['p50_ms'] * scale:7.2f}   serialize {serialized['p50_ms'] * scale:7.2f}"
+              f"   total {(fetched['p50_ms'] + serialized['p50_ms']) * scale:7.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20_000)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+    run(args.size, args.rows, args.repeat)
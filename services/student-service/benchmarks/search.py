@@ -0,0 +1,61 @@
+"""p50/p99 latency of GET /students/search: FTS5 index vs. the old ILIKE scan."""
+import argparse
+import random
+
+from sqlalchemy import or_
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Student
+from app.search import ensure_search_index, search_query
+from benchmarks.common import NOMS, PRENOMS, seed_students, summary, temp_engine, timed
+
+_rnd = random.Random(3)
+QUERIES = (
+    [n[:5] for n in _rnd.sample(NOMS, 40)]
+    + [f"{p} {n[:4]}" for p, n in zip(PRENOMS, _rnd.sample(NOMS, len(PRENOMS)))]
+    + ["2019-00012", "2021-0004"]
+)
+
+
+def ilike_search(db, q):
+    return (
+        db.query(Student)
+        .filter(Student.deleted_at.is_(None))
+        .filter(
+            or_(
+                Student.fullname.ilike(f"%{q}%"),
+                Student.nom.ilike(f"%{q}%"),
+                Student.prenom.ilike(f"%{q}%"),
+                Student.matricule.ilike(f"%{q}%"),
+            )
+        )
+        .offset(0)
+        .limit(10)
+        .all()
+    )
+
+
+def fts_search(db, q):
+    query, rank = search_query(db, q)
+    return query.add_columns(rank).order_by(rank, Student.id).limit(10).all()
+
+
+def run(size: int, repeat: int) -> None:
+    engine = temp_engine()
+    seed_students(engine, size)
+    ensure_search_index(engine)
+    db = sessionmaker(bind=engine)()
+    rnd = random.Random(7)
+    for label, fn in (("ilike", ilike_search), ("fts5", fts_search)):
+        samples = timed(lambda: fn(db, rnd.choice(QUERIES)), repeat)
+        print(f"{size:>9} students  {label:<6} {summary(samples)}")
+    db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.repeat)
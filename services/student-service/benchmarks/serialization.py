@@ -0,0 +1,92 @@
+"""Rows/sec of list page serialization, from loaded rows to JSON bytes.
+
+- response_model: what FastAPI does for ``response_model=list[StudentOut]``
+  on ORM objects: validate, dump to JSON-compatible Python, ``json.dumps``;
+- pydantic: validate, then Pydantic's own ``dump_json``;
+- fast (objects): ``Serializer.objects`` on the same ORM objects (orjson);
+- fast (rows): ``Serializer.rows`` on Core rows of the StudentOut columns,
+  what ``GET /students`` now sends.
+
+Every page is also checked to come out byte for byte as Pydantic encodes it.
+Seeded students get birth dates, and addresses with accents, quotes,
+emoji and control characters.
+"""
+import argparse
+import json
+import time
+from datetime import date
+
+from pydantic import TypeAdapter
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker
+
+from app import serialization
+from app.models import Student
+from app.projection import student_columns
+from app.schemas import StudentOut
+from app.serialization import Serializer
+from benchmarks.common import seed_students, temp_engine
+
+ADDRESSES = ['12 rue de l\'Église, Tunis', 'Bloc "B" — app. 4', "Sfax \U0001F3E0", "ligne 1\nligne 2\t\x01", None]
+
+students_json = TypeAdapter(list[StudentOut])
+student_json = Serializer(StudentOut)
+
+
+def response_model(objects) -> bytes:
+    data = students_json.dump_python(students_json.validate_python(objects, from_attributes=True), mode="json")
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def pydantic(objects) -> bytes:
+    return students_json.dump_json(students_json.validate_python(objects, from_attributes=True))
+
+
+def rows_per_second(fn, page, seconds: float) -> float:
+    rows = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn(page)
+        rows += len(page)
+    return rows / (time.perf_counter() - start)
+
+
+def run(size: int, limits, seconds: float) -> None:
+    engine = temp_engine()
+    seed_students(engine, size)
+    with engine.begin() as conn:
+        for k, address in enumerate(ADDRESSES):
+            conn.execute(
+                update(Student).where(Student.id % len(ADDRESSES) == k)
+                .values(adresse=address, dateNaissance=date(1995 + k, k + 1, 10 + k))
+            )
+    Session = sessionmaker(bind=engine)
+    columns = student_columns(None)
+    print(f"{'limit':>6} {'response_model':>15} {'pydantic':>12} {'fast objects':>13} {'fast rows':>12}   rows/s")
+    with Session() as db:
+        for limit in limits:
+            objects = db.query(Student).order_by(Student.id).limit(limit).all()
+            rows = db.execute(select(*columns).order_by(Student.id).limit(limit)).all()
+            expected = pydantic(objects)
+            assert response_model(objects) == expected
+            assert student_json.objects(objects) == expected
+            assert student_json.rows(rows) == expected
+            rates = [
+                rows_per_second(response_model, objects, seconds),
+                rows_per_second(pydantic, objects, seconds),
+                rows_per_second(student_json.objects, objects, seconds),
+                rows_per_second(student_json.rows, rows, seconds),
+            ]
+            print(f"{limit:>6} {rates[0]:>15,.0f} {rates[1]:>12,.0f} {rates[2]:>13,.0f} {rates[3]:>12,.0f}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=5000)
+    parser.add_argument("--limits", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--seconds", type=float, default=1.0, help="per measurement")
+    args = parser.parse_args()
+    if not serialization.FAST_JSON:
+        parser.error("orjson is not installed (or STUD_FAST_JSON=0): nothing fast to measure")
+    run(args.size, args.limits, args.seconds)
@@ -0,0 +1,81 @@
+"""GET /students/stats: summary table read vs counting students on the fly.
+
+- live: one ``GROUP BY`` per dimension over active students, what the
+  endpoint would cost without ``student_stats``;
+- summary: ``read_stats`` on the incrementally maintained table (O(groups));
+- reconcile: a full rebuild of the table, as the background job does.
+
+Also reports the write overhead of keeping the table current: single-row
+inserts with and without ``adjust`` in the same transaction.
+"""
+import argparse
+import random
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Student, StudentStat
+from app.stats import DIMENSIONS, adjust, read_stats, reconcile
+from benchmarks.common import seed_students, student_row, summary, temp_engine, timed
+
+
+def live_stats(db) -> dict:
+    active = Student.deleted_at.is_(None)
+    stats = {"total": db.scalar(select(func.count()).where(active))}
+    for name in DIMENSIONS:
+        column = Student.__table__.c[name]
+        rows = db.execute(select(column, func.count()).where(active).group_by(column).order_by(column))
+        stats[name] = [{"value": value, "count": count} for value, count in rows]
+    return stats
+
+
+def insert_cost(Session, start: int, count: int, with_stats: bool) -> dict:
+    rnd = random.Random(start)
+
+    def one(i=iter(range(start, start + count))):
+        with Session() as db:
+            student = Student(**student_row(next(i), rnd))
+            db.add(student)
+            db.flush()
+            if with_stats:
+                adjust(db, added=[student])
+            db.commit()
+
+    return summary(timed(one, count))
+
+
+def run(sizes, repeat: int, writes: int) -> None:
+    for size in sizes:
+        engine = temp_engine()
+        seed_students(engine, size)
+        with engine.begin() as conn:
+            reconcile(conn)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            assert read_stats(db)["total"] == live_stats(db)["total"] == size
+            live = summary(timed(lambda: live_stats(db), repeat))
+            table = summary(timed(lambda: read_stats(db), repeat))
+            groups = db.scalar(select(func.count()).select_from(StudentStat))
+
+        def rebuild():
+            with engine.begin() as conn:
+                reconcile(conn)
+
+        rebuilt = summary(timed(rebuild, max(1, repeat // 10)))
+        plain = insert_cost(Session, size, writes, with_stats=False)
+        counted = insert_cost(Session, size + writes, writes, with_stats=True)
+        print(f"{size:>9} students, {groups} groups")
+        print(f"  live GROUP BY   p50 {live['p50_ms']:9.3f} ms   p95 {live['p95_ms']:9.3f} ms")
+        print(f"  summary table   p50 {table['p50_ms']:9.3f} ms   p95 {table['p95_ms']:9.3f} ms")
+        print(f"  reconcile       p50 {rebuilt['p50_ms']:9.3f} ms")
+        print(f"  insert          p50 {plain['p50_ms']:9.3f} ms   + stats p50 {counted['p50_ms']:9.3f} ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--writes", type=int, default=200)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat, args.writes)
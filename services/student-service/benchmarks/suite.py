@@ -0,0 +1,178 @@
+"""End-to-end benchmark suite for student-service.
+
+Seeds ``students.db`` with ``--sizes`` synthetic students (and ``--history``
+academic records each), then drives each scenario against ``app.main:app``
+in-process (httpx ASGI transport, no network) and over uvicorn:
+
+- list_search: student by id, filtered list pages, projected list pages
+  and name searches;
+- bulk_writes: NDJSON bulk imports, history batches and single creates.
+
+Seeded databases are kept in ``--data-dir`` and reused; every scenario runs
+on a fresh copy. Results (req/s, p50/p95/p99) are printed and, with
+``--output``, written as JSON for ``services/benchmarks/run.py``, which
+compares them against the stored baseline.
+
+    python -m benchmarks.suite --sizes 10000 100000 --output results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+import httpx
+from sqlalchemy import create_engine
+
+# same engine settings as the Docker image
+os.environ.setdefault("STUD_DB_PROFILE", "wal")
+os.environ.setdefault("STUD_DB_READ_POOL", "1")
+
+from app.database import Base
+from app.migrations import migrate
+from benchmarks.common import (
+    FILIERES,
+    NIVEAUX,
+    NOMS,
+    drive,
+    seed_history,
+    seed_students,
+    student_row,
+    temp_db_url,
+)
+from benchmarks.load import start_server
+
+SERVICE = "student-service"
+MODES = ("inprocess", "uvicorn")
+# first id used for students created by the write scenario (above any seeded id)
+NEW_IDS = 10_000_000
+
+
+def list_search(size: int):
+    rnd = random.Random(1)
+    prefixes = [nom[:4] for nom in NOMS[::97]]
+
+    def next_request(i: int):
+        roll = rnd.random()
+        if roll < 0.4:
+            return "GET", f"/students/{rnd.randint(1, size)}", {}
+        if roll < 0.65:
+            return "GET", f"/students?filiere={rnd.choice(FILIERES)}&niveau={rnd.choice(NIVEAUX)}&limit=20", {}
+        if roll < 0.8:
+            return "GET", f"/students?annee={2015 + rnd.randint(0, 9)}&limit=50&fields=fullname,email,filiere", {}
+        return "GET", f"/students/search?q={rnd.choice(prefixes)}&limit=20", {}
+
+    return next_request
+
+
+def bulk_writes(size: int):
+    rnd = random.Random(2)
+    new_ids = iter(range(NEW_IDS, NEW_IDS * 2))
+
+    def next_request(i: int):
+        roll = rnd.random()
+        if roll < 0.2:
+            body = "\n".join(json.dumps(student_row(next(new_ids), rnd)) for _ in range(50))
+            return "POST", "/students/bulk", {"content": body, "headers": {"content-type": "application/x-ndjson"}}
+        if roll < 0.6:
+            records = [{"annee": 2024, "details": f"note {k}"} for k in range(20)]
+            return "POST", f"/students/{rnd.randint(1, size)}/history:batch", {"json": records}
+        return "POST", "/students", {"json": student_row(next(new_ids), rnd)}
+
+    return next_request
+
+
+SCENARIOS = {"list_search": list_search, "bulk_writes": bulk_writes}
+
+
+def seeded_database(data_dir: str, size: int, history: int) -> str:
+    """Path of a seeded ``students.db`` for ``size`` students, built once."""
+    path = os.path.join(data_dir, f"{size}-{history}", "students.db")
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    building = path + ".building"
+    engine = create_engine("sqlite:///" + building)
+    Base.metadata.create_all(bind=engine)
+    seed_students(engine, size)
+    seed_history(engine, size, history)
+    # indexes, search index and stats are built from the seeded rows
+    migrate(engine)
+    engine.dispose()
+    os.replace(building, path)
+    return path
+
+
+def load_app(db_url: str):
+    os.environ["STUD_DATABASE_URL"] = db_url
+    for name in [m for m in sys.modules if m == "app" or m.startswith("app.")]:
+        del sys.modules[name]
+    from app.database import engine
+    from app.main import app
+    from app.migrations import migrate as migrate_app
+
+    migrate_app(engine)
+    return app, engine
+
+
+async def run_inprocess(db_url: str, next_request, requests: int, concurrency: int) -> dict:
+    app, engine = load_app(db_url)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as http:
+            return await drive(http, next_request, requests, concurrency, warmup=min(50, requests // 10))
+    finally:
+        engine.dispose()
+
+
+async def run_uvicorn(db_url: str, next_request, requests: int, concurrency: int, port: int) -> dict:
+    proc = start_server(db_url, port, async_mode=False)
+    try:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=300) as http:
+            return await drive(http, next_request, requests, concurrency, warmup=min(50, requests // 10))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def run(args) -> list:
+    results = []
+    for size in args.sizes:
+        template = seeded_database(args.data_dir, size, args.history)
+        for scenario in args.scenarios:
+            for mode in args.modes:
+                db_url = temp_db_url("students.db")
+                shutil.copy(template, db_url[len("sqlite:///"):])
+                next_request = SCENARIOS[scenario](size)
+                if mode == "inprocess":
+                    result = asyncio.run(run_inprocess(db_url, next_request, args.requests, args.concurrency))
+                else:
+                    result = asyncio.run(run_uvicorn(db_url, next_request, args.requests, args.concurrency, args.port))
+                record = {"service": SERVICE, "scenario": scenario, "mode": mode, "size": size,
+                          "concurrency": args.concurrency, **result}
+                print(json.dumps(record))
+                results.append(record)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000])
+    parser.add_argument("--history", type=int, default=3, help="history records per seeded student")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8192)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "stud-bench-data"))
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,169 @@
+"""Parallel writers racing for the same emails: no duplicate may get through.
+
+Two runs of each path: the former SELECT-then-INSERT checks on a table
+without the partial unique indexes ("precheck"), and ``create_student``
+(indexes + IntegrityError mapping, "index").
+
+- race: ``--pairs`` pairs of threads create the same student; a barrier
+  holds both until each has done its probe (precheck) or is about to write
+  (index), so the race happens every time instead of by luck. Precheck must
+  leave one duplicate per pair, index none.
+- load: each of ``--writers`` threads creates students whose emails are
+  drawn from a small shared pool, so most attempts collide. Reports the
+  duplicates left behind and per-write latency.
+
+Exits 1 if the race did not reproduce on the precheck path, or if the
+index path let a duplicate in.
+"""
+import argparse
+import os
+import sys
+import threading
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, select, text
+from sqlalchemy.exc import OperationalError
+
+from benchmarks.common import summary, temp_db_url, timed
+
+
+def load_app(db_url: str):
+    os.environ["STUD_DATABASE_URL"] = db_url
+    for name in [m for m in sys.modules if m == "app" or m.startswith("app.")]:
+        del sys.modules[name]
+    from app import database, models, schemas
+    from app.migrations import migrate
+    from app.routes import students
+
+    migrate(database.engine)
+    return database, models, schemas, students
+
+
+def precheck_create(db, Student, payload, between=None):
+    """What create_student did before: probe, then insert; ``between`` runs
+    after the probe."""
+    for column, value in ((Student.email, payload.email), (Student.matricule, payload.matricule)):
+        if db.query(Student).filter(and_(column == value, Student.deleted_at.is_(None))).first():
+            raise HTTPException(status_code=400, detail="already exists")
+    if between is not None:
+        between()
+    db.add(Student(**payload.dict()))
+    db.commit()
+
+
+def setup(label: str):
+    database, models, schemas, students = load_app(temp_db_url())
+    if label == "precheck":
+        with database.engine.begin() as conn:
+            for index in models.Student.__table__.indexes:
+                if index.unique:
+                    conn.execute(text(f"DROP INDEX {index.name}"))
+    return database, models, schemas, students
+
+
+def duplicates(database, Student) -> tuple:
+    """(active rows, active rows sharing an email with another)"""
+    with database.engine.connect() as conn:
+        active = Student.__table__.c.deleted_at.is_(None)
+        rows = conn.execute(select(func.count()).where(active)).scalar()
+        distinct = conn.execute(
+            select(func.count(func.distinct(Student.__table__.c.email))).where(active)
+        ).scalar()
+    return rows, rows - distinct
+
+
+def race(label: str, pairs: int) -> int:
+    """Duplicates left by ``pairs`` pairs of simultaneous identical creates."""
+    database, models, schemas, students = setup(label)
+    Student = models.Student
+
+    def create(n: int, barrier: threading.Barrier) -> None:
+        payload = schemas.StudentCreate(
+            fullname=f"Student {n}", email=f"pair{n}@university.com", age=20, matricule=f"P-{n:05d}",
+        )
+        db = database.SessionLocal()
+        try:
+            if label == "precheck":
+                precheck_create(db, Student, payload, between=barrier.wait)
+            else:
+                barrier.wait()
+                students.create_student(payload, db=db)
+        except HTTPException:
+            db.rollback()
+        finally:
+            db.close()
+
+    for n in range(pairs):
+        barrier = threading.Barrier(2, timeout=30)
+        threads = [threading.Thread(target=create, args=(n, barrier)) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    rows, found = duplicates(database, Student)
+    print(f"{label:<9} race: {pairs} pairs, rows={rows} duplicates={found}")
+    return found
+
+
+def run(label: str, writers: int, attempts: int, pool: int) -> int:
+    database, models, schemas, students = setup(label)
+    Student = models.Student
+
+    def create(n: int) -> None:
+        payload = schemas.StudentCreate(
+            fullname=f"Student {n}", email=f"race{n % pool}@university.com", age=20,
+            matricule=f"R-{n % pool:05d}",
+        )
+        db = database.SessionLocal()
+        try:
+            if label == "precheck":
+                precheck_create(db, Student, payload)
+            else:
+                students.create_student(payload, db=db)
+        except (HTTPException, OperationalError):
+            db.rollback()  # duplicate refused, or SQLite busy
+        finally:
+            db.close()
+
+    samples, lock, counter = [], threading.Lock(), iter(range(writers * attempts))
+
+    def writer() -> None:
+        def step():
+            with lock:
+                n = next(counter)
+            create(n)
+        local = timed(step, attempts)
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    rows, found = duplicates(database, Student)
+    print(f"{label:<9} load: writers={writers} rows={rows} duplicates={found}  {summary(samples)}")
+    return found
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=20)
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--attempts", type=int, default=200, help="0 skips the load run")
+    parser.add_argument("--pool", type=int, default=50, help="distinct emails contended for")
+    args = parser.parse_args()
+    failed = False
+    if race("precheck", args.pairs) != args.pairs:
+        print("  the precheck race did not reproduce")
+        failed = True
+    failed = race("index", args.pairs) > 0 or failed
+    if args.attempts:
+        run("precheck", args.writers, args.attempts, args.pool)
+        failed = run("index", args.writers, args.attempts, args.pool) > 0 or failed
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Throughput of student-service under run.py with 1 to N workers.
+
+Starts the production launcher (``run.py --workers N``) on a copy of a
+seeded database for each worker count and drives the suite's list_search
+mix over HTTP, reporting req/s and latency percentiles. Worker processes
+only help up to the number of CPUs (reported first).
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import drive, temp_db_url
+from benchmarks.suite import list_search, seeded_database
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_launcher(db_url: str, port: int, workers: int) -> subprocess.Popen:
+    env = dict(os.environ, STUD_DATABASE_URL=db_url, STUD_WORKERS=str(workers), STUD_PORT=str(port),
+               STUD_LOG_LEVEL="warning")
+    proc = subprocess.Popen([sys.executable, "run.py"], cwd=SERVICE_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline and proc.poll() is None:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/students?limit=1", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("run.py did not start")
+
+
+async def measure(port: int, size: int, requests: int, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=300) as http:
+        return await drive(http, list_search(size), requests, concurrency, warmup=min(100, requests // 10))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8194)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "stud-bench-data"))
+    args = parser.parse_args()
+
+    template = seeded_database(args.data_dir, args.size, history=3)
+    print(f"cpus={os.cpu_count()}")
+    for workers in args.workers:
+        db_url = temp_db_url("students.db")
+        shutil.copy(template, db_url[len("sqlite:///"):])
+        proc = start_launcher(db_url, args.port, workers)
+        try:
+            result = asyncio.run(measure(args.port, args.size, args.requests, args.concurrency))
+        finally:
+            proc.terminate()
+            proc.wait()
+        print(f"workers={workers:<3} req/s={result['req_s']:8.1f}  p50={result['p50_ms']:.1f} ms"
+              f"  p95={result['p95_ms']:.1f} ms  p99={result['p99_ms']:.1f} ms  errors={result['errors']}")
+
+
+if __name__ == "__main__":
+    main()
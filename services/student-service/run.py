@@ -1,9 +1,92 @@
-#!/home/mehdi/Documents/lsi3/SOA/services/student-service/venv/bin/python3
+#!/usr/bin/env python3
 """
 Run student-service on port 8100
 Execute: ./run.py or python3 run.py
+
+Production launcher: ``--workers`` processes (``STUD_WORKERS``, ``auto`` =
+one per CPU), uvloop and httptools when they are installed, and graceful
+shutdown (in-flight requests get ``--graceful-timeout`` seconds on SIGTERM).
+The app is preloaded here before any worker starts: an import error fails
+the launch once, and migrations are applied once, so workers start against
+an up-to-date schema. ``--reload`` is for development (one process, file
+watcher).
+
+With several workers:
+
+- the response cache is off by default (``STUD_CACHE_MAX_ENTRIES=0``): each
+  worker would keep its own, which a write on another worker doesn't
+  invalidate, so reads (and 304s) could be up to ``STUD_CACHE_TTL_SECONDS``
+  stale after a write. Single-flight stays on: it only shares a build among
+  requests that arrive while it runs, on the same worker.
+- the background jobs (stats reconciliation, outbox pruning) run once, in
+  this launcher process, instead of in every worker
+  (``STUD_BACKGROUND_JOBS=0`` for the workers).
+
+    python run.py --workers 4
+    python run.py --reload
 """
+import argparse
+import os
+
 import uvicorn
 
+APP = "app.main:app"
+
+
+def worker_count(value: str) -> int:
+    return (os.cpu_count() or 1) if value == "auto" else int(value)
+
+
+def preload():
+    from app.database import engine
+    from app.main import app
+    from app.migrations import migrate
+
+    migrate(engine)
+    # workers open their own connections
+    engine.dispose()
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("STUD_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("STUD_PORT", "8100")))
+    parser.add_argument("--workers", default=os.getenv("STUD_WORKERS", "1"), help='number or "auto"')
+    parser.add_argument("--loop", choices=["auto", "asyncio", "uvloop"], default=os.getenv("STUD_LOOP", "auto"))
+    parser.add_argument("--http", choices=["auto", "h11", "httptools"], default=os.getenv("STUD_HTTP", "auto"))
+    parser.add_argument("--graceful-timeout", type=float, default=float(os.getenv("STUD_GRACEFUL_TIMEOUT", "30")))
+    parser.add_argument("--log-level", default=os.getenv("STUD_LOG_LEVEL", "info"))
+    parser.add_argument("--reload", action="store_true", help="development only")
+    args = parser.parse_args()
+
+    if args.reload:
+        uvicorn.run(APP, host=args.host, port=args.port, reload=True, log_level=args.log_level)
+        return
+    workers = worker_count(args.workers)
+    if workers > 1:
+        # read by every worker when it imports the app
+        os.environ.setdefault("STUD_CACHE_MAX_ENTRIES", "0")
+        os.environ["STUD_BACKGROUND_JOBS"] = "0"
+    app = preload()
+    if workers > 1:
+        from app.main import outbox_pruner, stats_reconciler
+
+        # daemon threads of the launcher, which outlives the workers
+        stats_reconciler.start()
+        outbox_pruner.start()
+    uvicorn.run(
+        # a single worker serves the preloaded app; several re-import it by name
+        app if workers == 1 else APP,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=args.loop,
+        http=args.http,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        log_level=args.log_level,
+    )
+
+
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8100, reload=True)
+    main()
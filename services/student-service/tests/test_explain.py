@@ -0,0 +1,2 @@
+def test_route_queries_use_their_indexes(run_check):
+    run_check("explain", "--check", "--size", "2000")
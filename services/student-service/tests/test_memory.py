@@ -0,0 +1,8 @@
+import os
+
+import pytest
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="reads VmHWM from /proc")
+def test_streamed_page_memory_is_flat(run_check):
+    run_check("memory", "--sizes", "1000", "20000", "--modes", "streamed", "ndjson", "--port", "8197")
@@ -0,0 +1,5 @@
+def test_partial_indexes_stop_the_race(run_check):
+    # the race is forced with a barrier: every pair duplicates on the old path
+    out = run_check("uniqueness", "--pairs", "10", "--attempts", "0")
+    assert "precheck  race: 10 pairs, rows=20 duplicates=10" in out
+    assert "index     race: 10 pairs, rows=10 duplicates=0" in out